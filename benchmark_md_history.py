@@ -0,0 +1,700 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for extract_md_history.py hot paths
+Each benchmark checks output parity against the previous implementation before timing it.
+
+Usage:
+    python3 benchmark_md_history.py error-summary [--rows N] [--trace-lines N]
+    python3 benchmark_md_history.py description-fields [--rows N]
+    python3 benchmark_md_history.py row-model [--rows N] [--logs-per-file N]
+    python3 benchmark_md_history.py txt-report [--rows N]
+    python3 benchmark_md_history.py passrate-state [--files N]
+    python3 benchmark_md_history.py history-store [--files N] [--folder PATH]
+"""
+import io
+import re
+import sys
+import os
+import glob
+import time
+import shutil
+import contextlib
+import random
+import tempfile
+import argparse
+
+import extract_md_history
+
+# Reference copy of extract_error_summary before the compiled classifier,
+# used to check that the new engine returns the same summaries
+def legacy_extract_error_summary(desc):
+    if not desc:
+        return ""
+    
+    # Convert to lowercase for easier matching
+    desc_lower = desc.lower()
+    
+    # Look for specific WebDriver element errors with selectors
+    element_selector_match = re.search(r'element \("([^"]+)"\) still not displayed after \d+ms', desc)
+    if element_selector_match:
+        selector = element_selector_match.group(1)
+        # Extract meaningful part of selector
+        if 'sdet-' in selector:
+            element_name = selector.replace('~sdet-', '').replace('sdet-', '')
+        elif '~' in selector:
+            element_name = selector.replace('~', '')
+        else:
+            element_name = selector[:20]
+        return f"Element '{element_name}' not displayed"
+    
+    # Look for element not clickable/interactable errors
+    not_clickable_match = re.search(r'element \("([^"]+)"\).*not clickable', desc_lower)
+    if not_clickable_match:
+        selector = not_clickable_match.group(1)
+        element_name = selector.replace('~sdet-', '').replace('~', '')[:20]
+        return f"Element '{element_name}' not clickable"
+    
+    # Look for "Can't call" errors with method and selector
+    cant_call_match = re.search(r"can't call (\w+) on element with selector.*?contains\(@text[^\"]*\"([^\"]+)\"", desc_lower)
+    if cant_call_match:
+        method = cant_call_match.group(1)
+        text_content = cant_call_match.group(2)[:30]
+        return f"Can't {method} element with text '{text_content}'"
+    
+    # Look for generic "Can't call" errors
+    cant_call_generic = re.search(r"can't call (\w+) on element", desc_lower)
+    if cant_call_generic:
+        method = cant_call_generic.group(1)
+        return f"Can't {method} element"
+    
+    # Look for AssertionError with more context
+    if 'assertionerror' in desc_lower:
+        # Try to find what was being verified
+        verify_match = re.search(r'at \w*\.(\w*verify\w*)', desc_lower)
+        if verify_match:
+            verify_method = verify_match.group(1)
+            # Clean up method name
+            clean_method = re.sub(r'verify|page|success|trx', '', verify_method).strip()
+            if clean_method:
+                return f"Assertion failed: {clean_method[:20]}"
+        
+        # Look for expected vs actual values
+        expected_match = re.search(r'expected.*?(\w+).*?actual.*?(\w+)', desc_lower)
+        if expected_match:
+            expected = expected_match.group(1)
+            actual = expected_match.group(2)
+            return f"Expected '{expected}' but got '{actual}'"
+        
+        return "Assertion failed"
+    
+    # Look for common automation error patterns
+    error_patterns = [
+        (r'timeout.*waiting.*element', 'Element timeout'),
+        (r'element.*not.*found', 'Element not found'),
+        (r'no.*such.*element', 'Element not found'),
+        (r'element.*not.*clickable', 'Element not clickable'),
+        (r'element.*not.*interactable', 'Element not interactable'),
+        (r'stale.*element', 'Stale element'),
+        (r'element.*not.*visible', 'Element not visible'),
+        (r'connection.*refused', 'Connection refused'),
+        (r'network.*error', 'Network error'),
+        (r'null.*pointer', 'Null pointer'),
+        (r'index.*out.*of.*bounds', 'Index out of bounds'),
+        (r'session.*not.*found', 'Session expired'),
+        (r'webdriver.*exception', 'WebDriver error'),
+        (r'screenshot.*failed', 'Screenshot failed'),
+        (r'page.*not.*loaded', 'Page load failed'),
+        (r'certificate.*error', 'Certificate error'),
+        (r'permission.*denied', 'Permission denied'),
+        (r'file.*not.*found', 'File not found'),
+        (r'invalid.*selector', 'Invalid selector'),
+        (r'function timed out', 'Function timeout'),
+        (r'scenario skipped', 'Test skipped'),
+    ]
+    
+    # Check for specific error patterns
+    for pattern, summary in error_patterns:
+        if re.search(pattern, desc_lower):
+            return summary
+    
+    # Look for exception types
+    exception_match = re.search(r'([A-Za-z0-9_]+(?:Exception|Error))', desc)
+    if exception_match:
+        exception_name = exception_match.group(1)
+        # Simplify common exception names
+        if 'TimeoutException' in exception_name:
+            return 'Timeout error'
+        elif 'NoSuchElementException' in exception_name:
+            return 'Element not found'
+        elif 'ElementNotInteractableException' in exception_name:
+            return 'Element not clickable'
+        elif 'StaleElementReferenceException' in exception_name:
+            return 'Stale element'
+        elif 'WebDriverException' in exception_name:
+            return 'WebDriver error'
+        else:
+            return exception_name.replace('Exception', ' error').replace('Error', ' error')
+    
+    # Look for "failed" keyword with context
+    failed_match = re.search(r'failed\s+(?:to\s+)?([a-zA-Z\s]{1,30})', desc_lower)
+    if failed_match:
+        context = failed_match.group(1).strip()
+        return f"Failed to {context[:25]}"
+    
+    # If no specific pattern found, try to get first meaningful line
+    lines = desc.strip().split('\n')
+    for line in lines:
+        line = line.strip()
+        if line and len(line) > 10:  # Skip very short lines
+            # Take up to 6 words or 60 characters
+            words = line.split()[:6]
+            summary = ' '.join(words)
+            if len(summary) > 60:
+                summary = summary[:57] + '...'
+            return summary
+    
+    return "Unknown error"
+
+# Reference copy of parse_description_fields before the single-pass scanner
+def legacy_parse_description_fields(desc):
+    # Extract fields from description block
+    fields = {
+        'Device': '', 'OS': '', 'App': '', 'Phone Number': '',
+        'Location': '', 'Step': '', 'Error': '',
+        'Jenkins Build Number': '', 'Jenkins URL': '', 'Triggered by': '',
+        'Description': ''
+    }
+    if not desc:
+        return fields
+    # Device
+    m = re.search(r'Device:\s*([^\n]+)', desc)
+    if m: fields['Device'] = m.group(1).strip()
+    # OS
+    m = re.search(r'OS:\s*([^\n]+)', desc)
+    if m: fields['OS'] = m.group(1).strip()
+    # App
+    m = re.search(r'App:\s*([^\n]+)', desc)
+    if m: fields['App'] = m.group(1).strip()
+    # Phone Number
+    m = re.search(r'Phone Number:\s*([^\n]+)', desc)
+    if m: fields['Phone Number'] = m.group(1).strip()
+    # Location
+    m = re.search(r'Location:\s*([^\n]+)', desc)
+    if m: fields['Location'] = m.group(1).strip()
+    # Step
+    m = re.search(r'Step:\s*([^\n]+)', desc)
+    if m: fields['Step'] = m.group(1).strip()
+    # Error
+    m = re.search(r'Error:\s*([\s\S]+?)(?:\n\w|$)', desc)
+    if m: fields['Error'] = m.group(1).strip()
+    # Jenkins Build Number
+    m = re.search(r'Jenkins Build Number:\s*([^\n]+)', desc)
+    if m: fields['Jenkins Build Number'] = m.group(1).strip()
+    # Jenkins URL
+    m = re.search(r'Jenkins URL:\s*([^\n]+)', desc)
+    if m: fields['Jenkins URL'] = m.group(1).strip()
+    # Triggered by
+    m = re.search(r'Triggered by:\s*([^\n]+)', desc)
+    if m: fields['Triggered by'] = m.group(1).strip()
+    # Remaining description (remove all above fields)
+    desc_clean = desc
+    for k in fields:
+        if k != 'Description' and fields[k]:
+            desc_clean = re.sub(rf'{k}:.*', '', desc_clean)
+    fields['Description'] = desc_clean.strip()
+    return fields
+
+# Stack frames seen in WebDriverIO / Appium failures on Jenkins
+TRACE_FRAMES = [
+    '    at async Element.elementErrorHandlerCallbackFn (/var/lib/jenkins/workspace/mobile-e2e/node_modules/webdriverio/build/middlewares.js:98:32)',
+    '    at async Element.wrapCommandFn (/var/lib/jenkins/workspace/mobile-e2e/node_modules/@wdio/utils/build/shim.js:137:29)',
+    '    at async LoginPage.tapLoginButton (/var/lib/jenkins/workspace/mobile-e2e/src/pages/login.page.js:41:9)',
+    '    at async World.<anonymous> (/var/lib/jenkins/workspace/mobile-e2e/src/steps/payment.steps.js:77:5)',
+    '    at processTicksAndRejections (node:internal/process/task_queues:95:5)',
+]
+
+TRACE_HEADLINES = [
+    'Error: element ("~sdet-pay-now-button") still not displayed after 10000ms',
+    "Error: Can't call click on element with selector \"//*[contains(@text, \"Confirm Payment\")]\" because element wasn't found",
+    'AssertionError [ERR_ASSERTION]: expected "Success" but actual "Pending"',
+    'Error: An unknown server-side error occurred while processing the command. Original error: Could not proxy command to the remote server',
+    'Error: function timed out, ensure the promise resolves within 60000 milliseconds',
+    'io.appium.uiautomator2.common.exceptions.StaleElementReferenceException: Cached elements do not exist in DOM anymore',
+    'Something went wrong in the payment flow',
+]
+
+# Inputs where a shortcut in the compiled classifier could part ways with the
+# legacy regexes; only checked for equal summaries, not timed
+EDGE_CASE_DESCRIPTIONS = [
+    'element ("a\nb") foo not clickable',
+    'element ("~sdet-a") is fine\nelement ("~sdet-b") not clickable',
+    'element ("x") ok\nnot clickable',
+    'element ("~sdet-pay\nnow") still not displayed after 500ms',
+]
+
+# Reference copy of parse_md_entry_block before the MDRow record, which
+# filled a dict keyed by header and then converted it to a list
+def legacy_parse_md_entry_block(entry, is_main, main_name, main_url, main_id, source_file, header_name=None):
+    data = {h: '' for h in extract_md_history.MD_HEADERS}
+    data['Source File'] = source_file
+    archive_val = ''
+    header_for_parse = header_name if header_name else ''
+    if is_main:
+        name_match = re.search(r"^#\s*(.*)", entry, re.MULTILINE)
+        if name_match:
+            data['Name'] = name_match.group(1).strip()
+        archive_match = re.search(r"Archive Testcase:.*?\((https?://[^\s)]+)\)", entry)
+        if archive_match:
+            data['Archive Testcase URL'] = archive_match.group(1).strip()
+            archive_val = archive_match.group(0)
+        id_match = re.search(r"^ID:\s*(HAT-\d+)", entry, re.MULTILINE)
+        if id_match:
+            data['ID'] = id_match.group(1).strip()
+    else:
+        # For log, try to extract table fields
+        # Table row: | Tested By | ... | Status | ... | Testing Type | ... | Description | ... |
+        table_match = re.search(r"\|\s*Tested By\s*\|\s*(.*?)\s*\|.*?\|\s*Status\s*\|\s*(.*?)\s*\|.*?\|\s*Testing Type\s*\|\s*(.*?)\s*\|.*?\|\s*Description\s*\|\s*(.*?)\s*\|", entry, re.DOTALL)
+        if table_match:
+            data['Tested by'] = table_match.group(1).strip()
+            data['Status'] = table_match.group(2).strip()
+            data['Type Testing'] = table_match.group(3).strip()
+            data['Description'] = table_match.group(4).strip()
+        # fallback for log name
+        data['Name'] = f"{main_name}"
+        data['Archive Testcase URL'] = main_url
+        data['ID'] = main_id
+        archive_val = main_name  # fallback, not used for log
+    # For both main and log, fallback for History Date
+    if not data['History Date']:
+        date_match = re.search(r"^(?:History Date|Log on):\s*(.*)", entry, re.MULTILINE)
+        if date_match:
+            data['History Date'] = extract_md_history.normalize_history_date(date_match.group(1).strip())
+    # For both main and log, fallback for Status, Tested by, Type Testing
+    if not data['Status']:
+        status_match = re.search(r"^(?:Status|\| Status \|):\s*(.*?)(?:\s*\|)?$", entry, re.MULTILINE)
+        if status_match:
+            data['Status'] = status_match.group(1).strip()
+    if not data['Tested by']:
+        tested_by_match = re.search(r"^(?:Tested by|\| Tested By \|):\s*(.*?)(?:\s*\|)?$", entry, re.MULTILINE)
+        if tested_by_match:
+            data['Tested by'] = tested_by_match.group(1).strip()
+    if not data['Type Testing']:
+        type_testing_match = re.search(r"^(?:Type Testing|\| Testing Type \|):\s*(.*?)(?:\s*\|)?$", entry, re.MULTILINE)
+        if type_testing_match:
+            data['Type Testing'] = type_testing_match.group(1).strip()
+    # Always extract from header/Archive Testcase value
+    parse_source = header_for_parse or archive_val or data['Name']
+    name_props = extract_md_history.extract_test_properties(parse_source)
+    for i, h in enumerate(['App Version', 'Tribe Short', 'Squad Name', 'OS Name', 'Tribe Name', 'Test Environment', 'Platform', 'Test Case ID']):
+        data[h] = name_props[i]
+    
+    # Parse description fields
+    desc_fields = extract_md_history.parse_description_fields(data['Description'])
+    for k in desc_fields:
+        data[k] = desc_fields[k]
+    
+    # Extract error summary from Error field or Description only if status indicates failure
+    status = data.get('Status', '').lower()
+    if status and status not in ['passed', 'pass', 'success', 'successful']:
+        error_text = data.get('Error', '') or data.get('Description', '')
+        data['Error Summary'] = extract_md_history.extract_error_summary(error_text)
+    else:
+        data['Error Summary'] = ''
+    
+    data['Description'] = extract_md_history.clean_description(data['Description'])
+    # parse_single_md_file used to patch in the '### Log on' date afterwards
+    row = [data[h] for h in extract_md_history.MD_HEADERS]
+    if not is_main and not row[3]:
+        date_match = re.search(r"^### Log on (.*)", entry, re.MULTILINE)
+        if date_match:
+            row[3] = extract_md_history.normalize_history_date(date_match.group(1).strip())
+    return row
+
+# Reference copies of the TXT record loops before the chunked renderer,
+# used to check that the reports are unchanged
+def legacy_format_txt_record_details(row):
+    parts = []
+    for idx, field_name in extract_md_history.TXT_KEY_FIELDS:
+        if idx < len(row) and row[idx]:
+            parts.append(f"{field_name}: {row[idx]}\n")
+    
+    parts.append("\nTechnical Details:\n")
+    for idx, field_name in extract_md_history.TXT_TECH_FIELDS:
+        if idx < len(row) and row[idx]:
+            parts.append(f"  {field_name}: {row[idx]}\n")
+    
+    # Archive URL if available
+    if len(row) > 2 and row[2]:
+        parts.append(f"\nArchive URL: {row[2]}\n")
+    
+    # Description preview (first 150 chars for better grouping)
+    if len(row) > 26 and row[26]:
+        desc_preview = row[26][:150].replace('\n', ' ').strip()
+        if len(row[26]) > 150:
+            desc_preview += "..."
+        parts.append(f"\nDescription: {desc_preview}\n")
+    return ''.join(parts)
+
+def legacy_write_combined_txt_records(txtfile, records):
+    for i, row in enumerate(records, 1):
+        txtfile.write(f"Record #{i}\n")
+        txtfile.write("-" * 30 + "\n")
+        
+        txtfile.write(legacy_format_txt_record_details(row))
+        
+        txtfile.write("\n" + "-" * 60 + "\n\n")
+
+def legacy_write_os_txt_records(txtfile, records):
+    for i, row in enumerate(records, 1):
+        txtfile.write(f"Execution #{i}\n")
+        txtfile.write("." * 25 + "\n")
+        
+        txtfile.write(legacy_format_txt_record_details(row))
+        
+        txtfile.write("\n" + "." * 50 + "\n\n")
+
+def generate_traces(rows, trace_lines, seed=42):
+    """Generate long WebDriver failure descriptions, half of them flattened to one line like Notion table cells"""
+    rng = random.Random(seed)
+    traces = []
+    for i in range(rows):
+        lines = [rng.choice(TRACE_HEADLINES)] + [rng.choice(TRACE_FRAMES) for _ in range(trace_lines)]
+        separator = '<br>' if i % 2 else '\n'
+        traces.append(separator.join(lines))
+    return traces
+
+def time_per_row(func, inputs, repeat=3):
+    """Best-of-N wall time per input, in microseconds"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for value in inputs:
+            func(value)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(inputs) * 1e6
+
+def bench_error_summary(args):
+    traces = generate_traces(args.rows, args.trace_lines)
+    avg_len = sum(len(t) for t in traces) / len(traces)
+    print(f"Error summary: {len(traces)} rows, {args.trace_lines} stack frames, {avg_len:.0f} chars avg")
+    
+    mismatches = [t for t in traces + EDGE_CASE_DESCRIPTIONS
+                  if legacy_extract_error_summary(t) != extract_md_history.extract_error_summary(t)]
+    if mismatches:
+        print(f"❌ {len(mismatches)} summaries differ from the legacy cascade, e.g.:")
+        print(mismatches[0][:200])
+        return 1
+    print("✅ Summaries identical to legacy cascade")
+    
+    for label, sample in (('multi-line', traces[0::2]), ('single-line', traces[1::2])):
+        legacy_us = time_per_row(legacy_extract_error_summary, sample)
+        new_us = time_per_row(extract_md_history.extract_error_summary, sample)
+        print(f"  {label:<12} legacy {legacy_us:9.1f} us/row   compiled {new_us:9.1f} us/row   {legacy_us / new_us:6.1f}x")
+    return 0
+
+def generate_descriptions(rows, seed=42):
+    """Generate log descriptions with a random subset of key/value fields and free text"""
+    rng = random.Random(seed)
+    field_lines = [
+        'Device: Pixel 7', 'OS: Android 13', 'App: DANA 2.81.0', 'Phone Number: 081234567890',
+        'Location: Jakarta', 'Step: Tap pay button', 'Jenkins Build Number: 512',
+        'Jenkins URL: https://jenkins.example/job/mobile-e2e/512', 'Triggered by: scheduler',
+        'Tested on iOS: 17.2 simulator', 'Retry note:', 'Device:',
+    ]
+    descriptions = []
+    for _ in range(rows):
+        lines = rng.sample(field_lines, rng.randint(0, len(field_lines)))
+        if rng.random() < 0.5:
+            lines.insert(rng.randint(0, len(lines)), 'Error: ' + rng.choice(TRACE_HEADLINES) + '\n' + '\n'.join(TRACE_FRAMES))
+        if rng.random() < 0.3:
+            lines.append('Free text about the run')
+        descriptions.append('\n'.join(lines))
+    return descriptions
+
+def bench_description_fields(args):
+    descriptions = generate_descriptions(args.rows)
+    print(f"Description fields: {len(descriptions)} rows")
+    
+    mismatches = [d for d in descriptions if legacy_parse_description_fields(d) != extract_md_history.parse_description_fields(d)]
+    if mismatches:
+        print(f"❌ {len(mismatches)} results differ from the legacy parser, e.g.:")
+        print(mismatches[0][:200])
+        return 1
+    print("✅ Fields identical to legacy parser")
+    
+    legacy_us = time_per_row(legacy_parse_description_fields, descriptions)
+    new_us = time_per_row(extract_md_history.parse_description_fields, descriptions)
+    print(f"  legacy {legacy_us:9.1f} us/row   single-pass {new_us:9.1f} us/row   {legacy_us / new_us:6.1f}x")
+    return 0
+
+def generate_history_blocks(files, logs_per_file, seed=42):
+    """Generate (header, main block, log blocks) per synthetic submission from a small pool of texts"""
+    rng = random.Random(seed)
+    descriptions = generate_descriptions(200, seed)
+    statuses = ['Passed', 'Passed', 'Failed', 'Skipped']
+    submissions = []
+    for i in range(files):
+        header = f"Submission - 2.{80 + i % 5}.0 - FS Wealth - OS DANA CICIL - Financial Service (SIT, Android) - NTC - {40000 + i}"
+        main_block = (f"# {header}\nID: HAT-{i}\nArchive Testcase: [case](https://www.notion.so/case-{i})\n"
+                      f"History Date: January {1 + i % 28}, 2024 10:00 AM\nStatus: Passed\n")
+        logs = []
+        for day in range(logs_per_file):
+            description = rng.choice(descriptions).replace('|', '/')
+            logs.append(f"\n### Log on February {1 + day % 28}, 2024 {1 + day % 12}:00 PM\n\n"
+                        f"| Tested By | qa-bot |\n| --- | --- |\n| Status | {rng.choice(statuses)} |\n"
+                        f"| Testing Type | Regression |\n| Description | {description} |\n")
+        submissions.append((header, main_block, logs))
+    return submissions
+
+def parse_history(parse_block, submissions, rows):
+    """Parse submissions round-robin until rows rows exist, like parse_single_md_file does per file"""
+    parsed = []
+    while len(parsed) < rows:
+        for index, (header, main_block, logs) in enumerate(submissions):
+            source_file = f"submission_{index}.md"
+            main_row = parse_block(main_block, True, '', '', '', source_file, header)
+            parsed.append(main_row)
+            for log in logs:
+                parsed.append(parse_block(log, False, main_row[1], main_row[2], main_row[0], source_file, header))
+            if len(parsed) >= rows:
+                break
+    return parsed
+
+def retained_bytes(rows):
+    """Bytes held by the row containers plus every distinct string they reference"""
+    total = 0
+    seen = set()
+    for row in rows:
+        total += sys.getsizeof(row)
+        for value in row:
+            if id(value) not in seen:
+                seen.add(id(value))
+                total += sys.getsizeof(value)
+    return total
+
+def bench_row_model(args):
+    files = max(1, min(5000, args.rows // (args.logs_per_file + 1)))
+    submissions = generate_history_blocks(files, args.logs_per_file)
+    print(f"Row model: {args.rows} rows from {files} synthetic submissions, {args.logs_per_file} logs each")
+    
+    sample = parse_history(legacy_parse_md_entry_block, submissions, min(args.rows, 5000))
+    new_sample = parse_history(extract_md_history.parse_md_entry_block, submissions, min(args.rows, 5000))
+    if sample != [list(row) for row in new_sample]:
+        print("❌ MDRow fields differ from the legacy dict rows")
+        return 1
+    print("✅ MDRow fields identical to legacy dict rows")
+    
+    results = {}
+    for label, parse_block in (('legacy', legacy_parse_md_entry_block), ('MDRow', extract_md_history.parse_md_entry_block)):
+        start = time.perf_counter()
+        rows = parse_history(parse_block, submissions, args.rows)
+        elapsed = time.perf_counter() - start
+        results[label] = (elapsed / len(rows) * 1e6, retained_bytes(rows) / len(rows))
+        del rows
+    for label, (us_per_row, bytes_per_row) in results.items():
+        print(f"  {label:<7} {us_per_row:7.1f} us/row   {bytes_per_row:7.0f} bytes/row retained")
+    legacy_us, legacy_bytes = results['legacy']
+    new_us, new_bytes = results['MDRow']
+    print(f"  {legacy_us / new_us:.2f}x faster, {100 * (1 - new_bytes / legacy_bytes):.0f}% less memory per row")
+    return 0
+
+def write_txt_reports(path, os_groups, write_combined, write_os):
+    """Record sections of the combined report then of every per-OS report, into one file"""
+    with open(path, 'w', encoding='utf-8') as txtfile:
+        for os_name, test_cases in sorted(os_groups.items()):
+            write_combined(txtfile, [row for records in test_cases.values() for row in records])
+        for os_name, test_cases in sorted(os_groups.items()):
+            for test_case_id, records in sorted(test_cases.items()):
+                write_os(txtfile, records)
+
+def bench_txt_report(args):
+    submissions = generate_history_blocks(max(1, min(5000, args.rows // 21)), 20)
+    rows = parse_history(extract_md_history.parse_md_entry_block, submissions, args.rows)
+    for n, row in enumerate(rows):
+        # Spread the rows over a few OS names and test cases; the TXT 'Description'
+        # line prints the Source File column, so give it the long description
+        rows[n] = row._replace(os_name=f"OS {n % 7}", platform=f"NTC-{n % 997}", source_file=row.description)
+    index = extract_md_history.RowGroupIndex()
+    for row in rows:
+        index.add(row)
+    os_groups = {os_name: dict(test_cases) for os_name, test_cases in index.test_case_groups().items()}
+    print(f"TXT report: {len(rows)} records in {len(os_groups)} OS sections, rendered once combined and once per OS")
+    
+    def chunked_combined(txtfile, records):
+        txtfile.writelines(extract_md_history.render_combined_txt_records(records))
+    def chunked_os(txtfile, records):
+        txtfile.writelines(extract_md_history.render_os_txt_records(records))
+    
+    with tempfile.TemporaryDirectory(prefix='md_bench_') as tmp:
+        results = {}
+        for label, write_combined, write_os in (('legacy', legacy_write_combined_txt_records, legacy_write_os_txt_records),
+                                                ('chunked', chunked_combined, chunked_os)):
+            path = os.path.join(tmp, f'{label}.txt')
+            best = None
+            for _ in range(3):
+                start = time.perf_counter()
+                write_txt_reports(path, os_groups, write_combined, write_os)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            results[label] = best
+        with open(os.path.join(tmp, 'legacy.txt'), 'rb') as legacy_file, open(os.path.join(tmp, 'chunked.txt'), 'rb') as chunked_file:
+            if legacy_file.read() != chunked_file.read():
+                print("❌ Chunked TXT records differ from the legacy writers")
+                return 1
+    print("✅ TXT reports identical to legacy writers")
+    for label, elapsed in results.items():
+        print(f"  {label:<9} {elapsed:7.2f} s   {elapsed / (2 * len(rows)) * 1e6:6.2f} us/record")
+    print(f"  {results['legacy'] / results['chunked']:.2f}x faster")
+    return 0
+
+def write_submission_files(folder, submissions, names=None):
+    """Write synthetic submissions as MD files, one per submission"""
+    os.makedirs(folder, exist_ok=True)
+    for n, (header, main_block, logs) in enumerate(submissions):
+        name = names[n] if names else f"{n:05d}.md"
+        with open(os.path.join(folder, name), 'w', encoding='utf-8') as f:
+            f.write(main_block + ''.join(logs))
+
+def passrate_outputs(run_dir, folder, state_path=None):
+    """Pass rate CSVs of one run of folder from run_dir: {file name: bytes}, and the run time"""
+    argv = [folder, '--passrate-by', 'all'] + (['--passrate-state', state_path] if state_path else [])
+    args = extract_md_history.build_arg_parser().parse_args(argv)
+    cwd = os.getcwd()
+    os.makedirs(run_dir, exist_ok=True)
+    os.chdir(run_dir)
+    try:
+        shutil.rmtree('md_extraction_results', ignore_errors=True)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            extract_md_history.process_md_folder(folder, args)
+        elapsed = time.perf_counter() - start
+        outputs = {}
+        for path in glob.glob(os.path.join('md_extraction_results', '*pass*.csv')):
+            with open(path, 'rb') as f:
+                outputs[os.path.basename(path)] = f.read()
+        return outputs, elapsed
+    finally:
+        os.chdir(cwd)
+
+def bench_passrate_state(args):
+    submissions = generate_history_blocks(args.files + 10, 20)
+    print(f"Pass rate state: {args.files} synthetic submissions, checked against a full recompute after each change")
+    with tempfile.TemporaryDirectory(prefix='md_bench_') as tmp:
+        export = os.path.join(tmp, 'export')
+        state_path = os.path.join(tmp, 'passrate_state.json')
+        write_submission_files(export, submissions[:args.files])
+        
+        def add_files():
+            write_submission_files(export, submissions[args.files:], [f"new_{n:05d}.md" for n in range(10)])
+        def append_log():
+            with open(os.path.join(export, '00000.md'), 'a', encoding='utf-8') as f:
+                f.write("\n### Log on March 3, 2024 1:00 PM\n\n| Tested By | qa-bot |\n| --- | --- |\n| Status | Passed |\n"
+                        "| Testing Type | Regression |\n| Description | rerun |\n")
+        def remove_file():
+            os.remove(os.path.join(export, '00001.md'))
+        def other_folder():
+            other = os.path.join(tmp, 'other')
+            write_submission_files(other, submissions[:3])
+            return other
+        
+        steps = [('first run', None), ('unchanged', None), ('new files', add_files), ('appended log', append_log),
+                 ('removed file', remove_file), ('other folder', other_folder)]
+        folder = export
+        for label, change in steps:
+            if change:
+                folder = change() or folder
+            with_state, state_time = passrate_outputs(os.path.join(tmp, 'state_run'), folder, state_path)
+            recomputed, full_time = passrate_outputs(os.path.join(tmp, 'full_run'), folder)
+            if with_state != recomputed:
+                print(f"❌ {label}: pass rate CSVs differ from a full recompute")
+                return 1
+            print(f"  ✅ {label:<13} with state {state_time:6.2f} s   full recompute {full_time:6.2f} s")
+    print("✅ Pass rate CSVs identical to a full recompute")
+    return 0
+
+def run_outputs(run_dir, argv, folder=None):
+    """Record count and CSV outputs of one run from run_dir: ({file name: bytes}, records)"""
+    args = extract_md_history.build_arg_parser().parse_args(argv)
+    cwd = os.getcwd()
+    os.makedirs(run_dir, exist_ok=True)
+    os.chdir(run_dir)
+    try:
+        shutil.rmtree('md_extraction_results', ignore_errors=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            if args.from_store:
+                result = extract_md_history.rebuild_outputs_from_store(args)
+            else:
+                result = extract_md_history.process_md_folder(folder, args)
+        outputs = {}
+        for path in glob.glob(os.path.join('md_extraction_results', '*.csv')):
+            with open(path, 'rb') as f:
+                outputs[os.path.basename(path)] = f.read()
+        return outputs, result['records']
+    finally:
+        os.chdir(cwd)
+
+def bench_history_store(args):
+    with tempfile.TemporaryDirectory(prefix='md_bench_') as tmp:
+        folder = args.folder
+        if not folder:
+            # Every fifth submission repeats a log's date and status on another device,
+            # rows that only the store's Occurrence key column tells apart
+            folder = os.path.join(tmp, 'export')
+            submissions = generate_history_blocks(args.files, 20)
+            for n, (header, main_block, logs) in enumerate(submissions):
+                if n % 5 == 0:
+                    logs.append(logs[0].replace('| Description | ', '| Description | Device: Pixel 8 - '))
+            write_submission_files(folder, submissions)
+        print(f"History store: --from-store against a direct parse of {folder}")
+        store_path = os.path.join(tmp, 'history.db')
+        direct, direct_records = run_outputs(os.path.join(tmp, 'direct_run'), [folder, '--separate-csv'], folder)
+        for label in ('first import', 're-import'):
+            run_outputs(os.path.join(tmp, 'store_run'), [folder, '--store', store_path, '--no-txt', '--no-passrate'], folder)
+            stored, stored_records = run_outputs(os.path.join(tmp, 'rebuild_run'), ['--store', store_path, '--from-store', '--separate-csv'])
+            if stored_records != direct_records:
+                print(f"❌ {label}: --from-store rebuilt {stored_records} rows, a direct parse has {direct_records}")
+                return 1
+            if stored != direct:
+                print(f"❌ {label}: --from-store CSVs differ from a direct parse")
+                return 1
+            print(f"  ✅ {label:<12} {stored_records} rows")
+    print("✅ --from-store rows and CSVs identical to a direct parse")
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark extract_md_history.py hot paths')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+    
+    error_parser = subparsers.add_parser('error-summary', help='Per-row cost of extract_error_summary on long WebDriver traces')
+    error_parser.add_argument('--rows', type=int, default=2000, help='Number of failed rows (default: 2000)')
+    error_parser.add_argument('--trace-lines', type=int, default=60, help='Stack frames per trace (default: 60)')
+    error_parser.set_defaults(func=bench_error_summary)
+    
+    fields_parser = subparsers.add_parser('description-fields', help='Per-row cost of parse_description_fields')
+    fields_parser.add_argument('--rows', type=int, default=20000, help='Number of descriptions (default: 20000)')
+    fields_parser.set_defaults(func=bench_description_fields)
+    
+    rows_parser = subparsers.add_parser('row-model', help='Per-row parse cost and retained memory of the row record')
+    rows_parser.add_argument('--rows', type=int, default=1000000, help='Number of parsed rows (default: 1000000)')
+    rows_parser.add_argument('--logs-per-file', type=int, default=20, help='Log entries per submission (default: 20)')
+    rows_parser.set_defaults(func=bench_row_model)
+    
+    txt_parser = subparsers.add_parser('txt-report', help='Cost of rendering the combined and per-OS TXT records')
+    txt_parser.add_argument('--rows', type=int, default=200000, help='Number of records (default: 200000)')
+    txt_parser.set_defaults(func=bench_txt_report)
+    
+    state_parser = subparsers.add_parser('passrate-state', help='--passrate-state runs against a full recompute as the input folder changes')
+    state_parser.add_argument('--files', type=int, default=500, help='Number of submission files (default: 500)')
+    state_parser.set_defaults(func=bench_passrate_state)
+    
+    store_parser = subparsers.add_parser('history-store', help='--from-store row count and CSVs against a direct parse of the same folder')
+    store_parser.add_argument('--files', type=int, default=500, help='Number of synthetic submission files (default: 500)')
+    store_parser.add_argument('--folder', help='Check this MD folder instead of synthetic submissions')
+    store_parser.set_defaults(func=bench_history_store)
+    
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+if __name__ == "__main__":
+    main()
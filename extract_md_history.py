@@ -3,14 +3,35 @@
 Module to extract test case data from .md files in a folder (History Archive Testcases)
 Output: historical_data_from_md_import.csv and a date-stamped version
 """
+import io
 import os
+import base64
 import re
 import csv
+import mmap
 import sys
+import json
+import time
+import queue
+import heapq
+import pickle
+import sqlite3
+import hashlib
+import tempfile
+import threading
+import tracemalloc
+import traceback
+import contextlib
+import fnmatch
 import argparse
 import importlib.util
 import dateutil.parser
 from datetime import datetime
+from array import array
+from functools import lru_cache
+from itertools import chain
+from collections import deque, namedtuple
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 
 # Update headers to include NTC-ID
 MD_HEADERS = [
@@ -22,16 +43,252 @@ MD_HEADERS = [
     'Index'
 ]
 
+# Fixed field layout of a parsed row: field i holds column MD_HEADERS[i].
+# Rows are tuples, so writers and positional lookups work unchanged.
+MD_ROW_FIELDS = [
+    'id', 'name', 'archive_url', 'history_date', 'status',
+    'device', 'os', 'app', 'phone_number', 'location', 'step', 'error',
+    'jenkins_build_number', 'jenkins_url', 'triggered_by', 'tested_by', 'type_testing',
+    'app_version', 'tribe_short', 'squad_name', 'os_name', 'tribe_name',
+    'test_environment', 'platform', 'test_case_id', 'error_summary', 'source_file', 'description',
+    'case_index'
+]
+MDRow = namedtuple('MDRow', MD_ROW_FIELDS)
+
+# Bump when parser output changes so stale cache entries are discarded
+PARSE_CACHE_VERSION = 1
+DEFAULT_PARSE_CACHE = os.path.join('md_extraction_results', '.md_parse_cache.json')
+
+# Bump when the pass rate state layout changes so old sidecars are ignored
+PASSRATE_STATE_VERSION = 2
+DEFAULT_PASSRATE_STATE = os.path.join('md_extraction_results', '.passrate_state.json')
+
+# Rows per executemany() batch when writing to the --store history database
+HISTORY_STORE_BATCH_SIZE = 1000
+
+# Files per worker task when parsing with --jobs
+PARSE_BATCH_SIZE = 16
+
+# Rows per sorted run spilled to disk by the --stream external sort
+STREAM_RUN_SIZE = 50000
+
+# Records joined into one string per write() by the TXT report renderers
+TXT_RENDER_CHUNK_RECORDS = 256
+
+# Uploaded files a --worker run holds in memory ahead of the parser
+WORKER_UPLOAD_QUEUE_FILES = 64
+
+# Format of the --profile JSON report
+PROFILE_VERSION = 1
+
+# Stages of a run in pipeline order, as listed in the --profile report
+PROFILE_STAGE_ORDER = ['load store', 'discover', 'parse', 'store', 'sort', 'group', 'write main CSV']
+
+# Allocation sites listed per stage boundary in the --profile-memory report
+MEMORY_TOP_SITES = 10
+
+# Seconds between --progress updates (stage changes are reported immediately)
+PROGRESS_INTERVAL = 0.5
+
+# Threads writing output files at the same time (--output-jobs)
+DEFAULT_OUTPUT_JOBS = 4
+
+# Common automation error patterns, checked in order (first match wins).
+# Each pattern is literal words joined by '.*', matched within a single line
+# of the lowercased description.
+ERROR_SUMMARY_PATTERNS = [
+    (r'timeout.*waiting.*element', 'Element timeout'),
+    (r'element.*not.*found', 'Element not found'),
+    (r'no.*such.*element', 'Element not found'),
+    (r'element.*not.*clickable', 'Element not clickable'),
+    (r'element.*not.*interactable', 'Element not interactable'),
+    (r'stale.*element', 'Stale element'),
+    (r'element.*not.*visible', 'Element not visible'),
+    (r'connection.*refused', 'Connection refused'),
+    (r'network.*error', 'Network error'),
+    (r'null.*pointer', 'Null pointer'),
+    (r'index.*out.*of.*bounds', 'Index out of bounds'),
+    (r'session.*not.*found', 'Session expired'),
+    (r'webdriver.*exception', 'WebDriver error'),
+    (r'screenshot.*failed', 'Screenshot failed'),
+    (r'page.*not.*loaded', 'Page load failed'),
+    (r'certificate.*error', 'Certificate error'),
+    (r'permission.*denied', 'Permission denied'),
+    (r'file.*not.*found', 'File not found'),
+    (r'invalid.*selector', 'Invalid selector'),
+    (r'function timed out', 'Function timeout'),
+    (r'scenario skipped', 'Test skipped'),
+]
+
+# Patterns for the specific rules ahead of the table, compiled once at import
+ELEMENT_NOT_DISPLAYED_RE = re.compile(r'element \("([^"]+)"\) still not displayed after \d+ms')
+ELEMENT_SELECTOR_RE = re.compile(r'element \("([^"]+)"\)')
+CANT_CALL_SELECTOR_RE = re.compile(r"can't call (\w+) on element with selector.*?contains\(@text[^\"]*\"([^\"]+)\"")
+CANT_CALL_RE = re.compile(r"can't call (\w+) on element")
+VERIFY_METHOD_RE = re.compile(r'at \w*\.(\w*verify\w*)')
+VERIFY_NOISE_RE = re.compile(r'verify|page|success|trx')
+EXPECTED_ACTUAL_RE = re.compile(r'expected.*?(\w+).*?actual.*?(\w+)')
+EXCEPTION_SUFFIX_RE = re.compile(r'Exception|Error')
+EXCEPTION_NAME_RE = re.compile(r'([A-Za-z0-9_]+(?:Exception|Error))')
+FAILED_CONTEXT_RE = re.compile(r'failed\s+(?:to\s+)?([a-zA-Z\s]{1,30})')
+EXCEPTION_NAME_CHARS = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_')
+
+def compile_error_patterns(patterns):
+    """Split each '.*'-joined error pattern into its literal words once, up front"""
+    compiled = []
+    for pattern, summary in patterns:
+        words = tuple(pattern.split('.*'))
+        if any(not word or any(c in word for c in '.^$*+?{}[]\\|()') for word in words):
+            raise ValueError(f"Error pattern must be literal words joined by '.*': {pattern}")
+        compiled.append((pattern, words, summary))
+    return compiled
+
+COMPILED_ERROR_PATTERNS = compile_error_patterns(ERROR_SUMMARY_PATTERNS)
+
+class RuleCounters:
+    """Hits, misses and time per extraction rule (--profile-rules).
+
+    The extraction functions start a RuleSplit per call and pass each rule's
+    result through check(). A rule is charged the time since the previous
+    check of the same call, so its regex and the handling of the rule before
+    it. Rules after the first hit of a first-match-wins function are not
+    run and not counted.
+    """
+    
+    def __init__(self):
+        # group -> rule -> [hits, misses, seconds]
+        self.stats = {}
+    
+    def start(self, group):
+        return RuleSplit(self.stats.setdefault(group, {}))
+    
+    def take(self):
+        """Return the counts so far and start over (a --jobs worker hands them back per batch)"""
+        stats, self.stats = self.stats, {}
+        return stats
+    
+    def merge(self, stats):
+        for group, rules in stats.items():
+            group_stats = self.stats.setdefault(group, {})
+            for rule, counts in rules.items():
+                total = group_stats.setdefault(rule, [0, 0, 0.0])
+                for position, count in enumerate(counts):
+                    total[position] += count
+    
+    def report(self):
+        """JSON-ready rules ranked by total time, slowest first"""
+        ranked = []
+        for group, rules in self.stats.items():
+            for rule, (hits, misses, seconds) in rules.items():
+                calls = hits + misses
+                ranked.append({
+                    'function': group,
+                    'rule': rule,
+                    'hits': hits,
+                    'misses': misses,
+                    'hit_rate': round(hits / calls, 4) if calls else 0,
+                    'total_ms': round(seconds * 1000, 3),
+                    'us_per_call': round(seconds * 1e6 / calls, 3) if calls else 0,
+                })
+        ranked.sort(key=lambda entry: entry['total_ms'], reverse=True)
+        return ranked
+
+class RuleSplit:
+    """Rule checks of one extraction call"""
+    __slots__ = ('rules', 'last')
+    
+    def __init__(self, rules):
+        self.rules = rules
+        self.last = time.perf_counter()
+    
+    def check(self, rule, result, hit=None):
+        """Count rule as a hit if result (or hit, when given) is true; returns result"""
+        now = time.perf_counter()
+        counts = self.rules.get(rule)
+        if counts is None:
+            counts = self.rules[rule] = [0, 0, 0.0]
+        counts[0 if (result if hit is None else hit) else 1] += 1
+        counts[2] += now - self.last
+        self.last = now
+        return result
+
+class NoRuleCounters:
+    """Stand-in for RuleCounters when rules are not counted: checks pass results straight through"""
+    
+    def start(self, group):
+        return self
+    
+    def check(self, rule, result, hit=None):
+        return result
+
+# Counters the extraction functions report to; a RuleCounters during a --profile-rules run
+RULE_COUNTERS = NoRuleCounters()
+
+def enable_rule_counters():
+    global RULE_COUNTERS
+    RULE_COUNTERS = RuleCounters()
+    return RULE_COUNTERS
+
+def disable_rule_counters():
+    global RULE_COUNTERS
+    RULE_COUNTERS = NoRuleCounters()
+
+def words_in_line_order(text, words):
+    """Return True if words occur in order on one line of text.
+
+    Same result as re.search('.*'.join(words), text), but runs in linear
+    time: each line is checked once with str.find instead of backtracking
+    '.*' over long single-line stack traces.
+    """
+    for word in words:
+        if word not in text:
+            return False
+    first = words[0]
+    pos = text.find(first)
+    while pos >= 0:
+        line_end = text.find('\n', pos)
+        if line_end < 0:
+            line_end = len(text)
+        # The earliest first word on a line gives the best chance for the rest
+        cursor = pos + len(first)
+        for word in words[1:]:
+            cursor = text.find(word, cursor, line_end)
+            if cursor < 0:
+                break
+            cursor += len(word)
+        else:
+            return True
+        pos = text.find(first, line_end + 1)
+    return False
+
+def find_exception_name(desc):
+    """Leftmost match of EXCEPTION_NAME_RE without trying every start position.
+
+    A match must end in 'Exception'/'Error' preceded by at least one name
+    character, so jump to the first such suffix and match from the start
+    of its word.
+    """
+    for suffix_match in EXCEPTION_SUFFIX_RE.finditer(desc):
+        start = suffix_match.start()
+        if start == 0 or desc[start - 1] not in EXCEPTION_NAME_CHARS:
+            continue
+        while start > 0 and desc[start - 1] in EXCEPTION_NAME_CHARS:
+            start -= 1
+        return EXCEPTION_NAME_RE.match(desc, start).group(1)
+    return None
+
 def extract_error_summary(desc):
     """Extract a short error summary from the description"""
     if not desc:
         return ""
     
+    rules = RULE_COUNTERS.start('extract_error_summary')
+    
     # Convert to lowercase for easier matching
     desc_lower = desc.lower()
     
     # Look for specific WebDriver element errors with selectors
-    element_selector_match = re.search(r'element \("([^"]+)"\) still not displayed after \d+ms', desc)
+    element_selector_match = rules.check('element not displayed', ELEMENT_NOT_DISPLAYED_RE.search(desc))
     if element_selector_match:
         selector = element_selector_match.group(1)
         # Extract meaningful part of selector
@@ -44,38 +301,47 @@ def extract_error_summary(desc):
         return f"Element '{element_name}' not displayed"
     
     # Look for element not clickable/interactable errors
-    not_clickable_match = re.search(r'element \("([^"]+)"\).*not clickable', desc_lower)
-    if not_clickable_match:
-        selector = not_clickable_match.group(1)
-        element_name = selector.replace('~sdet-', '').replace('~', '')[:20]
-        return f"Element '{element_name}' not clickable"
+    if 'not clickable' in desc_lower:
+        pos = desc_lower.find('element ("')
+        while pos >= 0:
+            selector_match = ELEMENT_SELECTOR_RE.match(desc_lower, pos)
+            if selector_match:
+                line_end = desc_lower.find('\n', selector_match.end())
+                if line_end < 0:
+                    line_end = len(desc_lower)
+                if desc_lower.find('not clickable', selector_match.end(), line_end) >= 0:
+                    rules.check('element not clickable', True)
+                    element_name = selector_match.group(1).replace('~sdet-', '').replace('~', '')[:20]
+                    return f"Element '{element_name}' not clickable"
+            pos = desc_lower.find('element ("', pos + 1)
+    rules.check('element not clickable', False)
     
     # Look for "Can't call" errors with method and selector
-    cant_call_match = re.search(r"can't call (\w+) on element with selector.*?contains\(@text[^\"]*\"([^\"]+)\"", desc_lower)
+    cant_call_match = rules.check("can't call with text", CANT_CALL_SELECTOR_RE.search(desc_lower))
     if cant_call_match:
         method = cant_call_match.group(1)
         text_content = cant_call_match.group(2)[:30]
         return f"Can't {method} element with text '{text_content}'"
     
     # Look for generic "Can't call" errors
-    cant_call_generic = re.search(r"can't call (\w+) on element", desc_lower)
+    cant_call_generic = rules.check("can't call", CANT_CALL_RE.search(desc_lower))
     if cant_call_generic:
         method = cant_call_generic.group(1)
         return f"Can't {method} element"
     
     # Look for AssertionError with more context
-    if 'assertionerror' in desc_lower:
+    if rules.check('assertion error', 'assertionerror' in desc_lower):
         # Try to find what was being verified
-        verify_match = re.search(r'at \w*\.(\w*verify\w*)', desc_lower)
+        verify_match = VERIFY_METHOD_RE.search(desc_lower) if 'verify' in desc_lower else None
         if verify_match:
             verify_method = verify_match.group(1)
             # Clean up method name
-            clean_method = re.sub(r'verify|page|success|trx', '', verify_method).strip()
+            clean_method = VERIFY_NOISE_RE.sub('', verify_method).strip()
             if clean_method:
                 return f"Assertion failed: {clean_method[:20]}"
         
         # Look for expected vs actual values
-        expected_match = re.search(r'expected.*?(\w+).*?actual.*?(\w+)', desc_lower)
+        expected_match = EXPECTED_ACTUAL_RE.search(desc_lower) if 'actual' in desc_lower else None
         if expected_match:
             expected = expected_match.group(1)
             actual = expected_match.group(2)
@@ -83,40 +349,14 @@ def extract_error_summary(desc):
         
         return "Assertion failed"
     
-    # Look for common automation error patterns
-    error_patterns = [
-        (r'timeout.*waiting.*element', 'Element timeout'),
-        (r'element.*not.*found', 'Element not found'),
-        (r'no.*such.*element', 'Element not found'),
-        (r'element.*not.*clickable', 'Element not clickable'),
-        (r'element.*not.*interactable', 'Element not interactable'),
-        (r'stale.*element', 'Stale element'),
-        (r'element.*not.*visible', 'Element not visible'),
-        (r'connection.*refused', 'Connection refused'),
-        (r'network.*error', 'Network error'),
-        (r'null.*pointer', 'Null pointer'),
-        (r'index.*out.*of.*bounds', 'Index out of bounds'),
-        (r'session.*not.*found', 'Session expired'),
-        (r'webdriver.*exception', 'WebDriver error'),
-        (r'screenshot.*failed', 'Screenshot failed'),
-        (r'page.*not.*loaded', 'Page load failed'),
-        (r'certificate.*error', 'Certificate error'),
-        (r'permission.*denied', 'Permission denied'),
-        (r'file.*not.*found', 'File not found'),
-        (r'invalid.*selector', 'Invalid selector'),
-        (r'function timed out', 'Function timeout'),
-        (r'scenario skipped', 'Test skipped'),
-    ]
-    
     # Check for specific error patterns
-    for pattern, summary in error_patterns:
-        if re.search(pattern, desc_lower):
+    for pattern, words, summary in COMPILED_ERROR_PATTERNS:
+        if rules.check(pattern, words_in_line_order(desc_lower, words)):
             return summary
     
     # Look for exception types
-    exception_match = re.search(r'([A-Za-z0-9_]+(?:Exception|Error))', desc)
-    if exception_match:
-        exception_name = exception_match.group(1)
+    exception_name = rules.check('exception name', find_exception_name(desc))
+    if exception_name:
         # Simplify common exception names
         if 'TimeoutException' in exception_name:
             return 'Timeout error'
@@ -132,7 +372,7 @@ def extract_error_summary(desc):
             return exception_name.replace('Exception', ' error').replace('Error', ' error')
     
     # Look for "failed" keyword with context
-    failed_match = re.search(r'failed\s+(?:to\s+)?([a-zA-Z\s]{1,30})', desc_lower)
+    failed_match = rules.check('failed to', FAILED_CONTEXT_RE.search(desc_lower))
     if failed_match:
         context = failed_match.group(1).strip()
         return f"Failed to {context[:25]}"
@@ -147,8 +387,10 @@ def extract_error_summary(desc):
             summary = ' '.join(words)
             if len(summary) > 60:
                 summary = summary[:57] + '...'
+            rules.check('first line', True)
             return summary
     
+    rules.check('first line', False)
     return "Unknown error"
 
 def extract_test_properties(name, ntc_id=None):
@@ -168,35 +410,37 @@ def extract_test_properties(name, ntc_id=None):
         'Test Case ID': ""
     }
     
+    rules = RULE_COUNTERS.start('extract_test_properties')
+    
     # Extract App Version (e.g., 2.81.0)
-    app_version_match = re.search(r'(\d+\.\d+\.\d+)', name)
+    app_version_match = rules.check('app version', re.search(r'(\d+\.\d+\.\d+)', name))
     if app_version_match:
         properties['App Version'] = app_version_match.group(1)
     
     # Extract Tribe Short and Squad Name (e.g., FS Wealth)
-    tribe_squad_match = re.search(r'- ([A-Z]+) ([A-Za-z]+) -', name)
+    tribe_squad_match = rules.check('tribe and squad', re.search(r'- ([A-Z]+) ([A-Za-z]+) -', name))
     if tribe_squad_match:
         properties['Tribe Short'] = tribe_squad_match.group(1)
         properties['Squad Name'] = tribe_squad_match.group(2)
     
     # Extract OS Name (e.g., DANA CICIL, DANA+ & Reksadana)
-    os_name_match = re.search(r'- OS ([^-]+) -', name)
+    os_name_match = rules.check('os name', re.search(r'- OS ([^-]+) -', name))
     if os_name_match:
         properties['OS Name'] = os_name_match.group(1).strip()
     
     # Extract Tribe Name (e.g., Financial Service)
     # Use the same logic as extract_tribe_name_from_archive()
-    match = re.search(r'- OS [^-]+ - ([^-]+)', name)
+    match = rules.check('tribe name', re.search(r'- OS [^-]+ - ([^-]+)', name))
     if match:
         properties['Tribe Name'] = match.group(1).strip()
     else:
         # fallback: try to get before last '('
-        match2 = re.search(r'-\s*([^-()]+)\s*\(', name)
+        match2 = rules.check('tribe name before (', re.search(r'-\s*([^-()]+)\s*\(', name))
         if match2:
             properties['Tribe Name'] = match2.group(1).strip()
     
     # Extract Test Environment and Platform (e.g., SIT, Android) - allow multi-word and flexible spacing
-    env_platform_match = re.search(r'\(([^,]+),\s*([^)]+)\)', name)
+    env_platform_match = rules.check('environment and platform', re.search(r'\(([^,]+),\s*([^)]+)\)', name))
     if env_platform_match:
         properties['Test Environment'] = env_platform_match.group(1).strip()
         properties['Platform'] = env_platform_match.group(2).strip()
@@ -206,12 +450,12 @@ def extract_test_properties(name, ntc_id=None):
     if ntc_id and ntc_id.startswith('NTC-'):
         properties['Test Case ID'] = ntc_id
     else:
-        tag_id_match = re.search(r'NTC[ -]+(\d+)', name)
+        tag_id_match = rules.check('ntc id', re.search(r'NTC[ -]+(\d+)', name))
         if tag_id_match:
             properties['Test Case ID'] = f"NTC-{tag_id_match.group(1)}"
         else:
             # fallback to previous pattern
-            tag_id_match2 = re.search(r'- ([A-Z]+) - (\d+)', name)
+            tag_id_match2 = rules.check('tag - id', re.search(r'- ([A-Z]+) - (\d+)', name))
             if tag_id_match2:
                 tag = tag_id_match2.group(1)
                 id_num = tag_id_match2.group(2)
@@ -262,631 +506,1377 @@ def extract_tribe_name_from_archive(archive_val):
         return match2.group(1).strip()
     return ''
 
+# Date formats seen in Notion exports, tried before falling back to dateutil:
+# "May 19, 2025 3:04 PM", "May 19, 2025" and ISO "2025-05-19T15:04:00" / "2025-05-19"
+NOTION_DATE_RE = re.compile(r'([A-Za-z]{3,9}) (\d{1,2}), (\d{4})(?: (\d{1,2}):(\d{2}) ?([AaPp][Mm]))?', re.ASCII)
+ISO_DATE_RE = re.compile(r'(\d{4})-(\d{2})-(\d{2})(?:[T ](\d{2}):(\d{2})(?::(\d{2}))?)?', re.ASCII)
+MONTH_NUMBERS = {
+    name: number
+    for number, names in enumerate([
+        ('january', 'jan'), ('february', 'feb'), ('march', 'mar'), ('april', 'apr'),
+        ('may',), ('june', 'jun'), ('july', 'jul'), ('august', 'aug'),
+        ('september', 'sep'), ('october', 'oct'), ('november', 'nov'), ('december', 'dec'),
+    ], 1)
+    for name in names
+}
+DATE_CACHE_SIZE = 8192
+
+def parse_known_date_format(date_str):
+    """Parse the Notion/ISO formats directly; returns None for anything else"""
+    match = NOTION_DATE_RE.fullmatch(date_str)
+    if match:
+        month = MONTH_NUMBERS.get(match.group(1).lower())
+        if month is None:
+            return None
+        hour, minute = 0, 0
+        if match.group(4):
+            hour, minute = int(match.group(4)), int(match.group(5))
+            # Leave unusual 12-hour clock values to dateutil
+            if not 1 <= hour <= 12:
+                return None
+            if match.group(6).lower() == 'pm':
+                hour = hour % 12 + 12
+            else:
+                hour = hour % 12
+        return datetime(int(match.group(3)), month, int(match.group(2)), hour, minute)
+    match = ISO_DATE_RE.fullmatch(date_str)
+    if match:
+        year, month, day, hour, minute, second = (int(g) if g else 0 for g in match.groups())
+        return datetime(year, month, day, hour, minute, second)
+    return None
+
+# Only the fixed-format fast path is memoized. dateutil fills a missing year,
+# month or day from today, so caching its answers in the long-lived --worker
+# process would keep serving the first run's date to later requests.
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def cached_known_date(date_str):
+    """Memoized fixed-format parse; returns None when dateutil has to decide"""
+    try:
+        return parse_known_date_format(date_str)
+    except ValueError:
+        # Out-of-range day/month etc. - let dateutil decide
+        return None
+
+def parse_date_or_none(date_str, fuzzy):
+    """Parse a date string, returning None when it is not a date"""
+    dt = cached_known_date(date_str)
+    if dt is None:
+        try:
+            dt = dateutil.parser.parse(date_str, fuzzy=fuzzy)
+        except (ValueError, OverflowError):
+            return None
+    return dt
+
+def parse_history_date(date_str, fuzzy=False):
+    """Parse a history date string, raising ValueError if it is not a date (like dateutil)"""
+    dt = parse_date_or_none(date_str, fuzzy)
+    if dt is None:
+        raise ValueError(f"Unknown date format: {date_str}")
+    return dt
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def normalize_known_date(date_str):
+    """Memoized ISO form of a fixed-format date, or None when dateutil has to decide"""
+    dt = cached_known_date(date_str)
+    if dt is None:
+        return None
+    return dt.strftime('%Y-%m-%dT%H:%M:%S')
+
 def normalize_history_date(date_str):
     # Try to parse various date formats and output ISO 8601 (YYYY-MM-DDTHH:MM:SS)
-    import dateutil.parser
-    try:
-        dt = dateutil.parser.parse(date_str, fuzzy=True)
-        return dt.strftime('%Y-%m-%dT%H:%M:%S')
-    except Exception:
+    normalized = normalize_known_date(date_str)
+    if normalized is not None:
+        return normalized
+    dt = parse_date_or_none(date_str, True)
+    if dt is None:
         return date_str
+    return dt.strftime('%Y-%m-%dT%H:%M:%S')
+
+# Key/value fields embedded in log descriptions, in output order
+DESCRIPTION_FIELD_KEYS = [
+    'Device', 'OS', 'App', 'Phone Number', 'Location', 'Step', 'Error',
+    'Jenkins Build Number', 'Jenkins URL', 'Triggered by'
+]
+DESCRIPTION_KEY_RE = re.compile('(' + '|'.join(re.escape(k) for k in DESCRIPTION_FIELD_KEYS) + '):')
+FIELD_VALUE_RE = re.compile(r'\s*([^\n]+)')
+LEADING_SPACE_RE = re.compile(r'\s*')
+NEWLINE_WORD_RE = re.compile(r'\n\w')
+
+def match_error_value(desc, pos):
+    """Error value starting at pos, as matched by r'\s*([\s\S]+?)(?:\n\w|$)'.
+
+    The value runs until the next line that starts with a word character.
+    Finding that line directly avoids the lazy regex testing every character
+    of long stack traces. Returns None when nothing follows pos.
+    """
+    end = len(desc)
+    if pos >= end:
+        return None
+    start = LEADING_SPACE_RE.match(desc, pos).end()
+    if start == end:
+        # Only whitespace left; the regex backtracks to capture its last character
+        return desc[end - 1:]
+    stop = NEWLINE_WORD_RE.search(desc, start + 1)
+    if stop:
+        return desc[start:stop.start()]
+    if desc[end - 1] == '\n' and end - 1 > start:
+        return desc[start:end - 1]
+    return desc[start:]
 
 def parse_description_fields(desc):
-    # Extract fields from description block
-    fields = {
-        'Device': '', 'OS': '', 'App': '', 'Phone Number': '',
-        'Location': '', 'Step': '', 'Error': '',
-        'Jenkins Build Number': '', 'Jenkins URL': '', 'Triggered by': '',
-        'Description': ''
-    }
+    # Extract fields from description block in a single scan for "Key:" markers
+    fields = {k: '' for k in DESCRIPTION_FIELD_KEYS}
+    fields['Description'] = ''
     if not desc:
         return fields
-    # Device
-    m = re.search(r'Device:\s*([^\n]+)', desc)
-    if m: fields['Device'] = m.group(1).strip()
-    # OS
-    m = re.search(r'OS:\s*([^\n]+)', desc)
-    if m: fields['OS'] = m.group(1).strip()
-    # App
-    m = re.search(r'App:\s*([^\n]+)', desc)
-    if m: fields['App'] = m.group(1).strip()
-    # Phone Number
-    m = re.search(r'Phone Number:\s*([^\n]+)', desc)
-    if m: fields['Phone Number'] = m.group(1).strip()
-    # Location
-    m = re.search(r'Location:\s*([^\n]+)', desc)
-    if m: fields['Location'] = m.group(1).strip()
-    # Step
-    m = re.search(r'Step:\s*([^\n]+)', desc)
-    if m: fields['Step'] = m.group(1).strip()
-    # Error
-    m = re.search(r'Error:\s*([\s\S]+?)(?:\n\w|$)', desc)
-    if m: fields['Error'] = m.group(1).strip()
-    # Jenkins Build Number
-    m = re.search(r'Jenkins Build Number:\s*([^\n]+)', desc)
-    if m: fields['Jenkins Build Number'] = m.group(1).strip()
-    # Jenkins URL
-    m = re.search(r'Jenkins URL:\s*([^\n]+)', desc)
-    if m: fields['Jenkins URL'] = m.group(1).strip()
-    # Triggered by
-    m = re.search(r'Triggered by:\s*([^\n]+)', desc)
-    if m: fields['Triggered by'] = m.group(1).strip()
-    # Remaining description (remove all above fields)
-    desc_clean = desc
-    for k in fields:
-        if k != 'Description' and fields[k]:
-            desc_clean = re.sub(rf'{k}:.*', '', desc_clean)
-    fields['Description'] = desc_clean.strip()
+    key_matches = list(DESCRIPTION_KEY_RE.finditer(desc))
+    # Each field takes the first marker that is followed by a value
+    found = set()
+    for m in key_matches:
+        key = m.group(1)
+        if key in found:
+            continue
+        if key == 'Error':
+            value = match_error_value(desc, m.end())
+        else:
+            value_match = FIELD_VALUE_RE.match(desc, m.end())
+            value = value_match.group(1) if value_match else None
+        if value is not None:
+            fields[key] = value.strip()
+            found.add(key)
+    # Remaining description: drop each line from the first marker of a non-empty field onwards
+    pieces = []
+    last = 0
+    for m in key_matches:
+        start = m.start()
+        if start < last or not fields[m.group(1)]:
+            continue
+        pieces.append(desc[last:start])
+        last = desc.find('\n', start)
+        if last < 0:
+            last = len(desc)
+    pieces.append(desc[last:])
+    fields['Description'] = ''.join(pieces).strip()
     return fields
 
 def extract_ntc_id(name):
     m = re.search(r'(NTC-\d+)', name)
     return m.group(1) if m else ''
 
+@lru_cache(maxsize=1024)
+def cached_test_properties(name):
+    """extract_test_properties as a tuple, shared by every row of the same submission"""
+    return tuple(extract_test_properties(name))
+
 def parse_md_entry_block(entry, is_main, main_name, main_url, main_id, source_file, header_name=None):
-    data = {h: '' for h in MD_HEADERS}
-    data['Source File'] = source_file
+    row_id = name = archive_url = history_date = status = tested_by = type_testing = description = ''
     archive_val = ''
     header_for_parse = header_name if header_name else ''
+    rules = RULE_COUNTERS.start('parse_md_entry_block')
     if is_main:
-        name_match = re.search(r"^#\s*(.*)", entry, re.MULTILINE)
+        name_match = rules.check('main name', re.search(r"^#\s*(.*)", entry, re.MULTILINE))
         if name_match:
-            data['Name'] = name_match.group(1).strip()
-        archive_match = re.search(r"Archive Testcase:.*?\((https?://[^\s)]+)\)", entry)
+            name = name_match.group(1).strip()
+        archive_match = rules.check('archive testcase', re.search(r"Archive Testcase:.*?\((https?://[^\s)]+)\)", entry))
         if archive_match:
-            data['Archive Testcase URL'] = archive_match.group(1).strip()
+            archive_url = archive_match.group(1).strip()
             archive_val = archive_match.group(0)
-        id_match = re.search(r"^ID:\s*(HAT-\d+)", entry, re.MULTILINE)
+        id_match = rules.check('main id', re.search(r"^ID:\s*(HAT-\d+)", entry, re.MULTILINE))
         if id_match:
-            data['ID'] = id_match.group(1).strip()
+            row_id = id_match.group(1).strip()
     else:
         # For log, try to extract table fields
         # Table row: | Tested By | ... | Status | ... | Testing Type | ... | Description | ... |
-        table_match = re.search(r"\|\s*Tested By\s*\|\s*(.*?)\s*\|.*?\|\s*Status\s*\|\s*(.*?)\s*\|.*?\|\s*Testing Type\s*\|\s*(.*?)\s*\|.*?\|\s*Description\s*\|\s*(.*?)\s*\|", entry, re.DOTALL)
+        table_match = rules.check('log table', re.search(r"\|\s*Tested By\s*\|\s*(.*?)\s*\|.*?\|\s*Status\s*\|\s*(.*?)\s*\|.*?\|\s*Testing Type\s*\|\s*(.*?)\s*\|.*?\|\s*Description\s*\|\s*(.*?)\s*\|", entry, re.DOTALL))
         if table_match:
-            data['Tested by'] = table_match.group(1).strip()
-            data['Status'] = table_match.group(2).strip()
-            data['Type Testing'] = table_match.group(3).strip()
-            data['Description'] = table_match.group(4).strip()
+            tested_by = table_match.group(1).strip()
+            status = table_match.group(2).strip()
+            type_testing = table_match.group(3).strip()
+            description = table_match.group(4).strip()
         # fallback for log name
-        data['Name'] = f"{main_name}"
-        data['Archive Testcase URL'] = main_url
-        data['ID'] = main_id
+        name = f"{main_name}"
+        archive_url = main_url
+        row_id = main_id
         archive_val = main_name  # fallback, not used for log
     # For both main and log, fallback for History Date
-    if not data['History Date']:
-        date_match = re.search(r"^(?:History Date|Log on):\s*(.*)", entry, re.MULTILINE)
+    # (the date rules are charged after normalizing, which can fall back to dateutil)
+    date_match = re.search(r"^(?:History Date|Log on):\s*(.*)", entry, re.MULTILINE)
+    if date_match:
+        history_date = normalize_history_date(date_match.group(1).strip())
+    rules.check('history date', date_match)
+    if not history_date and not is_main:
+        # Ensure log rows always have History Date
+        date_match = re.search(r"^### Log on (.*)", entry, re.MULTILINE)
         if date_match:
-            data['History Date'] = normalize_history_date(date_match.group(1).strip())
+            history_date = normalize_history_date(date_match.group(1).strip())
+        rules.check('log on date', date_match)
     # For both main and log, fallback for Status, Tested by, Type Testing
-    if not data['Status']:
-        status_match = re.search(r"^(?:Status|\| Status \|):\s*(.*?)(?:\s*\|)?$", entry, re.MULTILINE)
+    if not status:
+        status_match = rules.check('status', re.search(r"^(?:Status|\| Status \|):\s*(.*?)(?:\s*\|)?$", entry, re.MULTILINE))
         if status_match:
-            data['Status'] = status_match.group(1).strip()
-    if not data['Tested by']:
-        tested_by_match = re.search(r"^(?:Tested by|\| Tested By \|):\s*(.*?)(?:\s*\|)?$", entry, re.MULTILINE)
+            status = status_match.group(1).strip()
+    if not tested_by:
+        tested_by_match = rules.check('tested by', re.search(r"^(?:Tested by|\| Tested By \|):\s*(.*?)(?:\s*\|)?$", entry, re.MULTILINE))
         if tested_by_match:
-            data['Tested by'] = tested_by_match.group(1).strip()
-    if not data['Type Testing']:
-        type_testing_match = re.search(r"^(?:Type Testing|\| Testing Type \|):\s*(.*?)(?:\s*\|)?$", entry, re.MULTILINE)
+            tested_by = tested_by_match.group(1).strip()
+    if not type_testing:
+        type_testing_match = rules.check('type testing', re.search(r"^(?:Type Testing|\| Testing Type \|):\s*(.*?)(?:\s*\|)?$", entry, re.MULTILINE))
         if type_testing_match:
-            data['Type Testing'] = type_testing_match.group(1).strip()
+            type_testing = type_testing_match.group(1).strip()
     # Always extract from header/Archive Testcase value
-    parse_source = header_for_parse or archive_val or data['Name']
-    name_props = extract_test_properties(parse_source)
-    for i, h in enumerate(['App Version', 'Tribe Short', 'Squad Name', 'OS Name', 'Tribe Name', 'Test Environment', 'Platform', 'Test Case ID']):
-        data[h] = name_props[i]
+    parse_source = header_for_parse or archive_val or name
+    # Calls into the other counted functions are charged here as a whole;
+    # extract_test_properties itself only runs on a cache miss
+    name_props = cached_test_properties(parse_source)
+    rules.check('test properties', name_props, any(name_props))
     
     # Parse description fields
-    desc_fields = parse_description_fields(data['Description'])
-    for k in desc_fields:
-        data[k] = desc_fields[k]
+    desc_fields = parse_description_fields(description)
+    rules.check('description fields', desc_fields, any(desc_fields[k] for k in DESCRIPTION_FIELD_KEYS))
     
     # Extract error summary from Error field or Description only if status indicates failure
-    status = data.get('Status', '').lower()
-    if status and status not in ['passed', 'pass', 'success', 'successful']:
-        error_text = data.get('Error', '') or data.get('Description', '')
-        data['Error Summary'] = extract_error_summary(error_text)
+    lowered_status = status.lower()
+    if lowered_status and lowered_status not in ['passed', 'pass', 'success', 'successful']:
+        error_summary = rules.check('error summary', extract_error_summary(desc_fields['Error'] or desc_fields['Description']))
     else:
-        data['Error Summary'] = ''
+        error_summary = ''
     
-    data['Description'] = clean_description(data['Description'])
     # Index will be set later
-    return [data[h] for h in MD_HEADERS]
+    return MDRow(
+        row_id, name, archive_url, history_date, status,
+        *[desc_fields[k] for k in DESCRIPTION_FIELD_KEYS],
+        tested_by, type_testing, *name_props,
+        error_summary, source_file, clean_description(desc_fields['Description']), ''
+    )
+
+# Start of each log block; a text-mode read turns \r\n and bare \r into \n, so match those too
+LOG_BLOCK_SEPARATOR_RE = re.compile(rb'\r\n?### Log on|\n### Log on')
+MD_HEADER_RE = re.compile(r'^#\s*(.*)')
+
+def decode_md_block(raw):
+    """Decode one block the way a text-mode read of the file would"""
+    text = raw.decode('utf-8')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+def iter_md_entry_blocks(md_file_path):
+    """Yield a submission file's main entry block, then each '### Log on' block.
+
+    Block boundaries are found on a memory map of the file and only the
+    current block is copied out and decoded, so large submissions never
+    exist as one big string.
+    """
+    with open(md_file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # mmap cannot map an empty file
+            yield ''
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield from iter_md_buffer_blocks(mm)
+
+def iter_md_buffer_blocks(buffer):
+    """Yield the entry blocks of a file's bytes (a memory map or an uploaded file)"""
+    start = 0
+    sep_match = None
+    for sep_match in LOG_BLOCK_SEPARATOR_RE.finditer(buffer):
+        end = sep_match.start()
+        yield decode_md_block(buffer[start:end])
+        start = end
+    # Drop the last match so no buffer export keeps a memory map open
+    del sep_match
+    yield decode_md_block(buffer[start:])
 
 def parse_single_md_file(md_file_path):
+    return parse_md_entry_blocks(iter_md_entry_blocks(md_file_path), os.path.basename(md_file_path))
+
+def parse_md_content(name, data):
+    """Parse one MD file given as bytes, e.g. uploaded through the web UI; name is its (relative) path"""
+    return parse_md_entry_blocks(iter_md_buffer_blocks(data), os.path.basename(name))
+
+def parse_md_entry_blocks(entry_blocks, source_file):
+    """Rows of one submission file from its entry blocks"""
     rows = []
-    source_file = os.path.basename(md_file_path)
     header_name = None
-    with open(md_file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+    main_block = next(entry_blocks)
+    next_block = next(entry_blocks, None)
     # Get header line (first line, always starts with # Submission ...)
-    header_match = re.match(r'^#\s*(.*)', content)
+    header_match = MD_HEADER_RE.match(main_block)
+    if header_match and header_match.end() == len(main_block) and next_block is not None:
+        # A header with nothing after '#' runs on into the first log line
+        header_match = MD_HEADER_RE.match(main_block + next_block)
     if header_match:
         header_name = header_match.group(1).strip()
-    log_sep = "\n### Log on"
-    parts = re.split(f"({log_sep})", content)
-    entry_blocks = []
-    if not parts:
-        return []
-    current_block = parts[0]
-    for i in range(1, len(parts), 2):
-        if i+1 < len(parts):
-            entry_blocks.append(current_block)
-            current_block = parts[i] + parts[i+1]
-        else:
-            current_block += parts[i]
-    entry_blocks.append(current_block)
-    main_name, main_url, main_id = '', '', ''
-    main_row = None
     log_rows = []
-    if entry_blocks:
-        main_row = parse_md_entry_block(entry_blocks[0], True, '', '', '', source_file, header_name)
-        main_id = main_row[0]
-        main_name = main_row[1] if len(main_row) > 1 else ''
-        main_url = main_row[2] if len(main_row) > 2 else ''
-        for i in range(1, len(entry_blocks)):
-            log_row = parse_md_entry_block(entry_blocks[i], False, main_name, main_url, main_id, source_file, header_name)
-            # Ensure log_row always has History Date
-            if not log_row[3]:
-                date_match = re.search(r"^### Log on (.*)", entry_blocks[i], re.MULTILINE)
-                if date_match:
-                    log_row[3] = normalize_history_date(date_match.group(1).strip())
-            log_rows.append(log_row)
-        # Deduplication: if the latest log entry (by History Date) matches the main entry, keep only the log entry
-        if log_rows:
-            # Sort log_rows by History Date descending
-            from dateutil.parser import parse as dtparse
-            log_rows_sorted = sorted(log_rows, key=lambda r: dtparse(r[3]), reverse=True)
-            latest_log = log_rows_sorted[0]
-            # If latest log matches main entry (History Date and Status), only keep logs
-            if latest_log[3] == main_row[3] and latest_log[4] == main_row[4]:
-                rows.extend(log_rows)
-            else:
-                rows.append(main_row)
-                rows.extend(log_rows)
+    main_row = parse_md_entry_block(main_block, True, '', '', '', source_file, header_name)
+    while next_block is not None:
+        log_rows.append(parse_md_entry_block(next_block, False, main_row.name, main_row.archive_url, main_row.id, source_file, header_name))
+        next_block = next(entry_blocks, None)
+    # Deduplication: if the latest log entry (by History Date) matches the main entry, keep only the log entry
+    if log_rows:
+        # Sort log_rows by History Date descending
+        log_rows_sorted = sorted(log_rows, key=lambda r: parse_history_date(r.history_date), reverse=True)
+        latest_log = log_rows_sorted[0]
+        # If latest log matches main entry (History Date and Status), only keep logs
+        if latest_log.history_date == main_row.history_date and latest_log.status == main_row.status:
+            rows.extend(log_rows)
         else:
             rows.append(main_row)
+            rows.extend(log_rows)
+    else:
+        rows.append(main_row)
     return rows
 
-def generate_passrate_analysis(processed_rows, output_dir):
-    """Generate submission pass rate analysis CSV similar to FS Submission Passrate format"""
-    if len(processed_rows) <= 1:  # Only headers
-        return None
+def parse_md_file_batch(md_file_paths, count_rules=False):
+    """Parse several files in one worker task; with count_rules also return the worker's rule counts"""
+    if not count_rules:
+        return [parse_single_md_file(path) for path in md_file_paths]
+    counters = RULE_COUNTERS if isinstance(RULE_COUNTERS, RuleCounters) else enable_rule_counters()
+    return [parse_single_md_file(path) for path in md_file_paths], counters.take()
+
+def iter_parsed_md_files(md_file_paths, jobs=1):
+    """Yield each file's rows in input order, optionally parsing on a process pool.
+
+    md_file_paths may be a generator (e.g. from iter_md_files); files are
+    handed to workers as soon as they are discovered, in batches of
+    PARSE_BATCH_SIZE to keep per-task IPC overhead small, with only a few
+    batches in flight at a time.
+    """
+    if jobs is None or jobs <= 0:
+        jobs = os.cpu_count() or 1
+    if jobs <= 1:
+        for path in md_file_paths:
+            yield parse_single_md_file(path)
+        return
+    # Workers count rules in their own process and send the counts back with each batch
+    counters = RULE_COUNTERS if isinstance(RULE_COUNTERS, RuleCounters) else None
+    def batch_result(future):
+        if counters is None:
+            return future.result()
+        results, stats = future.result()
+        counters.merge(stats)
+        return results
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = deque()
+        batch = []
+        for path in md_file_paths:
+            batch.append(path)
+            if len(batch) >= PARSE_BATCH_SIZE:
+                pending.append(executor.submit(parse_md_file_batch, batch, counters is not None))
+                batch = []
+                if len(pending) >= jobs * 2:
+                    yield from batch_result(pending.popleft())
+        if batch:
+            pending.append(executor.submit(parse_md_file_batch, batch, counters is not None))
+        while pending:
+            yield from batch_result(pending.popleft())
+
+def iter_parsed_md_uploads(uploads):
+    """Yield each uploaded file's rows as soon as it has arrived; uploads yields (name, bytes)"""
+    for name, data in uploads:
+        yield parse_md_content(name, data)
+
+def parse_md_files(md_file_paths, jobs=1):
+    """Parse MD files, optionally spread across a process pool.
+
+    Returns one list of rows per file, in the same order as md_file_paths,
+    so the result is identical to parsing the files one after another.
+    """
+    return list(iter_parsed_md_files(md_file_paths, jobs))
+
+def iter_md_files(folder_path, include=None, exclude=None, max_depth=0):
+    """Yield .md file paths under folder_path as they are found.
+
+    Walks with os.scandir, listing a folder's files before entering its
+    subfolders, so the top level keeps os.listdir order. max_depth=0 scans
+    folder_path only; None means no limit. include/exclude are glob
+    patterns matched against the path relative to folder_path, or against
+    the bare name for patterns without '/'. Excluded folders are not entered.
+    """
+    def matches(rel_path, name, patterns):
+        return any(fnmatch.fnmatch(rel_path if '/' in pattern else name, pattern) for pattern in patterns)
     
-    headers = processed_rows[0]
-    data_rows = processed_rows[1:]
-    
-    # Find column indices
-    name_idx = headers.index('Name') if 'Name' in headers else 1
-    status_idx = headers.index('Status') if 'Status' in headers else 4
-    history_date_idx = headers.index('History Date') if 'History Date' in headers else 3
-    os_name_idx = headers.index('OS Name') if 'OS Name' in headers else 20
-    platform_idx = headers.index('Platform') if 'Platform' in headers else 23
-    app_version_idx = headers.index('App Version') if 'App Version' in headers else 17
-    tribe_short_idx = headers.index('Tribe Short') if 'Tribe Short' in headers else 18
-    squad_name_idx = headers.index('Squad Name') if 'Squad Name' in headers else 19
-    tribe_name_idx = headers.index('Tribe Name') if 'Tribe Name' in headers else 21
-    test_env_idx = headers.index('Test Environment') if 'Test Environment' in headers else 22
-    archive_url_idx = headers.index('Archive Testcase URL') if 'Archive Testcase URL' in headers else 2
-    test_case_id_idx = headers.index('Test Case ID') if 'Test Case ID' in headers else 24
-    
-    # Group data by submission configuration
-    from collections import defaultdict
-    
-    # Group by: App Version + Tribe Short + OS Name + Tribe Name + Squad Name + Test Environment + Platform
-    submissions = defaultdict(lambda: defaultdict(list))
-    
-    for row in data_rows:
-        if len(row) <= max(name_idx, status_idx, history_date_idx, os_name_idx, platform_idx, test_case_id_idx):
+    stack = [(folder_path, '', 0)]
+    while stack:
+        dir_path, rel_dir, depth = stack.pop()
+        subdirs = []
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                    if exclude and matches(rel_path, entry.name, exclude):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        if max_depth is None or depth < max_depth:
+                            subdirs.append((entry.path, rel_path, depth + 1))
+                    elif entry.name.lower().endswith('.md') and entry.is_file():
+                        if not include or matches(rel_path, entry.name, include):
+                            yield entry.path
+        except OSError as e:
+            if depth == 0:
+                raise
+            print(f"⚠️  Skipping unreadable folder {dir_path}: {e}")
             continue
-            
+        # Reverse so the first subfolder is walked next
+        stack.extend(reversed(subdirs))
+
+def load_parse_cache(cache_path):
+    """Load cached parse results, returning an empty cache if missing, corrupt or outdated"""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        if cache.get('version') == PARSE_CACHE_VERSION:
+            return cache.get('entries', {})
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {}
+
+def save_parse_cache(cache_path, entries):
+    """Atomically write the parse cache so an interrupted run never leaves it half-written"""
+    cache_dir = os.path.dirname(cache_path)
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = cache_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': PARSE_CACHE_VERSION, 'entries': entries}, f)
+    os.replace(tmp_path, cache_path)
+
+def file_content_hash(path):
+    """SHA-1 of a file's bytes, read in 1 MB chunks"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def parse_md_files_cached(md_file_paths, cache_path, jobs=1, entries=None, progress=None):
+    """Parse MD files, reusing cached rows for files that have not changed.
+
+    A file is unchanged when its size and mtime match the cache entry, or,
+    failing that, when its content hash does (Notion re-exports rewrite
+    mtimes). Only the remaining files are parsed. Entries for files that
+    no longer exist are evicted.
+
+    entries, if given, is a cache already held in memory; it is updated in
+    place instead of being read from cache_path, which may then be None.
+    Such a cache only hashes files it already has an entry for, so new
+    files are read once, to parse them.
+    progress, a ProgressReporter, is given the chance to report (and a
+    worker run to be cancelled) while files are checked and parsed.
+    """
+    in_memory = entries is not None
+    if not in_memory:
+        entries = load_parse_cache(cache_path)
+    results = [None] * len(md_file_paths)
+    fresh_entries = {}
+    misses = []
+    for i, path in enumerate(md_file_paths):
+        if progress:
+            progress.report()
+        key = os.path.abspath(path)
+        stat = os.stat(path)
+        entry = entries.get(key)
+        if entry and entry.get('size') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns:
+            results[i] = [MDRow._make(row) for row in entry['rows']]
+            fresh_entries[key] = entry
+            continue
+        content_hash = file_content_hash(path) if entry or not in_memory else None
+        if entry and entry.get('sha1') == content_hash:
+            entry['size'] = stat.st_size
+            entry['mtime_ns'] = stat.st_mtime_ns
+            results[i] = [MDRow._make(row) for row in entry['rows']]
+            fresh_entries[key] = entry
+            continue
+        fresh_entries[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha1': content_hash, 'rows': None}
+        misses.append(i)
+    
+    parsed = iter_parsed_md_files([md_file_paths[i] for i in misses], jobs)
+    for i, file_rows in zip(misses, parsed):
+        if progress:
+            progress.report()
+        results[i] = file_rows
+        fresh_entries[os.path.abspath(md_file_paths[i])]['rows'] = file_rows
+    
+    # Keep entries for other folders sharing this cache, unless their file was deleted
+    evicted = 0
+    for key, entry in entries.items():
+        if key in fresh_entries:
+            continue
+        if os.path.exists(key):
+            fresh_entries[key] = entry
+        else:
+            evicted += 1
+    if in_memory:
+        entries.clear()
+        entries.update(fresh_entries)
+    if cache_path:
+        save_parse_cache(cache_path, fresh_entries)
+        print(f"🗃️  Parse cache: {len(md_file_paths) - len(misses)} files reused, {len(misses)} parsed, {evicted} evicted")
+    return results
+
+def iter_parsed_md_files_into_cache(md_file_paths, jobs, entries):
+    """iter_parsed_md_files that also fills an empty in-memory parse cache.
+
+    Files are still parsed as they are discovered; each one is recorded
+    with the size and mtime it had when found (and no hash, see
+    parse_md_files_cached) so the next run can reuse its rows.
+    """
+    found = deque()
+    def remember(paths):
+        for path in paths:
+            found.append((path, os.stat(path)))
+            yield path
+    for file_rows in iter_parsed_md_files(remember(md_file_paths), jobs):
+        path, stat = found.popleft()
+        entries[os.path.abspath(path)] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha1': None, 'rows': file_rows}
+        yield file_rows
+
+# Extra pass rate views for --passrate-by: name -> (first column label, columns forming the group key)
+PASSRATE_ROLLUPS = {
+    'tribe': ('Tribe Name', ['Tribe Name']),
+    'squad': ('Squad', ['Tribe Short', 'Squad Name']),
+    'platform': ('Platform', ['Platform']),
+    'app-version': ('App Version', ['App Version']),
+    'env': ('Test Environment', ['Test Environment']),
+}
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def known_history_day(date_str):
+    """Memoized calendar day of a fixed-format date, or None when dateutil has to decide"""
+    dt = cached_known_date(date_str)
+    return dt.date() if dt is not None else None
+
+def history_day(date_str):
+    """Calendar day of a History Date value, or None when it is empty or not a date"""
+    if not date_str:
+        return None
+    day = known_history_day(date_str)
+    if day is not None:
+        return day
+    dt = parse_date_or_none(date_str, False)
+    return dt.date() if dt is not None else None
+
+def format_passrate_day(day):
+    return day.strftime("%B %d, %Y") if day else "Unknown"  # Format: "May 19, 2025"
+
+def passrate_day_order(day):
+    # Undated entries come first, then days in calendar order
+    return (day is not None, day)
+
+class PassrateAccumulator:
+    """Aggregates rows one at a time into per-submission, per-day pass data.
+
+    Keeps only the NTC-ID sets and a representative row per submission day,
+    so memory grows with the number of test cases, not the length of history.
+    Rollups named in PASSRATE_ROLLUPS are fed from the same add() call.
+    
+    With a state_path, the sets and the materialized CSV rows of the last
+    run are loaded before the first row is added and saved again by
+    save_state(). The state belongs to the input files of the run that
+    saved it (sources, a PassrateSources): it is only loaded when this
+    run reads the same folder, every saved file unchanged, plus perhaps
+    new files. Rows of unchanged files then add nothing new, so
+    build_rows() reuses submissions no new file touched, extends those
+    that only gained later days and recomputes the rest, with the same
+    result as a full recompute. Otherwise the run starts empty.
+    """
+    
+    def __init__(self, headers=MD_HEADERS, rollups=(), state_path=None, sources=None):
+        # Find column indices
+        self.name_idx = headers.index('Name') if 'Name' in headers else 1
+        self.status_idx = headers.index('Status') if 'Status' in headers else 4
+        self.history_date_idx = headers.index('History Date') if 'History Date' in headers else 3
+        self.os_name_idx = headers.index('OS Name') if 'OS Name' in headers else 20
+        self.platform_idx = headers.index('Platform') if 'Platform' in headers else 23
+        self.app_version_idx = headers.index('App Version') if 'App Version' in headers else 17
+        self.tribe_short_idx = headers.index('Tribe Short') if 'Tribe Short' in headers else 18
+        self.squad_name_idx = headers.index('Squad Name') if 'Squad Name' in headers else 19
+        self.tribe_name_idx = headers.index('Tribe Name') if 'Tribe Name' in headers else 21
+        self.test_env_idx = headers.index('Test Environment') if 'Test Environment' in headers else 22
+        self.test_case_id_idx = headers.index('Test Case ID') if 'Test Case ID' in headers else 24
+        self.min_len = max(self.name_idx, self.status_idx, self.history_date_idx, self.os_name_idx, self.platform_idx, self.test_case_id_idx)
+        
+        # Group by: App Version + Tribe Short + OS Name + Tribe Name + Squad Name + Test Environment + Platform
+        # submission key -> day -> {'first': (os_name, platform, app_version), 'passed_ids': set()}
+        self.submissions = {}
+        # submission key -> all NTC-IDs seen on any day
+        self.submission_ntc_ids = {}
+        # (name, label, group key column indices, group -> day -> passed NTC-IDs, group -> all NTC-IDs)
+        self.rollups = []
+        self.rollup_names = list(rollups)
+        # Saved state must cover every rollup, or a later run asking for one would miss history
+        for name in (PASSRATE_ROLLUPS if state_path else rollups):
+            label, columns = PASSRATE_ROLLUPS[name]
+            self.rollups.append((name, label, [headers.index(c) for c in columns], {}, {}))
+        
+        # submission key -> (CSV rows, day order of the last row, cumulative passed NTC-IDs)
+        self.materialized = {}
+        # submission key -> order of the earliest day this run changed; submissions whose total grew
+        self.dirty = {}
+        self.total_changed = set()
+        self.state_path = state_path
+        self.sources = sources
+        # Input files of this run with their fingerprints, saved with the state
+        self.source_files = None
+        self.state_pending = bool(state_path)
+        self.reused = self.extended = self.recomputed = 0
+    
+    def load_state(self):
+        """Start from the saved sidecar if it belongs to this run's input; otherwise start empty.
+
+        Called on the first add(), when every input file has been discovered.
+        """
+        self.state_pending = False
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if not isinstance(state, dict) or state.get('version') != PASSRATE_STATE_VERSION:
+                state = None
+        except (OSError, ValueError):
+            state = None
+        saved_files = state.get('files', {}) if state and state.get('folder') == self.sources.folder else {}
+        self.source_files = self.sources.fingerprints(saved_files)
+        if state is None:
+            return
+        if state.get('folder') != self.sources.folder:
+            print("🧮 Pass rate state belongs to another folder, recomputing")
+            return
+        for path, saved in saved_files.items():
+            current = self.source_files.get(path)
+            if current is None or current['sha1'] != saved.get('sha1'):
+                print(f"🧮 Pass rate state: {os.path.basename(path)} changed or is no longer part of the input, recomputing")
+                return
+        
+        def day_of(value):
+            return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+        for key, days, ntc_ids, materialized in state['submissions']:
+            self.submissions[key] = {
+                day_of(day): {'first': tuple(first), 'passed_ids': set(passed_ids)} for day, first, passed_ids in days
+            }
+            self.submission_ntc_ids[key] = set(ntc_ids)
+            if materialized is not None:
+                rows, last_day, cumulative_passed_ntc_ids = materialized
+                self.materialized[key] = (rows, passrate_day_order(day_of(last_day)), set(cumulative_passed_ntc_ids))
+        for name, label, key_idxs, days_by_group, ntc_ids_by_group in self.rollups:
+            for group, days, ntc_ids in state['rollups'].get(name, []):
+                days_by_group[group] = {day_of(day): set(passed_ids) for day, passed_ids in days}
+                ntc_ids_by_group[group] = set(ntc_ids)
+    
+    def save_state(self):
+        """Atomically write the sidecar as JSON; call after build_rows() so the materialized rows are current"""
+        state_dir = os.path.dirname(self.state_path)
+        if state_dir:
+            os.makedirs(state_dir, exist_ok=True)
+        
+        def day_value(day):
+            return day.isoformat() if day else None
+        submissions = []
+        for key, daily_data in self.submissions.items():
+            days = [[day_value(day), list(day_data['first']), sorted(day_data['passed_ids'])] for day, day_data in daily_data.items()]
+            materialized = self.materialized.get(key)
+            if materialized is not None:
+                rows, last_order, cumulative_passed_ntc_ids = materialized
+                # The order of the last day is (has a date, date)
+                materialized = [rows, day_value(last_order[1]), sorted(cumulative_passed_ntc_ids)]
+            submissions.append([key, days, sorted(self.submission_ntc_ids[key]), materialized])
+        state = {
+            'version': PASSRATE_STATE_VERSION,
+            'folder': self.sources.folder,
+            'files': self.source_files,
+            'submissions': submissions,
+            'rollups': {
+                name: [[group, [[day_value(day), sorted(passed_ids)] for day, passed_ids in days.items()], sorted(ntc_ids_by_group[group])]
+                       for group, days in days_by_group.items()]
+                for name, label, key_idxs, days_by_group, ntc_ids_by_group in self.rollups
+            },
+        }
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+    
+    def mark_dirty(self, submission_key, submission_day):
+        order = passrate_day_order(submission_day)
+        current = self.dirty.get(submission_key)
+        if current is None or order < current:
+            self.dirty[submission_key] = order
+    
+    def add(self, row):
+        if self.state_pending:
+            self.load_state()
+        if len(row) <= self.min_len:
+            return
+        
         # Extract key fields
-        app_version = row[app_version_idx] if len(row) > app_version_idx and row[app_version_idx] else "Unknown"
-        tribe_short = row[tribe_short_idx] if len(row) > tribe_short_idx and row[tribe_short_idx] else "Unknown"
-        squad_name = row[squad_name_idx] if len(row) > squad_name_idx and row[squad_name_idx] else "Unknown"
-        os_name = row[os_name_idx] if len(row) > os_name_idx and row[os_name_idx] else "Unknown"
-        tribe_name = row[tribe_name_idx] if len(row) > tribe_name_idx and row[tribe_name_idx] else "Unknown"
-        test_env = row[test_env_idx] if len(row) > test_env_idx and row[test_env_idx] else "Unknown"
-        platform = row[platform_idx] if len(row) > platform_idx and row[platform_idx] else "Unknown"
-        archive_url = row[archive_url_idx] if len(row) > archive_url_idx and row[archive_url_idx] else ""
-        test_case_id = row[test_case_id_idx] if len(row) > test_case_id_idx and row[test_case_id_idx] else ""
+        app_version = row[self.app_version_idx] or "Unknown"
+        tribe_short = row[self.tribe_short_idx] or "Unknown"
+        squad_name = row[self.squad_name_idx] or "Unknown"
+        os_name = row[self.os_name_idx] or "Unknown"
+        tribe_name = row[self.tribe_name_idx] or "Unknown"
+        test_env = row[self.test_env_idx] or "Unknown"
+        platform = row[self.platform_idx] or "Unknown"
+        test_case_id = row[self.test_case_id_idx] or ""
         
         # Create submission key
         submission_key = f"Submission {app_version} - {tribe_short} {squad_name} - OS {os_name} - {tribe_name} - {squad_name} ({test_env} {platform})"
         
-        # Parse date
-        try:
-            date_str = row[history_date_idx] if len(row) > history_date_idx and row[history_date_idx] else ""
-            if date_str:
-                # Use existing dateutil.parser since it's already imported in the module
-                parsed_date = dateutil.parser.parse(date_str)
-                submission_day = parsed_date.strftime("%B %d, %Y")  # Format: "May 19, 2025"
-            else:
-                submission_day = "Unknown"
-        except:
-            submission_day = "Unknown"
+        # Typed day key (a date, or None for "Unknown")
+        submission_day = history_day(row[self.history_date_idx])
         
         # Determine if test passed
-        status = row[status_idx] if len(row) > status_idx and row[status_idx] else ""
+        status = row[self.status_idx] or ""
         is_passed = status.lower() in ['passed', 'pass', 'success', 'successful']
         
-        # Store test result with NTC-ID
-        submissions[submission_key][submission_day].append({
-            'passed': is_passed,
-            'status': status,
-            'archive_url': archive_url,
-            'os_name': os_name,
-            'platform': platform,
-            'test_case_id': test_case_id,
-            'app_version': app_version
-        })
-    
-    # Calculate total unique NTC-IDs per submission across all days
-    submission_total_ntc_ids = {}
-    for submission_key, daily_data in submissions.items():
-        all_ntc_ids = set()
-        for submission_day, tests in daily_data.items():
-            for test in tests:
-                if test['test_case_id']:
-                    all_ntc_ids.add(test['test_case_id'])
-        submission_total_ntc_ids[submission_key] = len(all_ntc_ids)
-    
-    # Generate pass rate CSV
-    passrate_rows = [
-        ['Name', 'Total TC', 'Total Pass by Day', 'Pass Rate', 'Submission Day', 'OS Name', 'Platform', 'App Version']
-    ]
+        daily_data = self.submissions.get(submission_key)
+        if daily_data is None:
+            daily_data = self.submissions[submission_key] = {}
+            self.submission_ntc_ids[submission_key] = set()
+        day_data = daily_data.get(submission_day)
+        if day_data is None:
+            # The first test of the day is the representative for OS/platform/version
+            day_data = daily_data[submission_day] = {'first': (os_name, platform, app_version), 'passed_ids': set()}
+            self.mark_dirty(submission_key, submission_day)
+        if test_case_id:
+            ntc_ids = self.submission_ntc_ids[submission_key]
+            if test_case_id not in ntc_ids:
+                ntc_ids.add(test_case_id)
+                self.total_changed.add(submission_key)
+            if is_passed and test_case_id not in day_data['passed_ids']:
+                day_data['passed_ids'].add(test_case_id)
+                self.mark_dirty(submission_key, submission_day)
+        
+        for name, label, key_idxs, days_by_group, ntc_ids_by_group in self.rollups:
+            group = ' '.join(row[i] or "Unknown" for i in key_idxs)
+            days = days_by_group.get(group)
+            if days is None:
+                days = days_by_group[group] = {}
+                ntc_ids_by_group[group] = set()
+            passed_ids = days.get(submission_day)
+            if passed_ids is None:
+                passed_ids = days[submission_day] = set()
+            if test_case_id:
+                ntc_ids_by_group[group].add(test_case_id)
+                if is_passed:
+                    passed_ids.add(test_case_id)
     
-    for submission_key, daily_data in submissions.items():
-        total_tc = submission_total_ntc_ids.get(submission_key, 0)
+    def build_rows(self):
+        """Pass rate CSV rows (including headers), cumulative per submission day"""
+        passrate_rows = [
+            ['Name', 'Total TC', 'Total Pass by Day', 'Pass Rate', 'Submission Day', 'OS Name', 'Platform', 'App Version']
+        ]
         
-        # Sort days chronologically for cumulative counting
-        sorted_days = sorted(daily_data.items(), key=lambda x: dateutil.parser.parse(x[0]) if x[0] != "Unknown" else datetime.min)
+        for submission_key, daily_data in self.submissions.items():
+            passrate_rows.extend(self.build_submission_rows(submission_key, daily_data))
         
-        # Track cumulative passed NTC-IDs across all days
-        cumulative_passed_ntc_ids = set()
+        # Sort by submission name and date
+        passrate_rows[1:] = sorted(passrate_rows[1:], key=lambda x: (x[0], x[5]))
+        return passrate_rows
+    
+    def build_submission_rows(self, submission_key, daily_data):
+        """CSV rows of one submission, reusing or extending its materialized rows when possible"""
+        # Total unique NTC-IDs per submission across all days
+        total_tc = len(self.submission_ntc_ids[submission_key])
         
-        for submission_day, tests in sorted_days:
+        saved = self.materialized.get(submission_key)
+        dirty = self.dirty.get(submission_key)
+        days = sorted(daily_data, key=passrate_day_order)
+        if saved is not None and (dirty is None or dirty > saved[1]):
+            saved_rows, last_order, cumulative_passed_ntc_ids = saved
+            if dirty is None and submission_key not in self.total_changed:
+                self.reused += 1
+                return saved_rows
+            # Only later days changed: keep the saved cumulative counts and continue from the last day
+            self.extended += 1
+            submission_rows = saved_rows
+            if submission_key in self.total_changed:
+                submission_rows = [
+                    [row[0], str(total_tc), row[2], str(int(row[2]) / total_tc if total_tc > 0 else 0)] + row[4:]
+                    for row in saved_rows
+                ]
+            days = [day for day in days if passrate_day_order(day) > last_order]
+        else:
+            if saved is not None:
+                self.recomputed += 1
+            submission_rows = []
+            # Track cumulative passed NTC-IDs across all days
+            cumulative_passed_ntc_ids = set()
+        
+        # Days in chronological order for cumulative counting
+        for submission_day in days:
+            day_data = daily_data[submission_day]
             # Add all NTC-IDs that passed on this day to cumulative set
-            for test in tests:
-                if test['passed'] and test['test_case_id']:
-                    cumulative_passed_ntc_ids.add(test['test_case_id'])
+            cumulative_passed_ntc_ids.update(day_data['passed_ids'])
             
             # Total pass is cumulative count of unique NTC-IDs that have passed so far
             total_pass = len(cumulative_passed_ntc_ids)
             pass_rate = total_pass / total_tc if total_tc > 0 else 0
             
-            # Get representative data (first test)
-            first_test = tests[0] if tests else {}
-            os_name = first_test.get('os_name', 'Unknown')
-            platform = first_test.get('platform', 'Unknown')
-            app_version = first_test.get('app_version', 'Unknown')
+            os_name, platform, app_version = day_data['first']
             
-            passrate_rows.append([
+            submission_rows.append([
                 submission_key,
                 str(total_tc),
                 str(total_pass),
                 str(pass_rate),
-                submission_day,
+                format_passrate_day(submission_day),
                 os_name,
                 platform,
                 app_version
             ])
+        
+        if self.state_path:
+            last_order = passrate_day_order(max(daily_data, key=passrate_day_order))
+            self.materialized[submission_key] = (submission_rows, last_order, cumulative_passed_ntc_ids)
+        return submission_rows
+    
+    def build_rollup_rows(self, label, days_by_group, ntc_ids_by_group):
+        """Rollup CSV rows (including headers): cumulative pass rate per group and day"""
+        rollup_rows = [[label, 'Total TC', 'Total Pass by Day', 'Pass Rate', 'Submission Day']]
+        for group in sorted(days_by_group):
+            days = days_by_group[group]
+            total_tc = len(ntc_ids_by_group[group])
+            cumulative_passed_ntc_ids = set()
+            for day in sorted(days, key=passrate_day_order):
+                cumulative_passed_ntc_ids.update(days[day])
+                total_pass = len(cumulative_passed_ntc_ids)
+                pass_rate = total_pass / total_tc if total_tc > 0 else 0
+                rollup_rows.append([group, str(total_tc), str(total_pass), str(pass_rate), format_passrate_day(day)])
+        return rollup_rows
     
-    # Sort by submission name and date
-    passrate_rows[1:] = sorted(passrate_rows[1:], key=lambda x: (x[0], x[5]))
+    def write(self, output_dir):
+        """Write the pass rate CSV; returns its path, or None if no rows were added"""
+        if not self.submissions:
+            return None
+        passrate_file = os.path.join(output_dir, f'submission_passrate_analysis_{datetime.now().strftime("%Y%m%d")}.csv')
+        with open(passrate_file, 'w', newline='', encoding='utf-8') as outfile:
+            writer = csv.writer(outfile, quoting=csv.QUOTE_MINIMAL)
+            writer.writerows(self.build_rows())
+        return passrate_file
     
-    # Write pass rate CSV
-    passrate_file = os.path.join(output_dir, f'submission_passrate_analysis_{datetime.now().strftime("%Y%m%d")}.csv')
-    with open(passrate_file, 'w', newline='', encoding='utf-8') as outfile:
-        writer = csv.writer(outfile, quoting=csv.QUOTE_MINIMAL)
-        writer.writerows(passrate_rows)
+    def write_rollups(self, output_dir):
+        """Write one CSV per rollup; returns their paths"""
+        if not self.submissions:
+            return []
+        return [self.write_rollup(output_dir, rollup) for rollup in self.requested_rollups()]
     
+    def requested_rollups(self):
+        """Rollups to write; the others are only tracked for --passrate-state"""
+        return [rollup for rollup in self.rollups if rollup[0] in self.rollup_names]
+    
+    def write_rollup(self, output_dir, rollup):
+        """Write the CSV of one entry of self.rollups; returns its path"""
+        name, label, key_idxs, days_by_group, ntc_ids_by_group = rollup
+        rollup_file = os.path.join(output_dir, f'passrate_by_{name.replace("-", "_")}_{datetime.now().strftime("%Y%m%d")}.csv')
+        with open(rollup_file, 'w', newline='', encoding='utf-8') as outfile:
+            writer = csv.writer(outfile, quoting=csv.QUOTE_MINIMAL)
+            writer.writerows(self.build_rollup_rows(label, days_by_group, ntc_ids_by_group))
+        return rollup_file
+
+def passrate_rollup_names(args):
+    """Rollups requested with --passrate-by, in PASSRATE_ROLLUPS order"""
+    requested = getattr(args, 'passrate_by', None) or []
+    if 'all' in requested:
+        return list(PASSRATE_ROLLUPS)
+    return [name for name in PASSRATE_ROLLUPS if name in requested]
+
+def write_passrate_outputs(accumulator, output_dir):
+    """Write the pass rate CSV and any rollups; returns the pass rate CSV path"""
+    return report_passrate_outputs(accumulator, accumulator.write(output_dir), accumulator.write_rollups(output_dir))
+
+def report_passrate_outputs(accumulator, passrate_file, rollup_files):
+    """Print the written pass rate files and save the --passrate-state sidecar"""
+    if passrate_file:
+        print(f"📊 Pass rate analysis CSV created: {os.path.basename(passrate_file)}")
+    for rollup_file in rollup_files:
+        print(f"📊 Pass rate rollup CSV created: {os.path.basename(rollup_file)}")
+    if accumulator.state_path and passrate_file:
+        accumulator.save_state()
+        print(f"🧮 Pass rate state: {accumulator.reused} submissions reused, {accumulator.extended} extended, "
+              f"{accumulator.recomputed} recomputed, {len(accumulator.submissions)} total")
     return passrate_file
 
-def process_md_folder(folder_path, args=None):
-    # Use default behavior if args is not provided
-    if args is None:
-        class DefaultArgs:
-            separate_csv = False
-            separate_txt = False
-            no_txt = False
-            passrate = True
-            no_passrate = False
-        args = DefaultArgs()
+def generate_passrate_analysis(processed_rows, output_dir, rollups=()):
+    """Generate submission pass rate analysis CSV similar to FS Submission Passrate format"""
+    if len(processed_rows) <= 1:  # Only headers
+        return None
     
-    processed_rows = [MD_HEADERS]
-    all_rows = []
-    for fname in os.listdir(folder_path):
-        if fname.lower().endswith('.md'):
-            md_file_path = os.path.join(folder_path, fname)
-            file_rows = parse_single_md_file(md_file_path)
-            all_rows.extend(file_rows)
-    # Add index for each test case (Test Case ID + Name): sort by History Date ascending
-    from dateutil.parser import parse as dtparse
-    def get_key(row):
-        # Test Case ID, Name, History Date
-        return (row[23], row[1], row[3])
-    all_rows.sort(key=get_key)
+    accumulator = PassrateAccumulator(processed_rows[0], rollups)
+    for row in processed_rows[1:]:
+        accumulator.add(row)
+    return write_passrate_outputs(accumulator, output_dir)
+
+# TXT record layout: (column index, label). Several indices are one off from
+# MD_HEADERS (e.g. 'Error Summary' prints column 24, the Test Case ID); they
+# are kept as-is so existing reports do not change.
+TXT_KEY_FIELDS = [
+    (0, 'ID'), (1, 'Name'), (4, 'Status'), (3, 'History Date'),
+    (17, 'App Version'), (24, 'Error Summary'), (25, 'Source File')
+]
+TXT_TECH_FIELDS = [
+    (18, 'Tribe Short'), (19, 'Squad Name'), (22, 'Platform'),
+    (21, 'Test Environment'), (15, 'Tested by'), (16, 'Type Testing')
+]
+
+# Field lines as printed: (column index, "Label: " prefix)
+TXT_KEY_LABELS = [(idx, f"{field_name}: ") for idx, field_name in TXT_KEY_FIELDS]
+TXT_TECH_LABELS = [(idx, f"  {field_name}: ") for idx, field_name in TXT_TECH_FIELDS]
+
+def render_txt_records(rows, record_title, record_rule, record_end, start=1):
+    """Yield the TXT records of rows, one string per TXT_RENDER_CHUNK_RECORDS records.
+
+    Each record is record_title and its number, record_rule, the key
+    fields, the technical details, the archive URL and a description
+    preview, then record_end. Writers do one write() per chunk instead of
+    several per record.
+    """
+    record_head = "\n" + record_rule
+    parts = []
+    append = parts.append
+    for number, row in enumerate(rows, start):
+        append(f"{record_title}{number}{record_head}")
+        for idx, label in TXT_KEY_LABELS:
+            if row[idx]:
+                append(f"{label}{row[idx]}\n")
+        
+        append("\nTechnical Details:\n")
+        for idx, label in TXT_TECH_LABELS:
+            if row[idx]:
+                append(f"{label}{row[idx]}\n")
+        
+        # Archive URL if available
+        if row[2]:
+            append(f"\nArchive URL: {row[2]}\n")
+        
+        # Description preview (first 150 chars for better grouping)
+        description = row[26]
+        if description:
+            preview = description[:150].replace('\n', ' ').strip()
+            append(f"\nDescription: {preview}...\n" if len(description) > 150 else f"\nDescription: {preview}\n")
+        append(record_end)
+        if number % TXT_RENDER_CHUNK_RECORDS == 0:
+            yield ''.join(parts)
+            parts.clear()
+    if parts:
+        yield ''.join(parts)
+
+# Record layouts of the combined TXT report and the per-OS TXT files
+def render_combined_txt_records(rows):
+    return render_txt_records(rows, 'Record #', "-" * 30 + "\n", "\n" + "-" * 60 + "\n\n")
+
+def render_os_txt_records(rows):
+    return render_txt_records(rows, 'Execution #', "." * 25 + "\n", "\n" + "." * 50 + "\n\n")
+
+def safe_os_filename(os_name):
+    """OS name as used in per-OS output file names"""
+    return os_name.replace(' ', '_').replace('&', 'and').replace('+', 'Plus')
+
+def index_sort_key(row):
+    # Test Case ID, Name, History Date (the case column has always been Platform)
+    return (row.platform, row.name, row.history_date)
+
+def assign_test_case_index(sorted_rows):
+    """Number rows per test case (Test Case ID + Name) in History Date order, yielding each row"""
     last_case = None
     idx = 1
-    for row in all_rows:
-        case_id = row[23]
-        name = row[1]
-        if last_case != (case_id, name):
+    for row in sorted_rows:
+        case = (row.platform, row.name)
+        if last_case != case:
             idx = 1
-            last_case = (case_id, name)
-        row[-1] = idx
+            last_case = case
+        # Same as row._replace(case_index=idx) at a third of the cost
+        yield MDRow._make(row[:-1] + (idx,))
         idx += 1
-    processed_rows.extend(all_rows)
+
+def iter_md_rows(md_file_paths, jobs=1):
+    """Yield parsed rows one at a time across all files"""
+    for file_rows in iter_parsed_md_files(md_file_paths, jobs):
+        yield from file_rows
+
+def iter_pickle_file(path):
+    """Read back objects written one pickle at a time"""
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+def iter_row_file(path):
+    """Read back rows written one pickle at a time"""
+    return map(MDRow._make, iter_pickle_file(path))
+
+class SpooledRows:
+    """Append-only list of rows kept in a temporary file instead of memory.
+
+    Supports append(), len() and repeated iteration, which is all the
+    output writers need from a group of rows.
+    """
     
-    # Create output directory
-    output_dir = 'md_extraction_results'
-    os.makedirs(output_dir, exist_ok=True)
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self.file = open(path, 'wb')
     
-    # Define output files with directory path (only timestamped version)
-    output_file_with_date = os.path.join(output_dir, f'historical_data_from_md_import_{datetime.now().strftime("%Y%m%d")}.csv')
+    def append(self, row):
+        # Plain tuples unpickle about three times faster than MDRow instances
+        pickle.dump(tuple(row), self.file, pickle.HIGHEST_PROTOCOL)
+        self.count += 1
     
-    # Write main CSV file (only timestamped version)
-    with open(output_file_with_date, 'w', newline='', encoding='utf-8') as outfile:
-        writer = csv.writer(outfile)
-        writer.writerows(processed_rows)
+    def close(self):
+        self.file.close()
     
-    # Generate pass rate analysis CSV (removed duplicate call)
-    # This will be handled later in the correct conditional block
+    def __len__(self):
+        return self.count
     
-    # Function to create separate CSV files for each OS (only timestamped)
-    def write_separate_os_csv_files(rows, base_filename_dated):
-        headers = rows[0]
-        data_rows = rows[1:]
-        
-        # Find OS Name column index (index 20 in MD_HEADERS)
-        os_name_idx = 20  # 'OS Name' is at index 20 in MD_HEADERS
-        
-        # Group records by OS Name
-        os_groups = {}
-        for row in data_rows:
-            os_name = row[os_name_idx] if os_name_idx < len(row) and row[os_name_idx] else 'Unknown_OS'
-            if os_name not in os_groups:
-                os_groups[os_name] = []
-            os_groups[os_name].append(row)
-        
-        # Create individual CSV files for each OS (only timestamped versions)
-        csv_files_created = []
-        for os_name, records in os_groups.items():
-            # Create safe filename (replace spaces and special chars)
-            safe_os_name = os_name.replace(' ', '_').replace('&', 'and').replace('+', 'Plus')
-            
-            # Only date-stamped version
-            os_csv_file_dated = base_filename_dated.replace('.csv', f'_OS_{safe_os_name}.csv')
-            csv_files_created.append(os_csv_file_dated)
-            with open(os_csv_file_dated, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(headers)  # Write headers
-                writer.writerows(records)  # Write records
-        
-        return csv_files_created
+    def __iter__(self):
+        return iter_row_file(self.path)
+
+def external_sort_rows(rows, key, spill_dir, run_size=None):
+    """Stable sort of a row stream, spilling sorted runs of run_size rows to spill_dir"""
+    run_size = run_size or STREAM_RUN_SIZE
+    runs = []
+    buffer = []
+    for row in rows:
+        buffer.append(row)
+        if len(buffer) >= run_size:
+            buffer.sort(key=key)
+            run = SpooledRows(os.path.join(spill_dir, f'run_{len(runs):05d}.pickle'))
+            for sorted_row in buffer:
+                run.append(sorted_row)
+            run.close()
+            runs.append(run)
+            buffer = []
+    buffer.sort(key=key)
+    if not runs:
+        yield from buffer
+        return
+    # heapq.merge breaks key ties by run order, so equal keys keep their input order
+    yield from heapq.merge(*runs, buffer, key=key)
+
+class HistoryStore:
+    """SQLite table of parsed rows that accumulates log entries across runs.
+
+    Rows are upserted on (ID, History Date, Status, Source File, Occurrence),
+    so re-importing a day's export only inserts the log entries that are new
+    and refreshes the rest. Occurrence numbers the rows of one file that share
+    the other key columns (the same test and status on two devices, say), so
+    they are all kept. The test case Index is not stored; it is recomputed
+    whenever outputs are built.
+    """
     
-    # Write separate OS CSV files if requested (only timestamped)
-    csv_files_created = []
-    if args.separate_csv:
-        csv_files_created = write_separate_os_csv_files(processed_rows, output_file_with_date)
+    COLUMNS = MD_ROW_FIELDS[:-1]
+    KEY_COLUMNS = ('id', 'history_date', 'status', 'source_file', 'occurrence')
     
-    # Create separate TXT output files for each OS
-    def write_separate_os_txt_files(rows, base_filename):
-        # Group by OS Name instead of Test Case ID
-        headers = rows[0]
-        data_rows = rows[1:]
-        
-        # Find OS Name column index (index 20 in MD_HEADERS)
-        os_name_idx = 20  # 'OS Name' is at index 20 in MD_HEADERS
-        
-        # Group records by OS Name
-        os_groups = {}
-        for row in data_rows:
-            os_name = row[os_name_idx] if os_name_idx < len(row) and row[os_name_idx] else 'Unknown_OS'
-            if os_name not in os_groups:
-                os_groups[os_name] = {}
-            
-            # Within each OS, group by Test Case ID for sub-organization
-            test_case_id = row[23] if len(row) > 23 and row[23] else 'Unknown'
-            if test_case_id not in os_groups[os_name]:
-                os_groups[os_name][test_case_id] = []
-            os_groups[os_name][test_case_id].append(row)
-        
-        # Create summary file with OS distribution
-        summary_file = base_filename.replace('.csv', '_summary.txt')
-        with open(summary_file, 'w', encoding='utf-8') as summary_txtfile:
-            summary_txtfile.write("=" * 80 + "\n")
-            summary_txtfile.write("MARKDOWN TEST CASE DATA EXTRACTION SUMMARY\n")
-            summary_txtfile.write("=" * 80 + "\n\n")
-            summary_txtfile.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            summary_txtfile.write(f"Total Records: {len(rows)-1}\n")
-            summary_txtfile.write(f"Source Folder: {folder_path}\n\n")
-            
-            summary_txtfile.write("OS DISTRIBUTION:\n")
-            summary_txtfile.write("-" * 40 + "\n")
-            for os_name, test_cases in sorted(os_groups.items()):
-                total_records = sum(len(records) for records in test_cases.values())
-                summary_txtfile.write(f"{os_name}: {total_records} records ({len(test_cases)} test cases)\n")
-            summary_txtfile.write(f"\nTotal OS Categories: {len(os_groups)}\n")
-            summary_txtfile.write(f"Files Generated:\n")
-            for os_name in sorted(os_groups.keys()):
-                safe_os_name = os_name.replace(' ', '_').replace('&', 'and').replace('+', 'Plus')
-                filename = base_filename.replace('.csv', f'_OS_{safe_os_name}.txt')
-                summary_txtfile.write(f"  - {filename}\n")
-        
-        # Create individual files for each OS
-        txt_files_created = []
-        for os_name, test_cases in os_groups.items():
-            # Create safe filename (replace spaces and special chars)
-            safe_os_name = os_name.replace(' ', '_').replace('&', 'and').replace('+', 'Plus')
-            os_txt_file = base_filename.replace('.csv', f'_OS_{safe_os_name}.txt')
-            txt_files_created.append(os_txt_file)
-            
-            total_records = sum(len(records) for records in test_cases.values())
-            
-            with open(os_txt_file, 'w', encoding='utf-8') as txtfile:
-                txtfile.write("=" * 80 + "\n")
-                txtfile.write(f"MARKDOWN TEST CASE DATA - OS: {os_name}\n")
-                txtfile.write("=" * 80 + "\n\n")
-                txtfile.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                txtfile.write(f"OS: {os_name}\n")
-                txtfile.write(f"Test Cases: {len(test_cases)}, Total Records: {total_records}\n")
-                txtfile.write(f"Source Folder: {folder_path}\n\n")
-                txtfile.write("=" * 80 + "\n\n")
-                
-                for test_case_id, records in sorted(test_cases.items()):
-                    txtfile.write(f"TEST CASE: {test_case_id}\n")
-                    txtfile.write("-" * 50 + "\n")
-                    
-                    for i, row in enumerate(records, 1):
-                        txtfile.write(f"Execution #{i}\n")
-                        txtfile.write("." * 25 + "\n")
-                        
-                        # Key information mapping to MD_HEADERS indices
-                        key_fields = [
-                            (0, 'ID'), (1, 'Name'), (4, 'Status'), (3, 'History Date'),
-                            (17, 'App Version'), (24, 'Error Summary'), (25, 'Source File')
-                        ]
-                        
-                        for idx, field_name in key_fields:
-                            if idx < len(row) and row[idx]:
-                                txtfile.write(f"{field_name}: {row[idx]}\n")
-                        
-                        # Technical details
-                        tech_fields = [
-                            (18, 'Tribe Short'), (19, 'Squad Name'), (22, 'Platform'),
-                            (21, 'Test Environment'), (15, 'Tested by'), (16, 'Type Testing')
-                        ]
-                        
-                        txtfile.write("\nTechnical Details:\n")
-                        for idx, field_name in tech_fields:
-                            if idx < len(row) and row[idx]:
-                                txtfile.write(f"  {field_name}: {row[idx]}\n")
-                        
-                        # Archive URL if available
-                        if len(row) > 2 and row[2]:
-                            txtfile.write(f"\nArchive URL: {row[2]}\n")
-                        
-                        # Description preview (first 150 chars for better grouping)
-                        if len(row) > 26 and row[26]:
-                            desc_preview = row[26][:150].replace('\n', ' ').strip()
-                            if len(row[26]) > 150:
-                                desc_preview += "..."
-                            txtfile.write(f"\nDescription: {desc_preview}\n")
-                        
-                        txtfile.write("\n" + "." * 50 + "\n\n")
-                    
-                    txtfile.write("-" * 60 + "\n\n")
-        
-        return txt_files_created, summary_file
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.create_table()
+        # Same order as index_sort_key, so outputs can be rebuilt without a sort
+        self.conn.execute("CREATE INDEX IF NOT EXISTS history_case_order ON history (platform, name, history_date)")
+        keys = ', '.join(self.KEY_COLUMNS)
+        updates = ', '.join(f"{name} = excluded.{name}" for name in self.COLUMNS if name not in self.KEY_COLUMNS)
+        self.upsert_sql = (
+            f"INSERT INTO history ({', '.join(self.COLUMNS)}, occurrence, first_seen, last_seen) "
+            f"VALUES ({', '.join('?' * (len(self.COLUMNS) + 3))}) "
+            f"ON CONFLICT ({keys}) DO UPDATE SET {updates}, last_seen = excluded.last_seen"
+        )
+        self.run_time = datetime.now().isoformat(timespec='seconds')
+        self.rows_before = self.count()
+        self.rows_added = 0
+        self.pending = []
+        # Occurrence counters for the file being added; only the row count of
+        # earlier files is kept, so a name seen again continues after its rows
+        self.current_file = None
+        self.occurrences = {}
+        self.file_rows = {}
     
-    # Handle TXT file generation based on flags
-    txt_files_created = []
-    summary_files = []
+    def create_table(self, name='history'):
+        columns = ', '.join(f"{column} TEXT NOT NULL DEFAULT ''" for column in self.COLUMNS)
+        keys = ', '.join(self.KEY_COLUMNS)
+        self.conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {name} ({columns}, occurrence INTEGER NOT NULL DEFAULT 0, "
+            f"first_seen TEXT, last_seen TEXT, UNIQUE ({keys}))"
+        )
+        if name == 'history' and 'occurrence' not in {info[1] for info in self.conn.execute("PRAGMA table_info(history)")}:
+            self.upgrade_table()
     
-    if not args.no_txt:
-        if args.separate_txt:
-            # Generate separate TXT files for each OS (only timestamped)
-            txt_files_dated, summary_file_dated = write_separate_os_txt_files(processed_rows, output_file_with_date)
-            txt_files_created = txt_files_dated
-            summary_files = [summary_file_dated]
-        else:
-            # Generate combined TXT file (only timestamped version)
-            def write_combined_txt_output(filename, rows):
-                with open(filename, 'w', encoding='utf-8') as txtfile:
-                    txtfile.write("=" * 80 + "\n")
-                    txtfile.write("MARKDOWN TEST CASE DATA PROCESSING SUMMARY\n")
-                    txtfile.write("=" * 80 + "\n\n")
-                    txtfile.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                    txtfile.write(f"Total Records: {len(rows)-1}\n")
-                    txtfile.write(f"Source Folder: {folder_path}\n\n")
-                    
-                    # Skip header row for processing
-                    headers = rows[0]
-                    data_rows = rows[1:]
-                    
-                    # Find OS Name column index (index 20 in MD_HEADERS)
-                    os_name_idx = 20  # 'OS Name' is at index 20 in MD_HEADERS
-                    
-                    # Group records by OS Name for summary
-                    os_groups = {}
-                    for row in data_rows:
-                        os_name = row[os_name_idx] if os_name_idx < len(row) and row[os_name_idx] else 'Unknown OS'
-                        if os_name not in os_groups:
-                            os_groups[os_name] = []
-                        os_groups[os_name].append(row)
-                    
-                    # Write summary statistics
-                    txtfile.write("OS DISTRIBUTION:\n")
-                    txtfile.write("-" * 40 + "\n")
-                    for os_name, records in sorted(os_groups.items()):
-                        txtfile.write(f"{os_name}: {len(records)} records\n")
-                    txtfile.write("\n" + "=" * 80 + "\n\n")
-                    
-                    # Process each OS group
-                    for os_name in sorted(os_groups.keys()):
-                        records = os_groups[os_name]
-                        txtfile.write(f"OS: {os_name}\n")
-                        txtfile.write("=" * 60 + "\n")
-                        txtfile.write(f"Records: {len(records)}\n\n")
-                        
-                        for i, row in enumerate(records, 1):
-                            txtfile.write(f"Record #{i}\n")
-                            txtfile.write("-" * 30 + "\n")
-                            
-                            # Key information mapping to MD_HEADERS indices
-                            key_fields = [
-                                (0, 'ID'), (1, 'Name'), (4, 'Status'), (3, 'History Date'),
-                                (17, 'App Version'), (24, 'Error Summary'), (25, 'Source File')
-                            ]
-                            
-                            for idx, field_name in key_fields:
-                                if idx < len(row) and row[idx]:
-                                    txtfile.write(f"{field_name}: {row[idx]}\n")
-                            
-                            # Technical details
-                            tech_fields = [
-                                (18, 'Tribe Short'), (19, 'Squad Name'), (22, 'Platform'),
-                                (21, 'Test Environment'), (15, 'Tested by'), (16, 'Type Testing')
-                            ]
-                            
-                            txtfile.write("\nTechnical Details:\n")
-                            for idx, field_name in tech_fields:
-                                if idx < len(row) and row[idx]:
-                                    txtfile.write(f"  {field_name}: {row[idx]}\n")
-                            
-                            # Archive URL if available
-                            if len(row) > 2 and row[2]:
-                                txtfile.write(f"\nArchive URL: {row[2]}\n")
-                            
-                            # Description preview (first 150 chars for better grouping)
-                            if len(row) > 26 and row[26]:
-                                desc_preview = row[26][:150].replace('\n', ' ').strip()
-                                if len(row[26]) > 150:
-                                    desc_preview += "..."
-                                txtfile.write(f"\nDescription: {desc_preview}\n")
-                            
-                            txtfile.write("\n" + "-" * 60 + "\n\n")
-                        
-                        txtfile.write("=" * 80 + "\n\n")
-                return filename
+    def upgrade_table(self):
+        """Rebuild a store written before the Occurrence key column existed"""
+        # SQLite cannot change a UNIQUE constraint in place. Older stores hold
+        # one row per (ID, History Date, Status, Source File), i.e. occurrence 0.
+        print(f"🗄️  Upgrading history store {self.path} to the (ID, History Date, Status, Source File, Occurrence) key")
+        columns = ', '.join(self.COLUMNS)
+        self.create_table('history_upgrade')
+        self.conn.execute(
+            f"INSERT INTO history_upgrade ({columns}, first_seen, last_seen) "
+            f"SELECT {columns}, first_seen, last_seen FROM history ORDER BY rowid"
+        )
+        self.conn.execute("DROP TABLE history")
+        self.conn.execute("ALTER TABLE history_upgrade RENAME TO history")
+        self.conn.commit()
+    
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+    
+    def add(self, row):
+        if row.source_file != self.current_file:
+            if self.current_file is not None:
+                self.file_rows[self.current_file] = self.file_rows.get(self.current_file, 0) + sum(self.occurrences.values())
+            self.current_file = row.source_file
+            self.occurrences = {}
+        key = (row.id, row.history_date, row.status)
+        seen = self.occurrences.get(key, 0)
+        self.occurrences[key] = seen + 1
+        occurrence = self.file_rows.get(row.source_file, 0) + seen
+        self.pending.append((*row[:-1], occurrence, self.run_time, self.run_time))
+        self.rows_added += 1
+        if len(self.pending) >= HISTORY_STORE_BATCH_SIZE:
+            self.flush()
+    
+    def iter_added(self, rows):
+        """Add each row to the store while passing it on"""
+        for row in rows:
+            self.add(row)
+            yield row
+    
+    def flush(self):
+        if self.pending:
+            self.conn.executemany(self.upsert_sql, self.pending)
+            self.pending = []
+    
+    def iter_rows(self):
+        """All stored rows in index_sort_key order, ties in insertion order"""
+        cursor = self.conn.execute(
+            f"SELECT {', '.join(self.COLUMNS)} FROM history ORDER BY platform, name, history_date, rowid"
+        )
+        for values in cursor:
+            yield MDRow(*values, '')
+    
+    def close(self):
+        """Commit pending rows and report what the run changed"""
+        self.flush()
+        self.conn.commit()
+        if self.rows_added:
+            total = self.count()
+            inserted = total - self.rows_before
+            print(f"🗄️  History store: {inserted} new, {self.rows_added - inserted} already stored, {total} total in {self.path}")
+        self.conn.close()
 
-            txt_output_file_with_date = output_file_with_date.replace('.csv', '.txt')
-            write_combined_txt_output(txt_output_file_with_date, processed_rows)
-            txt_files_created = [txt_output_file_with_date]
+class RowGroup:
+    """Rows of one RowGroupIndex group, kept in memory with their input positions"""
     
-    # Generate pass rate analysis file if requested
-    passrate_file = None
-    if args.passrate and not args.no_passrate:
-        passrate_file = generate_passrate_analysis(processed_rows, output_dir)
-        if passrate_file:
-            print(f"📊 Pass rate analysis CSV created: {os.path.basename(passrate_file)}")
+    def __init__(self):
+        self.rows = []
+        self.positions = array('Q')
+        self.first = self.last = None
+    
+    def append(self, position, row):
+        if self.first is None:
+            self.first = position
+        self.last = position
+        self.rows.append(row)
+        self.positions.append(position)
+    
+    def __len__(self):
+        return len(self.rows)
+    
+    def __iter__(self):
+        return iter(self.rows)
+    
+    def iter_positioned(self):
+        return zip(self.positions, self.rows)
 
+class SpooledRowGroup(SpooledRows):
+    """RowGroup kept in a temporary file, for --stream"""
+    
+    def __init__(self, path):
+        super().__init__(path)
+        self.first = self.last = None
+    
+    def append(self, position, row):
+        if self.first is None:
+            self.first = position
+        self.last = position
+        pickle.dump((position, tuple(row)), self.file, pickle.HIGHEST_PROTOCOL)
+        self.count += 1
+    
+    def __iter__(self):
+        return (row for position, row in self.iter_positioned())
+    
+    def iter_positioned(self):
+        make_row = MDRow._make
+        return ((position, make_row(values)) for position, values in iter_pickle_file(self.path))
+
+class RowGroupView:
+    """Rows of several groups that share an output label, in input order"""
+    
+    def __init__(self, groups):
+        self.groups = sorted(groups, key=lambda group: group.first)
+    
+    def __len__(self):
+        return sum(len(group) for group in self.groups)
+    
+    def __iter__(self):
+        groups = self.groups
+        if all(prev.last < group.first for prev, group in zip(groups, groups[1:])):
+            return chain.from_iterable(groups)
+        # Interleaved groups (e.g. a literal "Unknown_OS" next to empty OS names) are merged by position
+        return (row for position, row in heapq.merge(*(group.iter_positioned() for group in groups)))
+
+class RowGroupIndex:
+    """OS Name / Test Case ID grouping built in one pass and shared by every writer.
+
+    Each row is stored once, in the group of its raw (OS Name, Platform)
+    pair, together with its input position. os_groups() and
+    test_case_groups() hand writers views with their own labels for empty
+    values; groups that end up under one label are replayed in input
+    order, so each view matches grouping the rows directly.
+    """
+    
+    def __init__(self, new_group=RowGroup):
+        self.new_group = new_group
+        # OS Name -> Platform (the Test Case ID column of the TXT reports) -> group
+        self.groups = {}
+        self.count = 0
+    
+    def add(self, row):
+        by_platform = self.groups.get(row.os_name)
+        if by_platform is None:
+            by_platform = self.groups[row.os_name] = {}
+        group = by_platform.get(row.platform)
+        if group is None:
+            group = by_platform[row.platform] = self.new_group()
+        group.append(self.count, row)
+        self.count += 1
+    
+    def os_groups(self, unknown_label):
+        """OS label -> rows, in order of first appearance"""
+        labelled = {}
+        for os_name, by_platform in self.groups.items():
+            labelled.setdefault(os_name or unknown_label, []).extend(by_platform.values())
+        return self.labelled_views(labelled)
+    
+    def test_case_groups(self, unknown_os_label='Unknown_OS', unknown_case_label='Unknown'):
+        """OS label -> test case label -> rows, OS labels in order of first appearance"""
+        labelled = {}
+        for os_name, by_platform in self.groups.items():
+            test_cases = labelled.setdefault(os_name or unknown_os_label, {})
+            for platform, group in by_platform.items():
+                test_cases.setdefault(platform or unknown_case_label, []).append(group)
+        ordered = sorted(labelled.items(), key=lambda item: min(group.first for groups in item[1].values() for group in groups))
+        return {label: self.labelled_views(test_cases) for label, test_cases in ordered}
+    
+    @staticmethod
+    def labelled_views(labelled):
+        """label -> RowGroupView, in order of first appearance"""
+        ordered = sorted(labelled.items(), key=lambda item: min(group.first for group in item[1]))
+        return {label: RowGroupView(groups) for label, groups in ordered}
+
+def write_separate_os_csv_files(os_groups, base_filename_dated):
+    """Create individual CSV files for each OS (only timestamped versions)"""
+    csv_files_created = []
+    for os_name, records in os_groups.items():
+        csv_files_created.append(write_csv_file(os_csv_filename(base_filename_dated, os_name), records))
+    return csv_files_created
+
+def os_csv_filename(base_filename_dated, os_name):
+    # Create safe filename (replace spaces and special chars); only date-stamped version
+    return base_filename_dated.replace('.csv', f'_OS_{safe_os_filename(os_name)}.csv')
+
+def write_csv_file(filename, records):
+    """Write MD_HEADERS and records to a CSV file"""
+    with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(MD_HEADERS)  # Write headers
+        writer.writerows(records)  # Write records
+    return filename
+
+def write_separate_os_txt_files(os_groups, base_filename, folder_path, total_records):
+    """Create separate TXT output files for each OS plus a summary file"""
+    summary_file = write_os_txt_summary(base_filename.replace('.csv', '_summary.txt'), os_groups, base_filename, folder_path, total_records)
+    txt_files_created = []
+    for os_name, test_cases in os_groups.items():
+        txt_files_created.append(write_os_txt_file(os_txt_filename(base_filename, os_name), os_name, test_cases, folder_path))
+    return txt_files_created, summary_file
+
+def os_txt_filename(base_filename, os_name):
+    # Create safe filename (replace spaces and special chars)
+    return base_filename.replace('.csv', f'_OS_{safe_os_filename(os_name)}.txt')
+
+def write_os_txt_summary(summary_file, os_groups, base_filename, folder_path, total_records):
+    """Write the summary file with the OS distribution of --separate-txt"""
+    with open(summary_file, 'w', encoding='utf-8') as summary_txtfile:
+        summary_txtfile.write("=" * 80 + "\n")
+        summary_txtfile.write("MARKDOWN TEST CASE DATA EXTRACTION SUMMARY\n")
+        summary_txtfile.write("=" * 80 + "\n\n")
+        summary_txtfile.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        summary_txtfile.write(f"Total Records: {total_records}\n")
+        summary_txtfile.write(f"Source Folder: {folder_path}\n\n")
+        
+        summary_txtfile.write("OS DISTRIBUTION:\n")
+        summary_txtfile.write("-" * 40 + "\n")
+        for os_name, test_cases in sorted(os_groups.items()):
+            os_records = sum(len(records) for records in test_cases.values())
+            summary_txtfile.write(f"{os_name}: {os_records} records ({len(test_cases)} test cases)\n")
+        summary_txtfile.write(f"\nTotal OS Categories: {len(os_groups)}\n")
+        summary_txtfile.write(f"Files Generated:\n")
+        for os_name in sorted(os_groups.keys()):
+            summary_txtfile.write(f"  - {os_txt_filename(base_filename, os_name)}\n")
+    return summary_file
+
+def write_os_txt_file(os_txt_file, os_name, test_cases, folder_path):
+    """Write the TXT file of one OS, grouped by test case"""
+    os_records = sum(len(records) for records in test_cases.values())
+    
+    with open(os_txt_file, 'w', encoding='utf-8') as txtfile:
+        txtfile.write("=" * 80 + "\n")
+        txtfile.write(f"MARKDOWN TEST CASE DATA - OS: {os_name}\n")
+        txtfile.write("=" * 80 + "\n\n")
+        txtfile.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        txtfile.write(f"OS: {os_name}\n")
+        txtfile.write(f"Test Cases: {len(test_cases)}, Total Records: {os_records}\n")
+        txtfile.write(f"Source Folder: {folder_path}\n\n")
+        txtfile.write("=" * 80 + "\n\n")
+        
+        for test_case_id, records in sorted(test_cases.items()):
+            txtfile.write(f"TEST CASE: {test_case_id}\n" + "-" * 50 + "\n")
+            txtfile.writelines(render_os_txt_records(records))
+            txtfile.write("-" * 60 + "\n\n")
+    return os_txt_file
+
+def write_combined_txt_output(filename, os_groups, folder_path, total_records):
+    """Write one TXT report with all records grouped by OS"""
+    with open(filename, 'w', encoding='utf-8') as txtfile:
+        txtfile.write("=" * 80 + "\n")
+        txtfile.write("MARKDOWN TEST CASE DATA PROCESSING SUMMARY\n")
+        txtfile.write("=" * 80 + "\n\n")
+        txtfile.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        txtfile.write(f"Total Records: {total_records}\n")
+        txtfile.write(f"Source Folder: {folder_path}\n\n")
+        
+        # Write summary statistics
+        txtfile.write("OS DISTRIBUTION:\n")
+        txtfile.write("-" * 40 + "\n")
+        for os_name, records in sorted(os_groups.items()):
+            txtfile.write(f"{os_name}: {len(records)} records\n")
+        txtfile.write("\n" + "=" * 80 + "\n\n")
+        
+        # Process each OS group
+        for os_name in sorted(os_groups.keys()):
+            records = os_groups[os_name]
+            txtfile.write(f"OS: {os_name}\n" + "=" * 60 + "\n" + f"Records: {len(records)}\n\n")
+            txtfile.writelines(render_combined_txt_records(records))
+            txtfile.write("=" * 80 + "\n\n")
+    return filename
+
+def print_extraction_report(args, output_dir, total_records, output_file_with_date, passrate_file,
+                            csv_files_created, txt_files_created, summary_files):
     # Output report
     print(f"📁 Output directory: {output_dir}")
-    print(f"✅ MD extraction complete. {len(processed_rows)-1} records written to:")
+    print(f"✅ MD extraction complete. {total_records} records written to:")
     print(f"   📄 {os.path.basename(output_file_with_date)}")
     
     # Print pass rate analysis file if generated
@@ -914,11 +1904,868 @@ def process_md_folder(folder_path, args=None):
         else:
             print(f"📝 TXT file created: {os.path.basename(txt_files_created[0])}")
 
-if __name__ == "__main__":
-    # Parse command line arguments for optional flags
-    import argparse
-    import importlib.util
+class ProgressReporter:
+    """Running counts of a run, handed to callback(dict) as processing advances.
+
+    The counts are the current stage (parse, sort, write, outputs, done),
+    files discovered and parsed, rows parsed and written, and output
+    writers finished out of those started. callback gets a copy on every
+    stage change and at most every interval seconds otherwise; writers
+    on OutputStage threads may report at the same time.
+    """
+    
+    def __init__(self, callback, interval=PROGRESS_INTERVAL):
+        self.callback = callback
+        self.interval = interval
+        self.counts = {'stage': 'parse', 'files_discovered': 0, 'files_parsed': 0, 'rows_parsed': 0,
+                       'rows_written': 0, 'writers_done': 0, 'writers_total': 0}
+        self.lock = threading.Lock()
+        self.last_report = 0
+    
+    def stage(self, name):
+        with self.lock:
+            self.counts['stage'] = name
+        self.report(force=True)
+    
+    def add(self, **counts):
+        with self.lock:
+            for name, count in counts.items():
+                self.counts[name] += count
+        self.report()
+    
+    def report(self, force=False):
+        now = time.monotonic()
+        with self.lock:
+            if not force and now - self.last_report < self.interval:
+                return
+            self.last_report = now
+            counts = dict(self.counts)
+        self.callback(counts)
+    
+    def track_discovered(self, md_file_paths):
+        """Pass paths through, counting them as discovered"""
+        for path in md_file_paths:
+            self.add(files_discovered=1)
+            yield path
+    
+    def track_parsed(self, parsed_files):
+        """Pass per-file row lists through, counting files and rows parsed"""
+        for file_rows in parsed_files:
+            self.add(files_parsed=1, rows_parsed=len(file_rows))
+            yield file_rows
+
+class StageProfile:
+    """Wall time, CPU time and items processed per pipeline stage (--profile).
+
+    Stages nest: while a stage entered inside another one runs on the same
+    thread, only the inner one is charged, so lazily chained stages (files
+    discovered as parsing pulls them, the merge sort pulling parsed rows)
+    are told apart. CPU time is per thread (time.thread_time), so output
+    writers running side by side are each charged their own. With --jobs
+    the parsing CPU time is spent in worker processes and is not included.
+    """
+    
+    def __init__(self, memory=False, rules=False):
+        self.stages = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.memory = MemoryProfile() if memory else None
+        self.rules = enable_rule_counters() if rules else None
+        self.started = time.perf_counter()
+        self.cpu_started = time.process_time()
+    
+    def charge(self, entry, now):
+        name, (wall, cpu) = entry
+        with self.lock:
+            stage = self.stages.setdefault(name, {'wall': 0.0, 'cpu': 0.0, 'files': 0, 'rows': 0, 'bytes': 0})
+            stage['wall'] += now[0] - wall
+            stage['cpu'] += now[1] - cpu
+        entry[1] = now
+    
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Charge the time of the with-block to stage name (minus nested stages)"""
+        stack = self.local.__dict__.setdefault('stack', [])
+        now = (time.perf_counter(), time.thread_time())
+        if stack:
+            self.charge(stack[-1], now)
+        stack.append([name, now])
+        try:
+            yield
+        finally:
+            now = (time.perf_counter(), time.thread_time())
+            self.charge(stack.pop(), now)
+            if stack:
+                # The outer stage resumes from here
+                stack[-1][1] = now
+    
+    def count(self, name, **items):
+        """Add files, rows and/or bytes processed to stage name"""
+        with self.lock:
+            stage = self.stages.setdefault(name, {'wall': 0.0, 'cpu': 0.0, 'files': 0, 'rows': 0, 'bytes': 0})
+            for item, count in items.items():
+                stage[item] += count
+    
+    def timed_iter(self, name, iterable):
+        """Pass items through, charging the time spent producing each one to stage name"""
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+    
+    def track_discovered(self, md_file_paths, uploads=False):
+        """Pass paths (or uploaded (name, bytes) files) through as the discover stage; their bytes count for parse"""
+        for path in self.timed_iter('discover', md_file_paths):
+            self.count('discover', files=1)
+            self.count('parse', bytes=len(path[1]) if uploads else os.path.getsize(path))
+            yield path
     
+    def track_parsed(self, parsed_files):
+        """Pass per-file row lists through as the parse stage"""
+        for file_rows in self.timed_iter('parse', parsed_files):
+            self.count('parse', files=1, rows=len(file_rows))
+            yield file_rows
+    
+    def checkpoint(self, name, rows=None):
+        """Snapshot memory at the end of stage name with --profile-memory"""
+        if self.memory:
+            self.memory.checkpoint(name, rows)
+    
+    def report(self):
+        """JSON-ready totals and per stage wall/CPU seconds, items and throughput"""
+        stages = {}
+        with self.lock:
+            # Pipeline order; output writers follow in the order they started
+            order = {name: position for position, name in enumerate(PROFILE_STAGE_ORDER)}
+            names = sorted(self.stages, key=lambda name: order.get(name, len(order)))
+            for name in names:
+                stage = self.stages[name]
+                entry = {'wall_s': round(stage['wall'], 6), 'cpu_s': round(stage['cpu'], 6)}
+                for item, unit in (('files', 'files_per_s'), ('rows', 'rows_per_s'), ('bytes', 'mb_per_s')):
+                    if stage[item]:
+                        entry[item] = stage[item]
+                        rate = stage[item] / stage['wall'] if stage['wall'] > 0 else 0
+                        entry[unit] = round(rate / (1024 * 1024) if item == 'bytes' else rate, 2)
+                stages[name] = entry
+        report = {
+            'version': PROFILE_VERSION,
+            'wall_s': round(time.perf_counter() - self.started, 6),
+            'cpu_s': round(time.process_time() - self.cpu_started, 6),
+            'stages': stages,
+        }
+        if self.memory:
+            report['memory'] = self.memory.report()
+        if self.rules:
+            report['rules'] = self.rules.report()
+        return report
+    
+    def write(self, output_dir):
+        """Write the report as JSON next to the outputs; returns (path, report)"""
+        report = self.report()
+        if self.memory:
+            self.memory.stop()
+        if self.rules:
+            disable_rule_counters()
+        profile_file = os.path.join(output_dir, f'run_profile_{datetime.now().strftime("%Y%m%d")}.json')
+        with open(profile_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        return profile_file, report
+
+def current_rss():
+    """Resident set size of this process in bytes, or None without /proc"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def peak_rss():
+    """Highest resident set size of this process so far in bytes, or None where getrusage is missing"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def megabytes(size):
+    return round(size / (1024 * 1024), 2) if size is not None else None
+
+def allocation_site(frame):
+    """file:line of a tracemalloc frame; packages keep their folder name (collections/__init__.py)"""
+    folder, name = os.path.split(frame.filename)
+    if name == '__init__.py':
+        name = f"{os.path.basename(folder)}/{name}"
+    return f"{name}:{frame.lineno}"
+
+class MemoryProfile:
+    """Memory use at pipeline stage boundaries (--profile-memory).
+
+    tracemalloc follows every Python allocation from the start of the run,
+    so each checkpoint records the memory the run still holds, the peak
+    since the previous checkpoint (since the start on Python 3.8), the
+    allocation sites holding the most and, given a row count, the bytes
+    held per row. RSS covers the whole process: the peak is a lifetime
+    value, which in the long-lived --worker includes earlier runs.
+    Tracing makes the run a few times slower, so take timings from a
+    --profile run without it.
+    """
+    
+    def __init__(self, top=MEMORY_TOP_SITES):
+        self.top = top
+        # Leave tracing on if the caller had already started it
+        self.started_tracing = not tracemalloc.is_tracing()
+        if self.started_tracing:
+            tracemalloc.start()
+        self.baseline = tracemalloc.get_traced_memory()[0]
+        self.checkpoints = []
+    
+    def checkpoint(self, name, rows=None):
+        """Record memory held by the run once stage name is done"""
+        current, peak = tracemalloc.get_traced_memory()
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        snapshot = tracemalloc.take_snapshot().filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+        entry = {
+            'stage': name,
+            'rss_mb': megabytes(current_rss()),
+            'peak_rss_mb': megabytes(peak_rss()),
+            'traced_mb': megabytes(current - self.baseline),
+            'traced_peak_mb': megabytes(peak - self.baseline),
+        }
+        if rows:
+            entry['rows'] = rows
+            entry['bytes_per_row'] = round((current - self.baseline) / rows)
+        entry['top_sites'] = [
+            {
+                'site': allocation_site(stat.traceback[0]),
+                'mb': megabytes(stat.size),
+                'blocks': stat.count,
+            }
+            for stat in snapshot.statistics('lineno')[:self.top]
+        ]
+        self.checkpoints.append(entry)
+    
+    def report(self):
+        """JSON-ready checkpoints in the order they were taken, plus the run's peaks"""
+        return {
+            'peak_rss_mb': megabytes(peak_rss()),
+            'traced_peak_mb': max((entry['traced_peak_mb'] for entry in self.checkpoints), default=0),
+            'checkpoints': self.checkpoints,
+        }
+    
+    def stop(self):
+        if self.started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+def new_stage_profile(args):
+    """StageProfile for --profile / --profile-memory / --profile-rules, or None"""
+    memory = getattr(args, 'profile_memory', False)
+    rules = getattr(args, 'profile_rules', False)
+    if memory or rules or getattr(args, 'profile', False):
+        return StageProfile(memory, rules)
+    return None
+
+def profile_stage(profile, name):
+    """profile.stage(name), or a no-op context without --profile"""
+    return profile.stage(name) if profile else contextlib.nullcontext()
+
+def finish_profile(profile, output_dir, result):
+    """Write the --profile report and add it to a run's result"""
+    profile_file, report = profile.write(output_dir)
+    print_profile(report, profile_file)
+    result['files'].append(os.path.basename(profile_file))
+    result['profile'] = report
+
+def print_profile(report, profile_file):
+    """Print the --profile report as a table"""
+    print(f"⏱️  Profile: {report['wall_s']:.2f}s wall, {report['cpu_s']:.2f}s CPU -> {os.path.basename(profile_file)}")
+    for name, stage in report['stages'].items():
+        # Writers produce a handful of files, so a files/s rate says little about them
+        units = (('rows_per_s', 'rows'), ('mb_per_s', 'MB')) if name.startswith('write') else (('files_per_s', 'files'), ('rows_per_s', 'rows'), ('mb_per_s', 'MB'))
+        rates = [f"{stage[unit]:.1f} MB/s" if unit == 'mb_per_s' else f"{stage[unit]:,.0f} {label}/s" for unit, label in units if unit in stage]
+        print(f"   {name}: {stage['wall_s']:.3f}s wall, {stage['cpu_s']:.3f}s CPU" + (f" ({', '.join(rates)})" if rates else ""))
+    if 'memory' in report:
+        print_memory_profile(report['memory'])
+    if 'rules' in report:
+        print_rule_profile(report['rules'])
+
+def print_memory_profile(memory):
+    """Print the --profile-memory checkpoints and the sites holding the most at the largest one"""
+    print(f"🧠 Memory: peak RSS {memory['peak_rss_mb']} MB, peak traced {memory['traced_peak_mb']} MB")
+    for entry in memory['checkpoints']:
+        per_row = f", {entry['bytes_per_row']:,} bytes/row" if 'bytes_per_row' in entry else ""
+        print(f"   after {entry['stage']}: RSS {entry['rss_mb']} MB, traced {entry['traced_mb']} MB (peak {entry['traced_peak_mb']} MB){per_row}")
+    if memory['checkpoints']:
+        largest = max(memory['checkpoints'], key=lambda entry: entry['traced_mb'])
+        print(f"   held after {largest['stage']}:")
+        for site in largest['top_sites'][:3]:
+            print(f"      {site['site']}: {site['mb']} MB in {site['blocks']:,} blocks")
+
+def print_rule_profile(rules, limit=15):
+    """Print the extraction rules that took the most time, with their hit rates"""
+    print(f"🔎 Extraction rules by time ({min(limit, len(rules))} of {len(rules)}):")
+    for entry in rules[:limit]:
+        calls = entry['hits'] + entry['misses']
+        print(f"   {entry['total_ms']:9.1f} ms  {entry['hit_rate']:6.1%} of {calls:,} calls  {entry['function']}: {entry['rule']}")
+
+def print_progress(counts):
+    """--progress callback: one JSON object per line on stderr"""
+    print(json.dumps({'progress': counts}), file=sys.stderr, flush=True)
+
+class OutputStage:
+    """Independent output writers run on a thread pool, each one timed.
+
+    Writers only read the finished row groups and accumulator, and each
+    owns its file, so the per-OS CSVs and TXTs, the reports and the pass
+    rate CSVs are written side by side: the stage takes about as long as
+    its slowest writer instead of their sum. With jobs=1 every writer runs
+    as soon as it is submitted, as before.
+    """
+    
+    def __init__(self, jobs=None, progress=None, profile=None):
+        if jobs is None:
+            jobs = DEFAULT_OUTPUT_JOBS
+        # 0 (or less) means one thread per CPU, as for --jobs
+        self.jobs = jobs if jobs > 0 else os.cpu_count() or 1
+        self.progress = progress
+        self.profile = profile
+        self.executor = ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix='md_output') if self.jobs > 1 else None
+        # (kind, label, future) in submission order; timings by position
+        self.writers = []
+        self.timings = {}
+        self.started = time.perf_counter()
+    
+    def submit(self, kind, label, fn, *args):
+        """Run fn(*args) as a writer; returns a future of its result"""
+        position = len(self.writers)
+        if self.progress:
+            self.progress.add(writers_total=1)
+        def timed():
+            start = time.perf_counter()
+            try:
+                with profile_stage(self.profile, f'write {kind}'):
+                    result = fn(*args)
+                if self.profile and isinstance(result, str) and os.path.isfile(result):
+                    self.profile.count(f'write {kind}', files=1, bytes=os.path.getsize(result))
+                return result
+            finally:
+                self.timings[position] = time.perf_counter() - start
+                if self.progress:
+                    self.progress.add(writers_done=1)
+        if self.executor:
+            future = self.executor.submit(timed)
+        else:
+            future = Future()
+            future.set_result(timed())
+        self.writers.append((kind, label, future))
+        return future
+    
+    def close(self):
+        """Wait for every writer; raises the first writer error"""
+        if self.executor:
+            self.executor.shutdown(wait=True)
+        self.elapsed = time.perf_counter() - self.started
+        for kind, label, future in self.writers:
+            future.result()
+    
+    def kind_timings(self):
+        """Total writer seconds per kind of writer, in submission order"""
+        totals = {}
+        for position, (kind, label, future) in enumerate(self.writers):
+            totals[kind] = totals.get(kind, 0) + self.timings[position]
+        return totals
+    
+    def print_timings(self):
+        """Print the wall time of the stage and per writer kind the total and slowest writer"""
+        by_kind = {}
+        for position, (kind, label, future) in enumerate(self.writers):
+            by_kind.setdefault(kind, []).append((self.timings[position], label))
+        writer_time = sum(self.timings.values())
+        print(f"⏱️  Output stage: {len(self.writers)} writer{'s' if len(self.writers) != 1 else ''} on {self.jobs} thread{'s' if self.jobs > 1 else ''} "
+              f"in {self.elapsed:.2f}s ({writer_time:.2f}s of writer time)")
+        for kind, timings in by_kind.items():
+            if len(timings) == 1:
+                print(f"   {kind}: {timings[0][0]:.2f}s")
+            else:
+                slowest, label = max(timings)
+                print(f"   {kind} x{len(timings)}: {sum(t for t, _ in timings):.2f}s, slowest {slowest:.2f}s ({label})")
+
+def write_grouped_outputs(index, passrate, args, folder_path, output_dir, output_file_with_date, total_records, stage=None, progress=None,
+                          profile=None):
+    """Write the per-OS CSV, TXT and pass rate outputs from a filled index and accumulator.
+
+    Writers go to stage (a new OutputStage if None), which is closed
+    before the report is printed.
+    """
+    if stage is None:
+        stage = OutputStage(getattr(args, 'output_jobs', None), progress, profile)
+    if progress:
+        progress.stage('outputs')
+    
+    # Write separate OS CSV files if requested (only timestamped)
+    csv_futures = []
+    if args.separate_csv:
+        for os_name, records in index.os_groups('Unknown_OS').items():
+            csv_futures.append(stage.submit('OS CSV', os_name, write_csv_file, os_csv_filename(output_file_with_date, os_name), records))
+    
+    # Handle TXT file generation based on flags
+    txt_futures = []
+    summary_futures = []
+    if not args.no_txt:
+        if args.separate_txt:
+            # Generate separate TXT files for each OS plus a summary (only timestamped)
+            os_groups = index.test_case_groups()
+            summary_file = output_file_with_date.replace('.csv', '_summary.txt')
+            summary_futures.append(stage.submit('TXT summary', summary_file, write_os_txt_summary,
+                                                summary_file, os_groups, output_file_with_date, folder_path, total_records))
+            for os_name, test_cases in os_groups.items():
+                txt_futures.append(stage.submit('OS TXT', os_name, write_os_txt_file,
+                                                os_txt_filename(output_file_with_date, os_name), os_name, test_cases, folder_path))
+        else:
+            # Generate combined TXT file (only timestamped version)
+            txt_output_file_with_date = output_file_with_date.replace('.csv', '.txt')
+            txt_futures.append(stage.submit('TXT', txt_output_file_with_date, write_combined_txt_output,
+                                            txt_output_file_with_date, index.os_groups('Unknown OS'), folder_path, total_records))
+    
+    # Generate pass rate analysis file if requested
+    if passrate:
+        passrate_future = stage.submit('pass rate CSV', 'submissions', passrate.write, output_dir)
+        rollup_futures = [stage.submit('pass rate rollup', rollup[0], passrate.write_rollup, output_dir, rollup)
+                          for rollup in (passrate.requested_rollups() if passrate.submissions else [])]
+    
+    stage.close()
+    if profile:
+        profile.checkpoint('write', total_records)
+    passrate_file = None
+    rollup_files = []
+    if passrate:
+        rollup_files = [future.result() for future in rollup_futures]
+        passrate_file = report_passrate_outputs(passrate, passrate_future.result(), rollup_files)
+    stage.print_timings()
+    
+    csv_files_created = [future.result() for future in csv_futures]
+    txt_files_created = [future.result() for future in txt_futures]
+    summary_files = [future.result() for future in summary_futures]
+    print_extraction_report(args, output_dir, total_records, output_file_with_date, passrate_file,
+                            csv_files_created, txt_files_created, summary_files)
+    
+    written = [output_file_with_date] + csv_files_created + summary_files + txt_files_created
+    written += [passrate_file] if passrate_file else []
+    return {
+        'records': total_records,
+        'output_dir': output_dir,
+        'files': [os.path.basename(path) for path in written + rollup_files],
+        'timings': {'outputs': stage.elapsed, 'writers': stage.kind_timings()},
+    }
+
+def new_passrate_accumulator(args):
+    """PassrateAccumulator for the run, or None with --no-passrate"""
+    if not args.passrate or args.no_passrate:
+        return None
+    state_path = getattr(args, 'passrate_state', None)
+    sources = getattr(args, 'passrate_sources', None)
+    if state_path and sources is None:
+        print("⚠️  --passrate-state is ignored without an input folder (uploads, --from-store)")
+        state_path = None
+    return PassrateAccumulator(rollups=passrate_rollup_names(args), state_path=state_path, sources=sources)
+
+class PassrateSources:
+    """Input files of a run, recorded as they are discovered, that a --passrate-state sidecar belongs to"""
+    
+    def __init__(self, folder):
+        self.folder = os.path.abspath(folder)
+        self.paths = []
+    
+    def track(self, md_file_paths):
+        for path in md_file_paths:
+            self.paths.append(path)
+            yield path
+    
+    def fingerprints(self, saved_files):
+        """Size, mtime and SHA-1 per input file; the hash is only computed when size or mtime differ from saved_files"""
+        files = {}
+        for path in self.paths:
+            key = os.path.abspath(path)
+            stat = os.stat(path)
+            saved = saved_files.get(key)
+            if saved and saved.get('size') == stat.st_size and saved.get('mtime_ns') == stat.st_mtime_ns:
+                content_hash = saved.get('sha1')
+            else:
+                content_hash = file_content_hash(path)
+            files[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha1': content_hash}
+        return files
+
+def needs_row_groups(args):
+    return args.separate_csv or not args.no_txt
+
+def write_md_outputs_streaming(rows, args, folder_path, output_dir, output_file_with_date, progress=None, profile=None):
+    """Streaming variant of write_md_outputs with memory independent of export size.
+
+    Rows flow through an external merge sort straight into the main CSV.
+    Per-OS groups and the pass rate accumulator are fed from the same pass;
+    groups are spooled to temporary files and replayed by the regular
+    writers afterwards.
+    """
+    with tempfile.TemporaryDirectory(prefix='md_stream_') as spill_dir:
+        spools = []
+        def new_spool():
+            spool = SpooledRowGroup(os.path.join(spill_dir, f'group_{len(spools):05d}.pickle'))
+            spools.append(spool)
+            return spool
+        
+        index = RowGroupIndex(new_spool) if needs_row_groups(args) else None
+        passrate = new_passrate_accumulator(args)
+        total_records = 0
+        
+        sorted_rows = external_sort_rows(rows, index_sort_key, spill_dir)
+        if profile:
+            sorted_rows = profile.timed_iter('sort', sorted_rows)
+        # The main CSV is written, and the groups filled, as the merge yields rows
+        with profile_stage(profile, 'write main CSV'), open(output_file_with_date, 'w', newline='', encoding='utf-8') as outfile:
+            writer = csv.writer(outfile)
+            writer.writerow(MD_HEADERS)
+            for row in assign_test_case_index(sorted_rows):
+                if progress and total_records % 1000 == 0:
+                    if not total_records:
+                        # The merge only yields once every row has been parsed and spilled
+                        progress.stage('write')
+                    else:
+                        progress.add(rows_written=1000)
+                writer.writerow(row)
+                total_records += 1
+                if index:
+                    index.add(row)
+                if passrate:
+                    passrate.add(row)
+        if progress:
+            progress.add(rows_written=total_records - progress.counts['rows_written'])
+        if profile:
+            profile.count('sort', rows=total_records)
+            profile.count('write main CSV', files=1, rows=total_records, bytes=os.path.getsize(output_file_with_date))
+            # Covers parsing, the merge sort and filling the groups, which all ran in this one pass
+            profile.checkpoint('write main CSV', total_records)
+        for spool in spools:
+            spool.close()
+        
+        return write_grouped_outputs(index, passrate, args, folder_path, output_dir, output_file_with_date, total_records,
+                                     progress=progress, profile=profile)
+
+def rebuild_outputs_from_store(args, progress=None):
+    """Write the CSV, TXT and pass rate outputs from --store without parsing MD files"""
+    if not os.path.isfile(args.store):
+        print(f"History store not found: {args.store}")
+        sys.exit(1)
+    output_dir = 'md_extraction_results'
+    os.makedirs(output_dir, exist_ok=True)
+    output_file_with_date = os.path.join(output_dir, f'historical_data_from_md_import_{datetime.now().strftime("%Y%m%d")}.csv')
+    
+    profile = new_stage_profile(args)
+    store = HistoryStore(args.store)
+    print(f"🗄️  Rebuilding outputs from {store.rows_before} stored rows in {args.store}")
+    rows = profile.timed_iter('load store', store.iter_rows()) if profile else store.iter_rows()
+    if getattr(args, 'stream', False):
+        result = write_md_outputs_streaming(rows, args, args.store, output_dir, output_file_with_date, progress, profile)
+    else:
+        rows = list(rows)
+        if profile:
+            profile.checkpoint('load store', len(rows))
+        result = write_md_outputs(rows, args, args.store, output_dir, output_file_with_date, progress, profile)
+    store.close()
+    if profile:
+        finish_profile(profile, output_dir, result)
+    if progress:
+        progress.stage('done')
+    return result
+
+def process_md_folder(folder_path, args=None, progress=None):
+    """Parse the MD files in folder_path and write every output.
+
+    progress is an optional ProgressReporter. Returns a dict with the
+    record count, the output folder, the written file names and timings.
+    """
+    started = time.perf_counter()
+    # Use default behavior if args is not provided
+    if args is None:
+        class DefaultArgs:
+            separate_csv = False
+            separate_txt = False
+            no_txt = False
+            passrate = True
+            no_passrate = False
+            jobs = 1
+            cache = None
+            stream = False
+            recursive = False
+            max_depth = None
+            include = None
+            exclude = None
+            store = None
+            from_store = False
+            passrate_by = None
+            passrate_state = None
+            output_jobs = DEFAULT_OUTPUT_JOBS
+            profile = False
+            profile_memory = False
+            profile_rules = False
+        args = DefaultArgs()
+    profile = new_stage_profile(args)
+    
+    # (name, bytes) of files uploaded through the web UI, parsed as they arrive instead of a folder on disk
+    uploads = getattr(args, 'md_uploads', None)
+    if uploads is not None:
+        md_file_paths = uploads
+    else:
+        # Discovery is lazy: parsing starts while the folder tree is still being walked
+        max_depth = getattr(args, 'max_depth', None)
+        if max_depth is None and not getattr(args, 'recursive', False):
+            max_depth = 0
+        md_file_paths = iter_md_files(folder_path, getattr(args, 'include', None), getattr(args, 'exclude', None), max_depth)
+    if getattr(args, 'passrate_state', None) and uploads is None:
+        # The pass rate state is only reused for the files it was saved from
+        args.passrate_sources = PassrateSources(folder_path)
+        md_file_paths = args.passrate_sources.track(md_file_paths)
+    if profile:
+        md_file_paths = profile.track_discovered(md_file_paths, uploads is not None)
+    if progress:
+        md_file_paths = progress.track_discovered(md_file_paths)
+    
+    # Create output directory
+    output_dir = 'md_extraction_results'
+    os.makedirs(output_dir, exist_ok=True)
+    
+    # Define output files with directory path (only timestamped version)
+    output_file_with_date = os.path.join(output_dir, f'historical_data_from_md_import_{datetime.now().strftime("%Y%m%d")}.csv')
+    
+    jobs = getattr(args, 'jobs', 1)
+    cache_path = getattr(args, 'cache', None)
+    # Parse cache entries held in memory by a long-lived caller (the --worker loop)
+    cache_entries = getattr(args, 'parse_cache_entries', None)
+    store = HistoryStore(args.store) if getattr(args, 'store', None) else None
+    
+    if getattr(args, 'stream', False):
+        if cache_path:
+            print("⚠️  --cache is ignored with --stream (the cache is held in memory)")
+        if uploads is not None:
+            parsed_files = iter_parsed_md_uploads(md_file_paths)
+        else:
+            parsed_files = iter_parsed_md_files(md_file_paths, jobs)
+        if profile:
+            parsed_files = profile.track_parsed(parsed_files)
+        if progress:
+            parsed_files = progress.track_parsed(parsed_files)
+        rows = chain.from_iterable(parsed_files)
+        if store:
+            rows = store.iter_added(rows)
+            if profile:
+                rows = profile.timed_iter('store', rows)
+        result = write_md_outputs_streaming(rows, args, folder_path, output_dir, output_file_with_date, progress, profile)
+    else:
+        all_rows = []
+        if uploads is not None:
+            parsed_files = iter_parsed_md_uploads(md_file_paths)
+        elif cache_path or cache_entries:
+            with profile_stage(profile, 'parse'):
+                parsed_files = parse_md_files_cached(list(md_file_paths), cache_path, jobs, cache_entries, progress)
+        elif cache_entries is not None:
+            # Nothing cached for this folder yet: parse while discovering, as without a cache
+            parsed_files = iter_parsed_md_files_into_cache(md_file_paths, jobs, cache_entries)
+        else:
+            parsed_files = iter_parsed_md_files(md_file_paths, jobs)
+        if profile:
+            parsed_files = profile.track_parsed(parsed_files)
+        if progress:
+            parsed_files = progress.track_parsed(parsed_files)
+        for file_rows in parsed_files:
+            all_rows.extend(file_rows)
+        if profile:
+            profile.checkpoint('parse', len(all_rows))
+        if store:
+            with profile_stage(profile, 'store'):
+                for row in all_rows:
+                    store.add(row)
+            if profile:
+                profile.checkpoint('store', len(all_rows))
+        result = write_md_outputs(all_rows, args, folder_path, output_dir, output_file_with_date, progress, profile)
+    
+    if store:
+        with profile_stage(profile, 'store'):
+            store.close()
+    result['timings']['total'] = time.perf_counter() - started
+    if profile:
+        finish_profile(profile, output_dir, result)
+    if progress:
+        progress.stage('done')
+    return result
+
+def write_md_outputs(all_rows, args, folder_path, output_dir, output_file_with_date, progress=None, profile=None):
+    """Index parsed rows and write the CSV, TXT and pass rate outputs"""
+    # Add index for each test case (Test Case ID + Name): sort by History Date ascending
+    if progress:
+        progress.stage('sort')
+    with profile_stage(profile, 'sort'):
+        all_rows.sort(key=index_sort_key)
+        all_rows = list(assign_test_case_index(all_rows))
+    if profile:
+        profile.checkpoint('sort', len(all_rows))
+    
+    # Write main CSV file (only timestamped version) while the groups are built
+    if progress:
+        progress.stage('write')
+    stage = OutputStage(getattr(args, 'output_jobs', None), progress, profile)
+    main_csv = stage.submit('main CSV', output_file_with_date, write_csv_file, output_file_with_date, all_rows)
+    if progress:
+        main_csv.add_done_callback(lambda future: progress.add(rows_written=len(all_rows)))
+    
+    # One pass builds the shared grouping index and the pass rate data
+    index = RowGroupIndex() if needs_row_groups(args) else None
+    passrate = new_passrate_accumulator(args)
+    if index or passrate:
+        with profile_stage(profile, 'group'):
+            for row in all_rows:
+                if index:
+                    index.add(row)
+                if passrate:
+                    passrate.add(row)
+        if profile:
+            profile.checkpoint('group', len(all_rows))
+    if profile:
+        profile.count('sort', rows=len(all_rows))
+        profile.count('write main CSV', rows=len(all_rows))
+        if index or passrate:
+            profile.count('group', rows=len(all_rows))
+    
+    return write_grouped_outputs(index, passrate, args, folder_path, output_dir, output_file_with_date, len(all_rows), stage, progress, profile)
+
+class RunCancelled(Exception):
+    """Raised inside a --worker run that has been asked to stop"""
+
+class WorkerOutput(io.TextIOBase):
+    """stdout of a --worker run: every complete printed line goes to send({'output': line})"""
+    
+    def __init__(self, send):
+        self.send = send
+        self.pending = ''
+    
+    def writable(self):
+        return True
+    
+    def write(self, text):
+        *lines, self.pending = (self.pending + text).split('\n')
+        for line in lines:
+            self.send({'output': line + '\n'})
+        return len(text)
+
+def serve_worker_requests(requests=None, responses=None):
+    """--worker: run the requests sent as JSON lines on stdin, one at a time.
+
+    {"run": id, "argv": [...]} asks for one run with those command line
+    arguments and {"cancel": id} stops that run at its next progress
+    report, even if it has not started yet. A run sent with "upload": true
+    parses the files that follow as {"upload": id, "name": path, "data":
+    base64} lines, until {"upload": id, "end": true}, instead of a folder;
+    each file is parsed as soon as its line has been read.
+    A run answers with {"output": line} for each printed line and
+    {"progress": counts} as it goes, then {"result": {...}} (what
+    process_md_folder returns) or {"error": text}. The interpreter,
+    imports and memoized helpers stay warm between runs, and the parsed
+    rows of the last folder are kept so unchanged files are not parsed again.
+    """
+    requests = requests or sys.stdin
+    responses = responses or sys.stdout
+    send_lock = threading.Lock()
+    def send(message):
+        with send_lock:
+            responses.write(json.dumps(message) + '\n')
+            responses.flush()
+    
+    runs = queue.Queue()
+    cancelled = set()
+    # Run id -> queue of its uploaded files; lines for runs that are over are dropped
+    uploads = {}
+    def read_requests():
+        for line in requests:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                continue
+            if 'argv' in request:
+                if request.get('upload'):
+                    uploads[request.get('run')] = queue.Queue(WORKER_UPLOAD_QUEUE_FILES)
+                runs.put((request.get('run'), request['argv']))
+            elif 'cancel' in request:
+                cancelled.add(request['cancel'])
+            elif 'upload' in request:
+                item = None if request.get('end') else (request['name'], base64.b64decode(request['data']))
+                # Wait while the run parses the files before this one, unless the run ends meanwhile
+                while request['upload'] in uploads:
+                    try:
+                        uploads[request['upload']].put(item, timeout=0.1)
+                        break
+                    except (queue.Full, KeyError):
+                        pass
+        runs.put(None)
+    
+    def iter_uploaded(run_id):
+        files = uploads[run_id]
+        while True:
+            try:
+                item = files.get(timeout=0.1)
+            except queue.Empty:
+                # Stop waiting for files once the run is cancelled or stdin is closed
+                if run_id in cancelled or not reader.is_alive():
+                    raise RunCancelled()
+                continue
+            if item is None:
+                return
+            yield item
+    reader = threading.Thread(target=read_requests, name='md_worker_requests', daemon=True)
+    reader.start()
+    
+    parser = build_arg_parser()
+    warm_folder, warm_entries = None, {}
+    while True:
+        request = runs.get()
+        if request is None:
+            return
+        run_id, argv = request
+        def report(counts):
+            if run_id in cancelled:
+                raise RunCancelled()
+            send({'progress': counts})
+        try:
+            with contextlib.redirect_stdout(WorkerOutput(send)), contextlib.redirect_stderr(WorkerOutput(send)):
+                args = parser.parse_args(argv)
+                if args.from_store:
+                    result = rebuild_outputs_from_store(args, ProgressReporter(report))
+                elif run_id in uploads:
+                    args.md_uploads = iter_uploaded(run_id)
+                    result = process_md_folder(args.folder, args, ProgressReporter(report))
+                else:
+                    if not args.stream and not args.cache:
+                        if args.folder != warm_folder:
+                            warm_folder, warm_entries = args.folder, {}
+                        args.parse_cache_entries = warm_entries
+                    result = process_md_folder(args.folder, args, ProgressReporter(report))
+            send({'result': result})
+        except RunCancelled:
+            send({'error': 'Run cancelled', 'cancelled': True})
+        except SystemExit:
+            # argparse already printed the usage error as output
+            send({'error': f"Invalid arguments: {' '.join(argv)}"})
+        except Exception:
+            send({'error': traceback.format_exc()})
+        finally:
+            cancelled.discard(run_id)
+            uploads.pop(run_id, None)
+
+def build_arg_parser():
+    """Command line options of a run; the --worker loop parses each request with it too"""
     parser = argparse.ArgumentParser(description='Process MD files into structured data')
     parser.add_argument('folder', nargs='?', help='Folder containing MD files')
     parser.add_argument('--separate-csv', action='store_true', help='Create separate CSV files for each OS')
@@ -926,10 +2773,47 @@ if __name__ == "__main__":
     parser.add_argument('--no-txt', action='store_true', help='Skip TXT file generation completely')
     parser.add_argument('--passrate', action='store_true', help='Generate submission pass rate analysis CSV (default: true)', default=True)
     parser.add_argument('--no-passrate', action='store_true', help='Skip pass rate analysis generation')
+    parser.add_argument('--passrate-by', action='append', choices=list(PASSRATE_ROLLUPS) + ['all'], metavar='DIM',
+                        help=f'Also write a pass rate rollup per DIM, computed in the same pass (repeatable; one of: {", ".join(PASSRATE_ROLLUPS)}, all)')
+    parser.add_argument('--recursive', action='store_true', help='Also search subfolders for MD files (Notion exports nest pages in folders)')
+    parser.add_argument('--max-depth', type=int, default=None, metavar='N', help='Only search N folder levels below the input folder (implies --recursive)')
+    parser.add_argument('--include', action='append', metavar='GLOB', help='Only process MD files matching GLOB (repeatable; patterns with "/" match the relative path)')
+    parser.add_argument('--exclude', action='append', metavar='GLOB', help='Skip files and folders matching GLOB (repeatable)')
+    parser.add_argument('--passrate-state', nargs='?', const=DEFAULT_PASSRATE_STATE, default=None, metavar='PATH',
+                        help=f'Keep cumulative pass rate state between runs so a new export only extends the submissions and days it adds (default path: {DEFAULT_PASSRATE_STATE})')
+    parser.add_argument('--jobs', type=int, default=1, metavar='N', help='Parse MD files with N worker processes (0 = one per CPU, default: 1)')
+    parser.add_argument('--cache', nargs='?', const=DEFAULT_PARSE_CACHE, default=None, metavar='PATH',
+                        help=f'Reuse parse results for unchanged MD files across runs (default path: {DEFAULT_PARSE_CACHE})')
+    parser.add_argument('--output-jobs', type=int, default=DEFAULT_OUTPUT_JOBS, metavar='N',
+                        help=f'Write output files with N threads at the same time (0 = one per CPU, 1 = one after another, default: {DEFAULT_OUTPUT_JOBS})')
+    parser.add_argument('--stream', action='store_true', help='Stream rows through an external sort to keep memory flat on huge exports')
+    parser.add_argument('--store', metavar='PATH', help='Upsert parsed rows into a SQLite history store that accumulates log entries across runs')
+    parser.add_argument('--from-store', action='store_true', help='Rebuild outputs from --store without parsing MD files (no folder needed)')
+    parser.add_argument('--progress', action='store_true', help='Report progress as one JSON object per line on stderr (used by the web UI)')
+    parser.add_argument('--profile', action='store_true',
+                        help='Record wall time, CPU time and throughput per pipeline stage into run_profile_<date>.json next to the outputs')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='Like --profile, plus RSS, traced memory, top allocation sites and bytes per row at each stage boundary (slow)')
+    parser.add_argument('--profile-rules', action='store_true',
+                        help='Like --profile, plus hits, misses and time per extraction rule, ranked by time')
+    
+    return parser
+
+if __name__ == "__main__":
+    # Parse command line arguments for optional flags
+    import argparse
+    import importlib.util
+    
+    parser = build_arg_parser()
     parser.add_argument('--web', action='store_true', help='Use web-based UI for folder selection and options')
+    parser.add_argument('--worker', action='store_true', help='Serve runs sent as JSON lines on stdin (used by the web UI)')
     
     args = parser.parse_args()
     
+    if args.worker:
+        serve_worker_requests()
+        sys.exit(0)
+    
     # Check if web interface is requested
     if args.web or (not args.folder and len(sys.argv) <= 1):
         # Use the primary Streamlit-style UI
@@ -957,6 +2841,13 @@ if __name__ == "__main__":
             print(f"  - {ui_module_name}.py")
         sys.exit(1)
     
+    if args.from_store:
+        if not args.store:
+            print("--from-store requires --store PATH")
+            sys.exit(1)
+        rebuild_outputs_from_store(args, ProgressReporter(print_progress) if args.progress else None)
+        sys.exit(0)
+    
     # Standard command-line mode
     if args.folder:
         folder = args.folder
@@ -972,4 +2863,4 @@ if __name__ == "__main__":
         sys.exit(1)
     
     # Call process_md_folder with the command-line arguments
-    process_md_folder(folder, args)
+    process_md_folder(folder, args, ProgressReporter(print_progress) if args.progress else None)
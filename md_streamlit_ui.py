@@ -12,11 +12,843 @@ import socketserver
 import webbrowser
 import subprocess
 import re
+import signal
 import tempfile
+import time
+import uuid
+import base64
+import queue
+from collections import deque, OrderedDict
+import threading
 from threading import Thread
-from urllib.parse import urlparse, parse_qs
+from urllib.parse import urlparse, parse_qs, unquote
+from email.utils import formatdate, parsedate_to_datetime
+import zlib
+import zipfile
+
+# Requests served at the same time; further connections wait for a free worker
+DEFAULT_MAX_WORKERS = 8
+
+# Seconds a connection may sit idle on a socket read or write before it is dropped
+DEFAULT_REQUEST_TIMEOUT = 30
+
+# Seconds shutdown waits for running requests and processing jobs to finish
+SHUTDOWN_GRACE_PERIOD = 60
+
+# Finished processing jobs kept for /jobs/<id> lookups
+MAX_FINISHED_JOBS = 50
+
+# Seconds between keep-alive comments on a quiet /jobs/<id>/events stream
+SSE_KEEPALIVE_INTERVAL = 15
+
+# /jobs/<id>/events streams served at the same time, each on its own thread
+# outside the max_workers pool; further streams get a 503 and the page polls
+MAX_EVENT_STREAMS = 64
+
+# Seconds a cancelled run gets to stop on its own before the worker is restarted
+CANCEL_GRACE_PERIOD = 10
+
+# Uploaded files held in memory between the upload request and the running job
+UPLOAD_QUEUE_FILES = 64
+
+# Bytes read from an upload request body at a time
+UPLOAD_READ_SIZE = 64 * 1024
+
+# Largest single .md file accepted in an upload
+MAX_UPLOAD_FILE_BYTES = 64 * 1024 * 1024
+
+# Seconds a running upload job waits for the next file before it fails
+UPLOAD_IDLE_TIMEOUT = 60
+
+# Text downloads at least this large are gzipped on the fly for clients that accept it
+DOWNLOAD_GZIP_MIN_BYTES = 1024 * 1024
+
+# zlib level of gzipped downloads: fast, as the file is compressed on every request
+DOWNLOAD_GZIP_LEVEL = 1
+
+# Bytes read and compressed at a time for a gzipped download
+DOWNLOAD_GZIP_CHUNK_BYTES = 256 * 1024
+
+# zlib level of /download-bundle ZIPs, built while they are sent
+DOWNLOAD_BUNDLE_LEVEL = 1
+
+# Seconds a folder-name index of the drag & drop search locations is used before it is rebuilt
+FOLDER_INDEX_TTL = 600
+
+# Seconds one index build may walk the search locations; what was found by then is kept
+FOLDER_INDEX_BUILD_BUDGET = 30
+
+# Folders one index build records at most
+FOLDER_INDEX_MAX_DIRS = 500000
+
+# Seconds resolving a dropped folder name may take, waiting for the index included
+FOLDER_LOOKUP_BUDGET = 10
+
+# Candidate folders checked for .md files at the same time
+FOLDER_LOOKUP_THREADS = 8
+
+# Dropped folder names remembered with the folder they resolved to
+FOLDER_LOOKUP_CACHE_SIZE = 256
+
+def file_etag(stat):
+    """ETag of a file's current version, from its mtime and size"""
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+def output_file_stats(output_dir, names):
+    """Size, mtime and ETag of each written output file, to tell later whether it was overwritten"""
+    stats = {}
+    for name in names:
+        try:
+            stat = os.stat(os.path.join(output_dir, name))
+        except OSError:
+            continue
+        stats[name] = {'size': stat.st_size, 'mtime': stat.st_mtime, 'etag': file_etag(stat)}
+    return stats
+
+def accepts_gzip(accept_encoding):
+    """Whether an Accept-Encoding header allows gzip (not refused with q=0)"""
+    for coding in accept_encoding.lower().split(','):
+        name, _, params = coding.strip().partition(';')
+        if name.strip() in ('gzip', '*'):
+            quality = re.search(r'q\s*=\s*([0-9.]+)', params)
+            return not quality or float(quality.group(1)) > 0
+    return False
+
+def not_modified(headers, etag, mtime):
+    """Whether conditional request headers allow a 304 for a file with this ETag and mtime"""
+    if_none_match = headers.get('If-None-Match')
+    if if_none_match is not None:
+        # If-None-Match wins over If-Modified-Since; GET compares tags weakly
+        tags = [tag.strip() for tag in if_none_match.split(',')]
+        return any(tag == '*' or tag.replace('W/', '', 1) == etag for tag in tags)
+    if_modified_since = headers.get('If-Modified-Since')
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def if_range_matches(if_range, etag, last_modified):
+    """Whether a Range request may be honoured: no If-Range, or one naming the current file"""
+    return if_range is None or if_range.strip() in (etag, last_modified)
+
+def parse_byte_range(range_header, size):
+    """(start, end) of a single 'bytes=' range, None to send the whole file, or 'unsatisfiable'"""
+    match = re.fullmatch(r'\s*bytes\s*=\s*(\d*)\s*-\s*(\d*)\s*', range_header)
+    if not match or match.group(1) == match.group(2) == '':
+        # Malformed or multiple ranges: ignore the header and send everything
+        return None
+    first, last = match.groups()
+    if first == '':
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return 'unsatisfiable'
+        return max(0, size - length), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        return 'unsatisfiable'
+    end = min(int(last), size - 1) if last else size - 1
+    return start, end
+
+class UploadError(Exception):
+    """An upload request body that is malformed, too large or broken off"""
+
+def iter_multipart_files(read, boundary):
+    """Yield (filename, content) of each file part of a multipart/form-data body as soon as it is read.
+
+    read(n) returns up to n bytes of the body and b'' at its end. Only the
+    current part is held in memory, so the files of an upload are never
+    staged together; each may be at most MAX_UPLOAD_FILE_BYTES.
+    """
+    delimiter = b'\r\n--' + boundary
+    # The body starts with the boundary without the line break before it
+    buffer = b'\r\n'
+    
+    def read_until(marker):
+        nonlocal buffer
+        while marker not in buffer:
+            if len(buffer) > UPLOAD_READ_SIZE + len(marker):
+                raise UploadError("Malformed multipart upload")
+            chunk = read(UPLOAD_READ_SIZE)
+            if not chunk:
+                raise UploadError("Upload ended early")
+            buffer += chunk
+        head, buffer = buffer.split(marker, 1)
+        return head
+    
+    read_until(delimiter)
+    while True:
+        while len(buffer) < 2:
+            chunk = read(UPLOAD_READ_SIZE)
+            if not chunk:
+                raise UploadError("Upload ended early")
+            buffer += chunk
+        if buffer.startswith(b'--'):
+            return
+        headers = read_until(b'\r\n\r\n').decode('utf-8', 'replace')
+        filename_match = re.search(r'filename="([^"]*)"', headers)
+        
+        # Move everything that cannot be the start of the next delimiter into the part
+        content = bytearray()
+        while delimiter not in buffer:
+            keep = len(delimiter) - 1
+            content += buffer[:-keep]
+            buffer = buffer[-keep:]
+            if len(content) > MAX_UPLOAD_FILE_BYTES:
+                raise UploadError(f"Uploaded file is larger than {MAX_UPLOAD_FILE_BYTES} bytes")
+            chunk = read(UPLOAD_READ_SIZE)
+            if not chunk:
+                raise UploadError("Upload ended early")
+            buffer += chunk
+        tail, buffer = buffer.split(delimiter, 1)
+        content += tail
+        if filename_match:
+            yield filename_match.group(1).replace('%22', '"'), bytes(content)
+
+class ChunkedReader:
+    """read(n) over a request body sent with Transfer-Encoding: chunked"""
+    
+    def __init__(self, rfile):
+        self.rfile = rfile
+        self.remaining = 0
+        self.started = False
+        self.done = False
+    
+    def read(self, size):
+        if self.done:
+            return b''
+        if self.remaining == 0:
+            if self.started:
+                self.rfile.readline()  # CRLF after the previous chunk's data
+            self.started = True
+            line = self.rfile.readline()
+            try:
+                self.remaining = int(line.split(b';')[0].strip(), 16)
+            except ValueError:
+                raise UploadError("Malformed chunked upload")
+            if self.remaining == 0:
+                # Skip trailers up to the blank line
+                while self.rfile.readline() not in (b'\r\n', b'\n', b''):
+                    pass
+                self.done = True
+                return b''
+        data = self.rfile.read(min(size, self.remaining))
+        if not data:
+            raise UploadError("Upload ended early")
+        self.remaining -= len(data)
+        return data
+
+class ProcessingJob:
+    """One /process run: its arguments, status, latest progress counts and captured output.
+
+    status goes queued -> running -> succeeded / failed / cancelled.
+    Every change bumps version and wakes wait_for_change(), which is how
+    event streams follow the job.
+    """
+    FINISHED = ('succeeded', 'failed', 'cancelled')
+    
+    def __init__(self, argv, folder_path, upload=False):
+        self.id = uuid.uuid4().hex[:12]
+        # extract_md_history.py arguments of the run
+        self.argv = argv
+        self.folder_path = folder_path
+        # Upload jobs parse the files of POST /jobs/<id>/upload: (name, bytes), None at the end
+        # or an exception when the upload broke off
+        self.upload = queue.Queue(UPLOAD_QUEUE_FILES) if upload else None
+        self.upload_started = False
+        self.status = 'queued'
+        self.progress = {}
+        self.output_lines = []
+        # Final response fields (success, message, files, ...) once finished
+        self.result = None
+        self.cancel_requested = False
+        self.version = 0
+        self.changed = threading.Condition()
+    
+    @property
+    def finished(self):
+        return self.status in self.FINISHED
+    
+    def update(self, **fields):
+        with self.changed:
+            for name, value in fields.items():
+                setattr(self, name, value)
+            self.version += 1
+            self.changed.notify_all()
+    
+    def append_output(self, line):
+        with self.changed:
+            self.output_lines.append(line)
+            self.version += 1
+            self.changed.notify_all()
+    
+    def wait_for_change(self, version, timeout):
+        """Block until version moves past the given one or timeout passes; returns the current version"""
+        with self.changed:
+            self.changed.wait_for(lambda: self.version != version, timeout)
+            return self.version
+    
+    def uploaded_files(self):
+        """Yield the uploaded (name, bytes) files as they arrive; raises if the upload breaks off or stalls"""
+        while True:
+            try:
+                item = self.upload.get(timeout=UPLOAD_IDLE_TIMEOUT)
+            except queue.Empty:
+                raise UploadError(f"No upload data for {UPLOAD_IDLE_TIMEOUT}s")
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    
+    def snapshot(self, with_output=True):
+        """JSON-ready state of the job"""
+        with self.changed:
+            data = {'jobId': self.id, 'status': self.status, 'progress': dict(self.progress)}
+            if with_output:
+                data['output'] = ''.join(self.output_lines)
+            if self.result:
+                data.update(self.result)
+            return data
+
+class WarmWorker:
+    """extract_md_history.py --worker, kept running between processing jobs.
+
+    The engine is imported once and keeps its memoized helpers and the
+    parsed rows of the last folder, so a run skips interpreter start-up
+    and re-parsing unchanged files. Each run returns the structured result
+    of process_md_folder (file names, record count, timings) instead of
+    console text to scrape. The worker is started on first use and again
+    after it exits.
+    """
+    
+    def __init__(self, cwd):
+        self.cwd = cwd
+        self.process = None
+        self.running = False
+        self.runs_started = 0
+        self.stderr_tail = deque(maxlen=50)
+        # Guards starting the worker and writes to its stdin
+        self.lock = threading.Lock()
+    
+    def start(self):
+        env = dict(os.environ, PYTHONIOENCODING='utf-8')
+        self.process = subprocess.Popen([sys.executable, 'extract_md_history.py', '--worker'],
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                        text=True, encoding='utf-8', errors='replace', bufsize=1, cwd=self.cwd, env=env)
+        self.stderr_tail.clear()
+        Thread(target=self.read_stderr, args=(self.process,), daemon=True).start()
+    
+    def read_stderr(self, process):
+        for line in process.stderr:
+            self.stderr_tail.append(line)
+    
+    def run(self, argv, on_message, should_cancel=lambda: False, upload_files=None):
+        """Run one job, passing output and progress messages to on_message; returns the final message.
+
+        With upload_files, an iterable of (name, bytes), the run parses those
+        files instead of a folder; they are passed on while the run goes.
+        """
+        with self.lock:
+            if self.process is None or self.process.poll() is not None:
+                self.start()
+            process = self.process
+            self.running = True
+            self.runs_started += 1
+            run = self.runs_started
+            request = {'run': run, 'argv': argv}
+            if upload_files is not None:
+                request['upload'] = True
+            process.stdin.write(json.dumps(request) + '\n')
+            process.stdin.flush()
+            # A cancel that came in before the run was sent is passed on now
+            if should_cancel():
+                self.send_cancel(process, run)
+        upload_error = []
+        if upload_files is not None:
+            def send_files():
+                try:
+                    for name, data in upload_files:
+                        self.send(process, {'upload': run, 'name': name, 'data': base64.b64encode(data).decode('ascii')})
+                        if not self.running:
+                            return
+                    self.send(process, {'upload': run, 'end': True})
+                except UploadError as e:
+                    upload_error.append(str(e))
+                    with self.lock:
+                        self.send_cancel(process, run)
+                except (OSError, ValueError):
+                    pass
+            Thread(target=send_files, name='md_ui_upload', daemon=True).start()
+        try:
+            for line in process.stdout:
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                if 'result' in message or 'error' in message:
+                    if upload_error:
+                        return {'error': f"Upload failed: {upload_error[0]}"}
+                    return message
+                on_message(message)
+            # The worker exited mid-run: it crashed or was stopped after a cancel
+            process.wait()
+            return {'error': ''.join(self.stderr_tail) or f"Worker exited with code {process.returncode}"}
+        finally:
+            self.running = False
+    
+    def cancel(self):
+        """Ask the running job to stop"""
+        with self.lock:
+            if self.process is None or self.process.poll() is not None or not self.running:
+                return
+            self.send_cancel(self.process, self.runs_started)
+    
+    def send(self, process, request):
+        with self.lock:
+            process.stdin.write(json.dumps(request) + '\n')
+            process.stdin.flush()
+    
+    def send_cancel(self, process, run):
+        """Send a cancel for run; stop the worker if the run has not ended within CANCEL_GRACE_PERIOD"""
+        try:
+            process.stdin.write(json.dumps({'cancel': run}) + '\n')
+            process.stdin.flush()
+        except OSError:
+            return
+        def stop_if_still_running():
+            if self.running and self.runs_started == run and self.process is process:
+                process.terminate()
+        timer = threading.Timer(CANCEL_GRACE_PERIOD, stop_if_still_running)
+        timer.daemon = True
+        timer.start()
+    
+    def close(self):
+        with self.lock:
+            process, self.process = self.process, None
+        if process is None or process.poll() is not None:
+            return
+        try:
+            process.stdin.close()
+            process.wait(5)
+        except (OSError, subprocess.TimeoutExpired):
+            process.terminate()
+
+class JobQueue:
+    """Runs /process jobs one at a time on a background thread.
+
+    Runs write to the same md_extraction_results folder with date-stamped
+    names, so jobs from several users are queued instead of run side by
+    side. Each run goes to the WarmWorker; its progress and output
+    messages update the job as they arrive.
+    """
+    
+    def __init__(self, cwd):
+        self.cwd = cwd
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.pending = queue.Queue()
+        self.worker = WarmWorker(cwd)
+        self.thread = Thread(target=self.run_jobs, name='md_ui_jobs', daemon=True)
+        self.thread.start()
+    
+    def submit(self, argv, folder_path, upload=False):
+        job = ProcessingJob(argv, folder_path, upload)
+        with self.lock:
+            self.jobs[job.id] = job
+            finished = [old for old in self.jobs.values() if old.finished]
+            for old in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+                del self.jobs[old.id]
+        self.pending.put(job)
+        return job
+    
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+    
+    def cancel(self, job_id):
+        """Cancel a queued job or stop a running one; False if it is unknown or already finished"""
+        job = self.get(job_id)
+        if job is None:
+            return False
+        with job.changed:
+            if job.finished:
+                return False
+            job.cancel_requested = True
+            running = job.status == 'running'
+            if not running:
+                job.status = 'cancelled'
+                job.result = {'success': False, 'message': 'Processing cancelled before it started'}
+                job.version += 1
+                job.changed.notify_all()
+        if running:
+            self.worker.cancel()
+        return True
+    
+    def run_jobs(self):
+        while True:
+            job = self.pending.get()
+            if job is None:
+                return
+            with job.changed:
+                if job.cancel_requested:
+                    continue
+                job.status = 'running'
+            try:
+                self.run(job)
+            except Exception as e:
+                job.update(status='failed', result={'success': False, 'message': f"Error: {str(e)}"})
+    
+    def run(self, job):
+        def on_message(message):
+            if 'progress' in message:
+                job.update(progress=message['progress'])
+            elif 'output' in message:
+                job.append_output(message['output'])
+        
+        job.update()
+        upload_files = job.uploaded_files() if job.upload else None
+        reply = self.worker.run(job.argv, on_message, lambda: job.cancel_requested, upload_files)
+        if job.upload:
+            # Let the thread passing files to the worker stop instead of waiting for more
+            try:
+                job.upload.put_nowait(None)
+            except queue.Full:
+                pass
+        output_text = ''.join(job.output_lines)
+        if job.cancel_requested:
+            job.update(status='cancelled', result={
+                'success': False,
+                'message': 'Processing cancelled; output files of this run may be incomplete',
+                'output': output_text
+            })
+        elif 'result' in reply:
+            result = reply['result']
+            job.update(status='succeeded', result={
+                'success': True,
+                'message': f"Successfully processed MD files from '{os.path.basename(job.folder_path)}' folder.",
+                'files': result['files'],
+                # Output names only carry the date, so a later run the same day overwrites them
+                'file_stats': output_file_stats(os.path.join(self.cwd, result['output_dir']), result['files']),
+                'records': result['records'],
+                'timings': result['timings'],
+                'profile': result.get('profile'),
+                'output': output_text
+            })
+        else:
+            job.update(status='failed', result={
+                'success': False,
+                'message': f"Error processing MD files: {reply['error']}",
+                'error': reply['error'],
+                'output': output_text
+            })
+    
+    def close(self, timeout):
+        """Cancel queued jobs, give a running one up to timeout seconds, then stop the worker"""
+        with self.lock:
+            jobs = list(self.jobs.values())
+        for job in jobs:
+            if job.status == 'queued':
+                self.cancel(job.id)
+        self.pending.put(None)
+        if any(job.status == 'running' for job in jobs):
+            print(f"⏳ Waiting up to {timeout}s for the running processing job to finish...")
+        self.thread.join(timeout)
+        self.worker.close()
+
+def find_md_files_folder(root_path, recursive=False, deadline=None):
+    """Find the folder containing .md files within root_path, or None (also when deadline passes)"""
+    try:
+        # Check if root path directly contains .md files
+        md_files = [f for f in os.listdir(root_path) if f.lower().endswith('.md')]
+        if md_files:
+            return root_path
+        
+        # Recursively search for .md files in subdirectories
+        for root, dirs, files in os.walk(root_path):
+            if deadline is not None and time.monotonic() > deadline:
+                return None
+            if any(f.lower().endswith('.md') for f in files):
+                # A recursive run picks up every subfolder, so keep the dropped folder itself
+                return root_path if recursive else root
+    except (PermissionError, OSError):
+        pass
+    return None
+
+class FolderIndex:
+    """Folder name -> paths under the locations a dropped folder name is searched in.
+
+    The browser only tells the server the name of a dropped folder, so it
+    has to be found on disk. Instead of walking the search locations on
+    every request, one background build walks all of them side by side,
+    each down to its own depth, within FOLDER_INDEX_BUILD_BUDGET seconds
+    and FOLDER_INDEX_MAX_DIRS folders. The index is rebuilt in the
+    background once it is older than FOLDER_INDEX_TTL; lookups meanwhile
+    use the old one. Resolved names are remembered, so dropping the same
+    folder again does not search at all.
+
+    locations is a list of (path, max_depth, needs_md): folders named like
+    the dropped one are looked for at most max_depth levels below path,
+    and with needs_md only those holding .md files count.
+    """
+    
+    def __init__(self, locations):
+        self.locations = locations
+        self.by_location = [{} for _ in locations]
+        self.built_at = None
+        self.building = False
+        self.complete = False
+        self.changed = threading.Condition()
+        self.resolved = OrderedDict()
+    
+    def refresh(self):
+        """Start a background build unless one is running"""
+        with self.changed:
+            if self.building:
+                return
+            self.building = True
+        Thread(target=self.build, name='md_ui_folder_index', daemon=True).start()
+    
+    def build(self):
+        deadline = time.monotonic() + FOLDER_INDEX_BUILD_BUDGET
+        by_location = [{} for _ in self.locations]
+        counted = [0]
+        truncated = []
+        def walk(position):
+            root_path, max_depth, needs_md = self.locations[position]
+            names = by_location[position]
+            try:
+                for root, dirs, files in os.walk(root_path):
+                    if time.monotonic() > deadline or counted[0] >= FOLDER_INDEX_MAX_DIRS:
+                        truncated.append(root_path)
+                        return
+                    depth = root[len(root_path):].count(os.sep)
+                    with self.changed:
+                        for name in dirs:
+                            names.setdefault(name, []).append(os.path.join(root, name))
+                        counted[0] += len(dirs)
+                        self.changed.notify_all()
+                    if depth >= max_depth:
+                        dirs.clear()
+            except (PermissionError, OSError):
+                pass
+        
+        # The previous index stays in use until this one has covered every location
+        if self.built_at is None:
+            self.by_location = by_location
+        walkers = [Thread(target=walk, args=(position,), daemon=True) for position in range(len(self.locations))]
+        for walker in walkers:
+            walker.start()
+        for walker in walkers:
+            walker.join()
+        with self.changed:
+            self.by_location = by_location
+            self.built_at = time.monotonic()
+            self.complete = not truncated
+            self.building = False
+            self.changed.notify_all()
+        print(f"🗂️  Folder index: {counted[0]} folders under {len(self.locations)} locations"
+              + (f" (stopped early in {', '.join(truncated)})" if truncated else ""))
+    
+    def candidates(self, name):
+        """Paths of folders called name as (path, needs_md), in search order.
+
+        A folder directly inside a location is always checked, as it may
+        be newer than the index. Locations that need no .md files come
+        first; in the others a direct match wins over a deeper one.
+        """
+        found, deeper = [], []
+        with self.changed:
+            for (root_path, max_depth, needs_md), names in zip(self.locations, self.by_location):
+                indexed = [(path, needs_md) for path in names.get(name, ()) if os.path.dirname(path) != root_path]
+                found.append((os.path.join(root_path, name), needs_md))
+                (deeper if needs_md else found).extend(indexed)
+        return found + deeper
+    
+    def wait_for(self, ready, deadline):
+        """Wait until ready() holds or deadline passes; called with self.changed held"""
+        while not ready():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self.changed.wait(min(remaining, 0.5))
+        return True
+    
+    def resolve(self, name, recursive=False):
+        """Path of the folder with .md files that a dropped folder name refers to, or None"""
+        deadline = time.monotonic() + FOLDER_LOOKUP_BUDGET
+        key = (name, recursive)
+        with self.changed:
+            path = self.resolved.get(key)
+            if path is not None:
+                self.resolved.move_to_end(key)
+        if path is not None and os.path.isdir(path):
+            return path
+        
+        if self.built_at is None or time.monotonic() - self.built_at > FOLDER_INDEX_TTL:
+            self.refresh()
+        # While the first build runs, wait for the name to show up or the build to end
+        with self.changed:
+            self.wait_for(lambda: self.built_at is not None or any(name in names for names in self.by_location), deadline)
+        path = self.check_candidates(self.candidates(name), recursive, deadline)
+        
+        with self.changed:
+            built_at = self.built_at
+        if path is None and built_at is not None and time.monotonic() - built_at > FOLDER_LOOKUP_BUDGET:
+            # The folder may be newer than the index: rebuild it and look once more
+            self.refresh()
+            with self.changed:
+                rebuilt = self.wait_for(lambda: self.built_at != built_at, deadline)
+            if rebuilt:
+                path = self.check_candidates(self.candidates(name), recursive, deadline)
+        
+        if path is not None:
+            with self.changed:
+                self.resolved[key] = path
+                while len(self.resolved) > FOLDER_LOOKUP_CACHE_SIZE:
+                    self.resolved.popitem(last=False)
+        return path
+    
+    def check_candidates(self, candidates, recursive, deadline):
+        """First candidate, in order, that is a folder (with .md files where needed); checked in parallel"""
+        results = [None] * len(candidates)
+        done = [threading.Event() for _ in candidates]
+        pending = queue.Queue()
+        for position in range(len(candidates)):
+            pending.put(position)
+        def check():
+            while True:
+                try:
+                    position = pending.get_nowait()
+                except queue.Empty:
+                    return
+                path, needs_md = candidates[position]
+                if not needs_md:
+                    results[position] = path if os.path.isdir(path) else None
+                else:
+                    results[position] = find_md_files_folder(path, recursive, deadline)
+                done[position].set()
+        for _ in range(min(FOLDER_LOOKUP_THREADS, len(candidates))):
+            Thread(target=check, daemon=True).start()
+        for position in range(len(candidates)):
+            if not done[position].wait(max(0, deadline - time.monotonic())):
+                return None
+            if results[position]:
+                return results[position]
+        return None
+
+class WebUIServer(http.server.ThreadingHTTPServer):
+    """ThreadingHTTPServer that serves requests on a fixed set of worker threads.
+
+    A long /process run only occupies one worker, so page loads, downloads
+    and folder browsing keep being answered. Connections beyond max_workers
+    wait in a queue. Job event streams last as long as their job, so once
+    their headers are sent they move to a thread of their own (up to
+    MAX_EVENT_STREAMS) and give the worker back. server_close() stops taking
+    requests, drops the queued ones and gives running ones
+    SHUTDOWN_GRACE_PERIOD seconds to finish.
+    """
+    daemon_threads = True
+    
+    def __init__(self, server_address, handler_class, max_workers=DEFAULT_MAX_WORKERS, request_timeout=DEFAULT_REQUEST_TIMEOUT,
+                 gzip_downloads=True):
+        self.max_workers = max_workers
+        self.request_timeout = request_timeout
+        self.gzip_downloads = gzip_downloads
+        self.request_queue = queue.Queue()
+        self.workers = []
+        self.active_requests = 0
+        self.active_lock = threading.Lock()
+        # Connections whose event stream runs on its own thread
+        self.event_streams = set()
+        super().__init__(server_address, handler_class)
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        self.jobs = JobQueue(current_dir)
+        # Where a dropped folder name is searched: next to this script first, then common locations on Mac
+        self.folder_index = FolderIndex([
+            (current_dir, 2, False),
+            (os.path.expanduser("~/Downloads"), 4, True),
+            (os.path.expanduser("~/Desktop"), 4, True),
+            (os.path.expanduser("~/Documents"), 4, True),
+            ("/Users", 4, True),  # Search in all user directories
+            ("/Volumes", 4, True),  # External drives
+        ])
+        self.folder_index.refresh()
+    
+    def process_request(self, request, client_address):
+        if not self.workers:
+            for n in range(self.max_workers):
+                worker = Thread(target=self.serve_queued_requests, name=f'md_ui_worker_{n}', daemon=True)
+                worker.start()
+                self.workers.append(worker)
+        self.request_queue.put((request, client_address))
+    
+    def serve_queued_requests(self):
+        while True:
+            item = self.request_queue.get()
+            if item is None:
+                return
+            with self.active_lock:
+                self.active_requests += 1
+            try:
+                # finish_request, error handling and closing the socket
+                self.process_request_thread(*item)
+            finally:
+                with self.active_lock:
+                    self.active_requests -= 1
+    
+    def start_event_stream(self, request, stream):
+        """Run stream() on its own thread, which closes request when done; False when MAX_EVENT_STREAMS are open"""
+        with self.active_lock:
+            if len(self.event_streams) >= MAX_EVENT_STREAMS:
+                return False
+            self.event_streams.add(request)
+        def run():
+            try:
+                stream()
+            finally:
+                with self.active_lock:
+                    self.event_streams.discard(request)
+                super(WebUIServer, self).shutdown_request(request)
+        Thread(target=run, name='md_ui_events', daemon=True).start()
+        return True
+    
+    def shutdown_request(self, request):
+        # The worker is done with a connection handed to an event stream thread
+        with self.active_lock:
+            if request in self.event_streams:
+                return
+        super().shutdown_request(request)
+    
+    def server_close(self):
+        super().server_close()
+        # Finished jobs end their event streams, so the workers serving them can exit
+        self.jobs.close(SHUTDOWN_GRACE_PERIOD)
+        while True:
+            try:
+                item = self.request_queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                self.shutdown_request(item[0])
+        for _ in self.workers:
+            self.request_queue.put(None)
+        if self.active_requests:
+            print(f"⏳ Waiting up to {SHUTDOWN_GRACE_PERIOD}s for {self.active_requests} running request(s) to finish...")
+        deadline = time.monotonic() + SHUTDOWN_GRACE_PERIOD
+        for worker in self.workers:
+            worker.join(max(0, deadline - time.monotonic()))
 
 class StreamlitStyleHandler(http.server.SimpleHTTPRequestHandler):
+    def setup(self):
+        # Socket timeout for every read and write of this connection
+        self.timeout = self.server.request_timeout
+        super().setup()
+    
     def log_message(self, format, *args):
         # Silence server logs
         pass
@@ -31,13 +863,30 @@ class StreamlitStyleHandler(http.server.SimpleHTTPRequestHandler):
             self.handle_browse_folder()
         elif self.path.startswith('/download/'):
             self.handle_download()
+        elif self.path.startswith('/download-bundle/'):
+            self.handle_download_bundle(self.path[len('/download-bundle/'):])
+        elif self.path.startswith('/jobs/') and self.path.endswith('/events'):
+            self.handle_job_events(self.path[len('/jobs/'):-len('/events')])
+        elif self.path.startswith('/jobs/'):
+            self.handle_job_status(self.path[len('/jobs/'):])
         else:
             self.send_response(404)
             self.end_headers()
 
+    def do_HEAD(self):
+        # Download managers check size and validators before resuming
+        if self.path.startswith('/download/'):
+            self.handle_download(head=True)
+        else:
+            super().do_HEAD()
+
     def do_POST(self):
         if self.path == '/process':
             self.handle_process_files()
+        elif self.path.startswith('/jobs/') and self.path.endswith('/cancel'):
+            self.handle_job_cancel(self.path[len('/jobs/'):-len('/cancel')])
+        elif self.path.startswith('/jobs/') and self.path.endswith('/upload'):
+            self.handle_job_upload(self.path[len('/jobs/'):-len('/upload')])
         else:
             self.send_response(404)
             self.end_headers()
@@ -313,6 +1162,14 @@ class StreamlitStyleHandler(http.server.SimpleHTTPRequestHandler):
             accent-color: var(--primary-color);
         }
 
+        .checkbox-option input[type="number"] {
+            width: 4rem;
+            padding: 0.25rem 0.5rem;
+            border: 2px solid var(--border);
+            border-radius: 6px;
+            font-size: 1rem;
+        }
+
         .checkbox-option label {
             margin: 0;
             cursor: pointer;
@@ -446,6 +1303,7 @@ class StreamlitStyleHandler(http.server.SimpleHTTPRequestHandler):
             font-weight: 500;
             cursor: pointer;
             transition: all 0.2s ease;
+            text-decoration: none;
             display: inline-flex;
             align-items: center;
             gap: 0.5rem;
@@ -459,6 +1317,29 @@ class StreamlitStyleHandler(http.server.SimpleHTTPRequestHandler):
             box-shadow: 0 4px 12px rgba(255, 107, 107, 0.3);
         }
 
+        .profile-report {
+            margin-top: 1rem;
+            overflow-x: auto;
+        }
+
+        .profile-report table {
+            width: 100%;
+            border-collapse: collapse;
+            font-size: 0.85rem;
+        }
+
+        .profile-report th,
+        .profile-report td {
+            padding: 0.35rem 0.6rem;
+            border-bottom: 1px solid var(--border);
+            text-align: right;
+        }
+
+        .profile-report th:first-child,
+        .profile-report td:first-child {
+            text-align: left;
+        }
+
         .console-output {
             background: #f8f9fa;
             border: 1px solid var(--border);
@@ -550,6 +1431,22 @@ class StreamlitStyleHandler(http.server.SimpleHTTPRequestHandler):
                     <input type="checkbox" id="passrateAnalysis" name="passrateAnalysis" checked>
                     <label for="passrateAnalysis">Generate pass rate analysis CSV</label>
                 </div>
+                <div class="checkbox-option">
+                    <input type="checkbox" id="passrateRollups" name="passrateRollups">
+                    <label for="passrateRollups">Add pass rate rollups by tribe, squad, platform, app version and environment</label>
+                </div>
+                <div class="checkbox-option">
+                    <input type="checkbox" id="recursive" name="recursive">
+                    <label for="recursive">Search subfolders for MD files</label>
+                </div>
+                <div class="checkbox-option">
+                    <input type="checkbox" id="profile" name="profile" checked>
+                    <label for="profile">Record time and throughput per processing stage</label>
+                </div>
+                <div class="checkbox-option">
+                    <input type="number" id="parseJobs" name="parseJobs" min="0" value="1">
+                    <label for="parseJobs">Parallel parse jobs (0 = one per CPU)</label>
+                </div>
             </div>
         </div>
 
@@ -558,6 +1455,9 @@ class StreamlitStyleHandler(http.server.SimpleHTTPRequestHandler):
                 <button class="btn btn-primary" id="processBtn" disabled>
                     <span>🚀</span> Process Files
                 </button>
+                <button class="btn btn-secondary" id="cancelBtn" style="display: none;">
+                    <span>⏹️</span> Cancel
+                </button>
             </div>
             
             <div id="status" class="status">
@@ -570,6 +1470,7 @@ class StreamlitStyleHandler(http.server.SimpleHTTPRequestHandler):
                     <span>✅</span> Files Generated
                 </h3>
                 <ul id="fileList" class="file-list"></ul>
+                <div id="profileReport" class="profile-report"></div>
                 <div id="consoleOutput" class="console-output"></div>
             </div>
         </div>
@@ -579,10 +1480,16 @@ class StreamlitStyleHandler(http.server.SimpleHTTPRequestHandler):
         const folderPathInput = document.getElementById('folderPath');
         const browseBtn = document.getElementById('browseBtn');
         const processBtn = document.getElementById('processBtn');
+        const cancelBtn = document.getElementById('cancelBtn');
         const separateCsvCheck = document.getElementById('separateCsv');
         const generateTxtCheck = document.getElementById('generateTxt');
         const separateTxtCheck = document.getElementById('separateTxt');
         const passrateAnalysisCheck = document.getElementById('passrateAnalysis');
+        const passrateRollupsCheck = document.getElementById('passrateRollups');
+        const recursiveCheck = document.getElementById('recursive');
+        const parseJobsInput = document.getElementById('parseJobs');
+        const profileCheck = document.getElementById('profile');
+        const profileReport = document.getElementById('profileReport');
         const status = document.getElementById('status');
         const statusText = document.getElementById('statusText');
         const results = document.getElementById('results');
@@ -591,6 +1498,9 @@ class StreamlitStyleHandler(http.server.SimpleHTTPRequestHandler):
         const dropZone = document.getElementById('dropZone');
 
         let selectedFolder = '';
+        let currentJobId = null;
+        // .md files of a dropped folder as [relative path, File], uploaded on Process
+        let droppedFiles = null;
 
         // Drag and Drop functionality
         dropZone.addEventListener('dragover', (e) => {
@@ -628,9 +1538,10 @@ class StreamlitStyleHandler(http.server.SimpleHTTPRequestHandler):
                         const entry = item.webkitGetAsEntry();
                         
                         if (entry && entry.isDirectory) {
-                            // We found a folder - for web security, we can't get the full system path
-                            // but we can work with the folder name and handle it on the server side
+                            // We found a folder - for web security, we can't get the full system path,
+                            // so its .md files are uploaded; the folder name is the fallback if they can't be read
                             selectedFolder = entry.name;
+                            droppedFiles = null;
                             folderPathInput.value = `📁 ${entry.name} (drag & drop folder)`;
                             processBtn.disabled = false;
                             folderFound = true;
@@ -639,6 +1550,14 @@ class StreamlitStyleHandler(http.server.SimpleHTTPRequestHandler):
                             status.className = 'status success';
                             status.style.display = 'flex';
                             statusText.textContent = `Folder "${entry.name}" ready - will search for .md files automatically`;
+                            collectMdFiles(entry).then((found) => {
+                                if (selectedFolder !== entry.name || found.length === 0) {
+                                    return;
+                                }
+                                droppedFiles = found;
+                                folderPathInput.value = `📁 ${entry.name} (${found.length} .md files to upload)`;
+                                statusText.textContent = `Folder "${entry.name}" ready - ${found.length} .md files will be uploaded`;
+                            }).catch(() => {});
                             setTimeout(() => {
                                 status.style.display = 'none';
                             }, 3000);
@@ -657,6 +1576,9 @@ class StreamlitStyleHandler(http.server.SimpleHTTPRequestHandler):
                     // Files with webkitRelativePath suggest they came from a folder selection
                     const folderName = firstFile.webkitRelativePath.split('/')[0];
                     selectedFolder = folderName;
+                    droppedFiles = Array.from(files)
+                        .filter((file) => file.name.toLowerCase().endsWith('.md'))
+                        .map((file) => [file.webkitRelativePath.split('/').slice(1).join('/'), file]);
                     folderPathInput.value = `📁 ${folderName} (${files.length} files dropped)`;
                     processBtn.disabled = false;
                     folderFound = true;
@@ -697,6 +1619,57 @@ class StreamlitStyleHandler(http.server.SimpleHTTPRequestHandler):
             }
         });
 
+        // All .md files below a dropped folder entry as [path relative to it, File]
+        async function collectMdFiles(folderEntry) {
+            const found = [];
+            async function readFolder(dirEntry, prefix) {
+                const reader = dirEntry.createReader();
+                // readEntries returns at most about 100 entries per call
+                let batch;
+                do {
+                    batch = await new Promise((resolve, reject) => reader.readEntries(resolve, reject));
+                    for (const child of batch) {
+                        if (child.isDirectory) {
+                            await readFolder(child, prefix + child.name + '/');
+                        } else if (child.name.toLowerCase().endsWith('.md')) {
+                            const file = await new Promise((resolve, reject) => child.file(resolve, reject));
+                            found.push([prefix + child.name, file]);
+                        }
+                    }
+                } while (batch.length > 0);
+            }
+            await readFolder(folderEntry, '');
+            return found;
+        }
+
+        // The dropped files a run uses: all of them when searching subfolders, else those of
+        // the dropped folder itself or, if it has none, of the first subfolder that has some
+        function filesToUpload(recursive) {
+            if (recursive) {
+                return droppedFiles;
+            }
+            const folderOf = (path) => path.includes('/') ? path.slice(0, path.lastIndexOf('/')) : '';
+            const topLevel = droppedFiles.filter(([path]) => folderOf(path) === '');
+            if (topLevel.length > 0) {
+                return topLevel;
+            }
+            const first = folderOf(droppedFiles[0][0]);
+            return droppedFiles.filter(([path]) => folderOf(path) === first);
+        }
+
+        // Stream the files into a queued upload job; the server parses each one as it arrives
+        async function uploadFiles(jobId, files) {
+            const form = new FormData();
+            for (const [path, file] of files) {
+                form.append('files', file, path);
+            }
+            const response = await fetch(`/jobs/${jobId}/upload`, { method: 'POST', body: form });
+            const data = await response.json();
+            if (!data.success) {
+                throw new Error(data.message);
+            }
+        }
+
         // Click on drop zone to trigger browse
         dropZone.addEventListener('click', () => {
             browseBtn.click();
@@ -710,6 +1683,7 @@ class StreamlitStyleHandler(http.server.SimpleHTTPRequestHandler):
                 
                 if (data.folderPath) {
                     selectedFolder = data.folderPath;
+                    droppedFiles = null;
                     folderPathInput.value = data.folderPath;
                     processBtn.disabled = false;
                 } else if (data.error) {
@@ -730,6 +1704,15 @@ class StreamlitStyleHandler(http.server.SimpleHTTPRequestHandler):
             }
         });
 
+        passrateAnalysisCheck.addEventListener('change', () => {
+            if (passrateAnalysisCheck.checked) {
+                passrateRollupsCheck.disabled = false;
+            } else {
+                passrateRollupsCheck.checked = false;
+                passrateRollupsCheck.disabled = true;
+            }
+        });
+
         // Process button functionality
         processBtn.addEventListener('click', async () => {
             console.log('Process button clicked');
@@ -750,6 +1733,7 @@ class StreamlitStyleHandler(http.server.SimpleHTTPRequestHandler):
             // Clear previous results
             fileList.innerHTML = '';
             consoleOutput.textContent = '';
+            profileReport.innerHTML = '';
             
             // Remove any existing download all buttons
             const existingDownloadAll = results.querySelector('.download-all-btn');
@@ -762,8 +1746,16 @@ class StreamlitStyleHandler(http.server.SimpleHTTPRequestHandler):
                 separateCsv: separateCsvCheck.checked,
                 separateTxt: separateTxtCheck.checked,
                 noTxt: !generateTxtCheck.checked,  // Inverse logic: if generateTxt is unchecked, skip TXT files
-                passrateAnalysis: passrateAnalysisCheck.checked
+                passrateAnalysis: passrateAnalysisCheck.checked,
+                passrateRollups: passrateRollupsCheck.checked,
+                recursive: recursiveCheck.checked,
+                profile: profileCheck.checked,
+                jobs: parseJobsInput.value === '' ? 1 : parseInt(parseJobsInput.value, 10)
             };
+            const uploads = droppedFiles ? filesToUpload(recursiveCheck.checked) : null;
+            if (uploads) {
+                options.upload = true;
+            }
 
             try {
                 console.log('Sending request with options:', options);
@@ -780,49 +1772,21 @@ class StreamlitStyleHandler(http.server.SimpleHTTPRequestHandler):
                 const data = await response.json();
                 console.log('Response data:', data);
                 
-                processBtn.disabled = false;
-
-                if (data.success) {
-                    status.className = 'status success';
-                    statusText.textContent = 'Processing completed successfully!';
-                    
-                    // Show results
-                    results.style.display = 'block';
-                    fileList.innerHTML = '';
-                    
-                    if (data.files && data.files.length > 0) {
-                        data.files.forEach(file => {
-                            const li = document.createElement('li');
-                            li.innerHTML = `
-                                <span class="file-info">${file}</span>
-                                <a href="/download/${file}" class="download-btn" download="${file}">
-                                    📥 Download
-                                </a>
-                            `;
-                            fileList.appendChild(li);
+                if (data.jobId) {
+                    // The run is queued on the server; follow its progress
+                    currentJobId = data.jobId;
+                    cancelBtn.style.display = 'inline-flex';
+                    cancelBtn.disabled = false;
+                    statusText.textContent = describeProgress(data);
+                    if (uploads) {
+                        // Parsing starts with the first file, while the rest are still uploading
+                        uploadFiles(data.jobId, uploads).catch((error) => {
+                            consoleOutput.textContent += 'Upload failed: ' + error.message + '\\n';
                         });
-                        
-                        // Add download all button
-                        const downloadAllContainer = document.createElement('div');
-                        downloadAllContainer.innerHTML = `
-                            <button class="download-all-btn" onclick="downloadAllFiles([${data.files.map(f => `'${f}'`).join(',')}])">
-                                📦 Download All Files
-                            </button>
-                        `;
-                        results.appendChild(downloadAllContainer);
-                    }
-                    
-                    if (data.output) {
-                        consoleOutput.textContent = data.output;
                     }
+                    watchJob(data.jobId);
                 } else {
-                    status.className = 'status error';
-                    statusText.textContent = 'Error: ' + (data.message || 'Unknown error');
-                    
-                    if (data.output || data.error) {
-                        results.style.display = 'block';
-                        consoleOutput.textContent = data.output || data.error;
-                    }
+                    showResult(data);
                 }
             } catch (error) {
                 processBtn.disabled = false;
@@ -830,6 +1794,162 @@ class StreamlitStyleHandler(http.server.SimpleHTTPRequestHandler):
                 statusText.textContent = 'Error: ' + error.message;
             }
         });
+
+        cancelBtn.addEventListener('click', async () => {
+            if (!currentJobId) {
+                return;
+            }
+            cancelBtn.disabled = true;
+            statusText.textContent = 'Cancelling...';
+            try {
+                await fetch(`/jobs/${currentJobId}/cancel`, { method: 'POST' });
+            } catch (error) {
+                cancelBtn.disabled = false;
+            }
+        });
+
+        // Status line for a job snapshot from /jobs/<id> or its event stream
+        function describeProgress(job) {
+            const p = job.progress || {};
+            if (job.status === 'queued') {
+                return 'Waiting for the previous run to finish...';
+            }
+            switch (p.stage) {
+                case 'parse':
+                    return `Parsing MD files: ${p.files_parsed || 0} of ${p.files_discovered || 0} found, ${p.rows_parsed || 0} rows`;
+                case 'sort':
+                    return `Sorting ${p.rows_parsed || 0} rows...`;
+                case 'write':
+                    return `Writing main CSV: ${p.rows_written || 0} of ${p.rows_parsed || 0} rows`;
+                case 'outputs':
+                    return `Writing output files: ${p.writers_done || 0} of ${p.writers_total || 0}`;
+                default:
+                    return 'Processing MD files...';
+            }
+        }
+
+        // Follow a job over Server-Sent Events, falling back to polling
+        function watchJob(jobId) {
+            if (!window.EventSource) {
+                pollJob(jobId);
+                return;
+            }
+            const events = new EventSource(`/jobs/${jobId}/events`);
+            events.addEventListener('progress', (e) => {
+                statusText.textContent = describeProgress(JSON.parse(e.data));
+            });
+            events.addEventListener('done', (e) => {
+                events.close();
+                finishJob(JSON.parse(e.data));
+            });
+            events.onerror = () => {
+                events.close();
+                pollJob(jobId);
+            };
+        }
+
+        async function pollJob(jobId) {
+            try {
+                const response = await fetch(`/jobs/${jobId}`);
+                const job = await response.json();
+                if (['succeeded', 'failed', 'cancelled'].includes(job.status) || !job.jobId) {
+                    finishJob(job);
+                    return;
+                }
+                statusText.textContent = describeProgress(job);
+            } catch (error) {
+                console.log('Polling failed:', error);
+            }
+            setTimeout(() => pollJob(jobId), 1000);
+        }
+
+        function finishJob(job) {
+            currentJobId = null;
+            cancelBtn.style.display = 'none';
+            showResult(job);
+        }
+
+        // Show the final result of a run: file list with downloads, or the error
+        function showResult(data) {
+            processBtn.disabled = false;
+
+            if (data.success) {
+                status.className = 'status success';
+                statusText.textContent = 'Processing completed successfully!' +
+                    (data.records !== undefined ? ` ${data.records} records written.` : '');
+                
+                // Show results
+                results.style.display = 'block';
+                fileList.innerHTML = '';
+                
+                if (data.files && data.files.length > 0) {
+                    data.files.forEach(file => {
+                        const li = document.createElement('li');
+                        li.innerHTML = `
+                            <span class="file-info">${file}</span>
+                            <a href="/download/${file}" class="download-btn" download="${file}">
+                                📥 Download
+                            </a>
+                        `;
+                        fileList.appendChild(li);
+                    });
+                    
+                    // Add download all button: one ZIP of the run, or each file separately
+                    const downloadAllContainer = document.createElement('div');
+                    downloadAllContainer.innerHTML = data.jobId ? `
+                        <a href="/download-bundle/${data.jobId}" class="download-all-btn" download>
+                            📦 Download All Files (ZIP)
+                        </a>
+                    ` : `
+                        <button class="download-all-btn" onclick="downloadAllFiles([${data.files.map(f => `'${f}'`).join(',')}])">
+                            📦 Download All Files
+                        </button>
+                    `;
+                    results.appendChild(downloadAllContainer);
+                }
+                
+                if (data.profile) {
+                    showProfile(data.profile);
+                }
+                
+                if (data.output) {
+                    consoleOutput.textContent = data.output;
+                }
+            } else {
+                status.className = 'status error';
+                statusText.textContent = 'Error: ' + (data.message || 'Unknown error');
+                
+                if (data.output || data.error) {
+                    results.style.display = 'block';
+                    consoleOutput.textContent = data.output || data.error;
+                }
+            }
+        }
+        
+        // Table of the run's --profile report: time, items and throughput per stage
+        function showProfile(profile) {
+            const number = (value, digits) => value === undefined ? '' :
+                value.toLocaleString(undefined, { minimumFractionDigits: digits, maximumFractionDigits: digits });
+            const rows = Object.entries(profile.stages).map(([name, stage]) => `
+                <tr>
+                    <td>${name}</td>
+                    <td>${number(stage.wall_s, 3)}</td>
+                    <td>${number(stage.cpu_s, 3)}</td>
+                    <td>${number(stage.files, 0)}</td>
+                    <td>${number(stage.rows, 0)}</td>
+                    <td>${name.startsWith('write') ? '' : number(stage.files_per_s, 0)}</td>
+                    <td>${number(stage.rows_per_s, 0)}</td>
+                    <td>${number(stage.mb_per_s, 1)}</td>
+                </tr>
+            `).join('');
+            profileReport.innerHTML = `
+                <table>
+                    <tr><th>Stage</th><th>Wall s</th><th>CPU s</th><th>Files</th><th>Rows</th><th>Files/s</th><th>Rows/s</th><th>MB/s</th></tr>
+                    ${rows}
+                    <tr><th>Total</th><th>${number(profile.wall_s, 3)}</th><th>${number(profile.cpu_s, 3)}</th><th colspan="5"></th></tr>
+                </table>
+            `;
+        }
         
         // Download all files function
         function downloadAllFiles(fileNames) {
@@ -929,11 +2049,18 @@ class StreamlitStyleHandler(http.server.SimpleHTTPRequestHandler):
         except Exception as e:
             self.send_json_response({'error': str(e)})
 
-    def handle_download(self):
-        """Handle file download requests"""
+    def handle_download(self, head=False):
+        """Handle file download requests.
+
+        The file is sent with socket.sendfile (zero-copy where the OS has
+        it). ETag and Last-Modified let clients revalidate with a 304, a
+        single Range request resumes a download, and text files of at
+        least DOWNLOAD_GZIP_MIN_BYTES are gzipped on the fly for clients
+        that accept it. head=True answers a HEAD request with the headers only.
+        """
         try:
             # Extract filename from path
-            filename = self.path[10:]  # Remove '/download/' prefix
+            filename = unquote(self.path[10:])  # Remove '/download/' prefix
             
             # Security check: ensure filename doesn't contain path traversal
             if '..' in filename or '/' in filename or '\\' in filename:
@@ -958,25 +2085,133 @@ class StreamlitStyleHandler(http.server.SimpleHTTPRequestHandler):
             else:
                 content_type = 'application/octet-stream'
             
-            # Send file
-            self.send_response(200)
-            self.send_header('Content-Type', content_type)
-            self.send_header('Content-Disposition', f'attachment; filename="{filename}"')
-            self.send_header('Content-Length', str(os.path.getsize(file_path)))
-            self.end_headers()
-            
             with open(file_path, 'rb') as f:
-                while True:
-                    chunk = f.read(8192)
-                    if not chunk:
-                        break
-                    self.wfile.write(chunk)
+                stat = os.fstat(f.fileno())
+                size = stat.st_size
+                etag = file_etag(stat)
+                last_modified = formatdate(stat.st_mtime, usegmt=True)
+                # Ranges always address the file's own bytes, so resumed downloads are not gzipped
+                gzipped = (self.server.gzip_downloads and content_type != 'application/octet-stream'
+                           and size >= DOWNLOAD_GZIP_MIN_BYTES and 'Range' not in self.headers
+                           and accepts_gzip(self.headers.get('Accept-Encoding', '')))
+                if gzipped:
+                    # The compressed bytes differ from the file, so they get their own validator
+                    etag = etag[:-1] + '-gzip"'
+                
+                def send_validators():
+                    self.send_header('ETag', etag)
+                    self.send_header('Last-Modified', last_modified)
+                    self.send_header('Accept-Ranges', 'bytes')
+                    if self.server.gzip_downloads and content_type != 'application/octet-stream':
+                        self.send_header('Vary', 'Accept-Encoding')
+                
+                if not_modified(self.headers, etag, stat.st_mtime):
+                    self.send_response(304)
+                    send_validators()
+                    self.end_headers()
+                    return
+                
+                byte_range = None
+                range_header = self.headers.get('Range')
+                if range_header and if_range_matches(self.headers.get('If-Range'), etag, last_modified):
+                    byte_range = parse_byte_range(range_header, size)
+                    if byte_range == 'unsatisfiable':
+                        self.send_response(416)
+                        self.send_header('Content-Range', f'bytes */{size}')
+                        self.send_header('Content-Length', '0')
+                        self.end_headers()
+                        return
+                
+                # Send file
+                if byte_range:
+                    start, end = byte_range
+                    self.send_response(206)
+                    self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+                else:
+                    start, end = 0, size - 1
+                    self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Disposition', f'attachment; filename="{filename}"')
+                send_validators()
+                if gzipped:
+                    # The compressed length is not known up front; the end of the body is the closed connection
+                    self.send_header('Content-Encoding', 'gzip')
+                    self.close_connection = True
+                else:
+                    self.send_header('Content-Length', str(end - start + 1))
+                self.end_headers()
+                if head:
+                    return
+                
+                if gzipped:
+                    compressor = zlib.compressobj(DOWNLOAD_GZIP_LEVEL, zlib.DEFLATED, 31)
+                    while True:
+                        chunk = f.read(DOWNLOAD_GZIP_CHUNK_BYTES)
+                        if not chunk:
+                            break
+                        self.wfile.write(compressor.compress(chunk))
+                    self.wfile.write(compressor.flush())
+                elif end >= start:
+                    self.wfile.flush()
+                    self.connection.sendfile(f, start, end - start + 1)
                     
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped the download; a Range request can resume it
+            self.close_connection = True
         except Exception as e:
             self.send_response(500)
             self.end_headers()
             self.wfile.write(f"Error downloading file: {str(e)}".encode())
 
+    def handle_download_bundle(self, job_id):
+        """Stream a ZIP of every output file of a finished processing job.
+
+        The archive is written straight to the connection as it is built:
+        each file is compressed in small pieces and only the central
+        directory is kept until the end, so no temporary archive is made
+        and memory does not grow with the bundle. Output names only carry
+        the date, so if a file was overwritten by a later run or removed
+        since this job finished, the job's outputs are gone: the request
+        gets a 409 naming the files instead of a ZIP of another run's.
+        """
+        job = self.server.jobs.get(job_id)
+        if job is None or job.status != 'succeeded':
+            self.send_json_response({'success': False, 'message': 'No finished run with this id'}, 404)
+            return
+        results_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'md_extraction_results')
+        paths = [(name, os.path.join(results_dir, name)) for name in job.result['files']]
+        file_stats = job.result.get('file_stats', {})
+        changed = []
+        for name, path in paths:
+            try:
+                etag = file_etag(os.stat(path))
+            except OSError:
+                etag = None
+            if name not in file_stats or file_stats[name]['etag'] != etag:
+                changed.append(name)
+        if changed:
+            self.send_json_response({
+                'success': False,
+                'message': f"Output files of this run were overwritten or removed by a later run: {', '.join(changed)}",
+                'files': changed,
+            }, 409)
+            return
+        bundle_name = re.sub(r'[^A-Za-z0-9_.-]+', '_', os.path.basename(job.folder_path)) or 'md'
+        
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/zip')
+        self.send_header('Content-Disposition', f'attachment; filename="{bundle_name}_results_{job.id}.zip"')
+        # The archive size is not known up front; the end of the body is the closed connection
+        self.close_connection = True
+        self.end_headers()
+        try:
+            # zipfile writes data descriptors instead of seeking back on a socket
+            with zipfile.ZipFile(self.wfile, 'w', zipfile.ZIP_DEFLATED, compresslevel=DOWNLOAD_BUNDLE_LEVEL) as bundle:
+                for name, path in paths:
+                    bundle.write(path, name)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
     def handle_process_files(self):
         """Handle file processing request"""
         try:
@@ -989,9 +2224,18 @@ class StreamlitStyleHandler(http.server.SimpleHTTPRequestHandler):
             separate_txt = data.get('separateTxt', False)
             no_txt = data.get('noTxt', False)
             passrate_analysis = data.get('passrateAnalysis', True)  # Default to True
+            passrate_rollups = data.get('passrateRollups', False)
+            recursive = data.get('recursive', False)
+            jobs = data.get('jobs')
+            jobs = int(jobs) if jobs is not None else 1
+            
+            upload = data.get('upload', False)
             
             # Handle different types of folder input
-            if os.path.isabs(folder_path) and os.path.isdir(folder_path):
+            if upload:
+                # The page uploads the dropped folder's .md files to /jobs/<id>/upload next; nothing to find on disk
+                folder_path = os.path.basename(folder_path.rstrip('/')) or 'upload'
+            elif os.path.isabs(folder_path) and os.path.isdir(folder_path):
                 # Direct absolute path from browse button - use as-is
                 print(f"DEBUG: Using absolute path directly: {folder_path}")
                 pass  # folder_path is already correct
@@ -1009,178 +2253,52 @@ class StreamlitStyleHandler(http.server.SimpleHTTPRequestHandler):
                 else:
                     folder_name = folder_path
                 
-                # Look for a folder with this name in the current directory first
-                current_dir = os.path.dirname(os.path.abspath(__file__))
-                potential_path = os.path.join(current_dir, folder_name)
-                
+                # Look for the folder next to this script, then in common locations (Downloads, Desktop, ...)
                 print(f"DEBUG: Looking for folder '{folder_name}'")
-                print(f"DEBUG: Current dir: {current_dir}")
-                print(f"DEBUG: Potential path: {potential_path}")
-                print(f"DEBUG: Path exists: {os.path.exists(potential_path)}")
-                print(f"DEBUG: Is directory: {os.path.isdir(potential_path)}")
+                folder_path = self.server.folder_index.resolve(folder_name, recursive)
                 
-                if os.path.isdir(potential_path):
-                    folder_path = potential_path
-                    print(f"DEBUG: Found folder at: {folder_path}")
-                else:
-                    # Search for folder in subdirectories (but limit depth to avoid long searches)
-                    found_path = None
-                    search_depth = 0
-                    max_depth = 2
-                    
-                    for root, dirs, files in os.walk(current_dir):
-                        # Calculate current depth
-                        current_depth = root.replace(current_dir, '').count(os.sep)
-                        if current_depth > max_depth:
-                            continue
-                            
-                        if folder_name in dirs:
-                            found_path = os.path.join(root, folder_name)
-                            print(f"DEBUG: Found folder in subdirectory: {found_path}")
-                            break
-                    
-                    if found_path:
-                        folder_path = found_path
-                    else:
-                        # Search in common locations on Mac
-                        search_locations = [
-                            os.path.expanduser("~/Downloads"),
-                            os.path.expanduser("~/Desktop"),
-                            os.path.expanduser("~/Documents"),
-                            "/Users",  # Search in all user directories
-                            "/Volumes",  # External drives
-                        ]
-                        
-                        print(f"DEBUG: Searching for folder '{folder_name}' in common locations...")
-                        
-                        # Search for the folder and then find MD files within it
-                        def find_folder_with_md_files(search_root, target_name, max_depth=5):
-                            """Recursively search for a folder by name and check if it contains MD files"""
-                            found_paths = []
-                            try:
-                                for root, dirs, files in os.walk(search_root):
-                                    # Calculate current depth
-                                    depth = root.replace(search_root, '').count(os.sep)
-                                    if depth > max_depth:
-                                        dirs.clear()  # Don't descend further
-                                        continue
-                                    
-                                    # Check if target folder name matches exactly
-                                    if target_name in dirs:
-                                        potential_path = os.path.join(root, target_name)
-                                        if os.path.isdir(potential_path):
-                                            # Check if this folder or any subfolder contains .md files
-                                            md_folder = find_md_files_folder(potential_path)
-                                            if md_folder:
-                                                found_paths.append(md_folder)
-                                            
-                                    # For very deep folders, limit the search to avoid timeouts
-                                    if depth >= max_depth:
-                                        dirs.clear()
-                                        
-                            except (PermissionError, OSError):
-                                pass
-                            return found_paths
-                        
-                        def find_md_files_folder(root_path):
-                            """Find the folder containing .md files within a given root path"""
-                            try:
-                                # Check if root path directly contains .md files
-                                md_files = [f for f in os.listdir(root_path) if f.lower().endswith('.md')]
-                                if md_files:
-                                    print(f"DEBUG: Found {len(md_files)} .md files in: {root_path}")
-                                    return root_path
-                                
-                                # Recursively search for .md files in subdirectories
-                                for root, dirs, files in os.walk(root_path):
-                                    md_files = [f for f in files if f.lower().endswith('.md')]
-                                    if md_files:
-                                        print(f"DEBUG: Found {len(md_files)} .md files in: {root}")
-                                        return root
-                                        
-                            except (PermissionError, OSError):
-                                pass
-                            return None
-                        
-                        all_found_paths = []
-                        for location in search_locations:
-                            if not os.path.exists(location):
-                                continue
-                                
-                            try:
-                                # Direct check in the location first
-                                potential = os.path.join(location, folder_name)
-                                if os.path.isdir(potential):
-                                    # Check if this folder contains .md files (directly or in subfolders)
-                                    md_folder = find_md_files_folder(potential)
-                                    if md_folder:
-                                        folder_path = md_folder
-                                        print(f"DEBUG: Found folder with .md files at: {folder_path}")
-                                        break
-                                
-                                # Recursive search with limited depth
-                                found_paths = find_folder_with_md_files(location, folder_name, max_depth=4)
-                                if found_paths:
-                                    all_found_paths.extend(found_paths)
-                                    
-                            except (PermissionError, OSError):
-                                # Skip locations we can't access
-                                continue
-                        
-                        # If we found multiple matches, prefer the first one (could be improved with user selection)
-                        if not folder_path and all_found_paths:
-                            folder_path = all_found_paths[0]
-                            print(f"DEBUG: Found folder with .md files at: {folder_path}")
-                            if len(all_found_paths) > 1:
-                                print(f"DEBUG: Found {len(all_found_paths)} possible matches, using first one")
-                        
-                        if not folder_path or not os.path.isdir(folder_path):
-                            self.send_json_response({
-                                'success': False,
-                                'message': f'Could not find folder "{folder_name}" with .md files in common locations (Downloads, Desktop, Documents, etc.). The folder was found but may not contain .md files, or the path is too complex. Please use the Browse button to manually navigate to the folder containing .md files.'
-                            })
-                            return
+                if not folder_path:
+                    self.send_json_response({
+                        'success': False,
+                        'message': f'Could not find folder "{folder_name}" with .md files in common locations (Downloads, Desktop, Documents, etc.). The folder was found but may not contain .md files, or the path is too complex. Please use the Browse button to manually navigate to the folder containing .md files.'
+                    })
+                    return
             
-            if not folder_path or not os.path.isdir(folder_path):
+            if not upload and (not folder_path or not os.path.isdir(folder_path)):
                 self.send_json_response({
                     'success': False,
                     'message': 'Invalid or missing folder path'
                 })
                 return
             
-            # Build command to run extract_md_history.py
-            cmd = [sys.executable, 'extract_md_history.py', folder_path]
+            # Build the extract_md_history.py arguments of the run
+            argv = [folder_path]
             
             if separate_csv:
-                cmd.append('--separate-csv')
+                argv.append('--separate-csv')
             if separate_txt:
-                cmd.append('--separate-txt')
+                argv.append('--separate-txt')
             if no_txt:
-                cmd.append('--no-txt')
+                argv.append('--no-txt')
             if not passrate_analysis:
-                cmd.append('--no-passrate')
-            
-            # Run the command
-            result = subprocess.run(cmd, capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+                argv.append('--no-passrate')
+            elif passrate_rollups:
+                argv.extend(['--passrate-by', 'all'])
+            if recursive:
+                argv.append('--recursive')
+            if data.get('profile'):
+                argv.append('--profile')
+            if jobs != 1:
+                argv.extend(['--jobs', str(jobs)])
             
-            if result.returncode == 0:
-                # Parse output to extract file information
-                output_text = result.stdout
-                files_created = self.parse_output_files(output_text)
-                
-                self.send_json_response({
-                    'success': True,
-                    'message': f"Successfully processed MD files from '{os.path.basename(folder_path)}' folder.",
-                    'files': files_created,
-                    'output': output_text
-                })
-            else:
-                self.send_json_response({
-                    'success': False,
-                    'message': f"Error processing MD files: {result.stderr}",
-                    'error': result.stderr,
-                    'output': result.stdout
-                })
+            # Queue the run and answer right away; the page follows /jobs/<id>/events
+            job = self.server.jobs.submit(argv, folder_path, upload)
+            self.send_json_response({
+                'success': True,
+                'jobId': job.id,
+                'status': job.status,
+                'message': f"Queued processing of '{os.path.basename(folder_path)}' folder."
+            })
         
         except Exception as e:
             self.send_json_response({
@@ -1188,88 +2306,159 @@ class StreamlitStyleHandler(http.server.SimpleHTTPRequestHandler):
                 'message': f"Error: {str(e)}"
             })
 
-    def parse_output_files(self, output_text):
-        """Parse the output text to extract created file names"""
-        files_created = []
-        
-        # Extract main CSV files from lines like "📄 historical_data_from_md_import.csv"
-        csv_matches = re.findall(r'📄 ([\w\.-_]+\.csv)', output_text)
-        files_created.extend(csv_matches)
+    def handle_job_status(self, job_id):
+        """Polling endpoint: current state of a processing job"""
+        job = self.server.jobs.get(job_id)
+        if job is None:
+            self.send_json_response({'success': False, 'message': 'Unknown job'}, status=404)
+            return
+        self.send_json_response(job.snapshot())
+
+    def handle_job_events(self, job_id):
+        """Server-Sent Events stream of a job: 'progress' events, then one 'done' event.
+
+        The events are sent from a thread of the server's own, so watching a
+        queued or running job does not hold one of the request workers.
+        """
+        job = self.server.jobs.get(job_id)
+        if job is None:
+            self.send_json_response({'success': False, 'message': 'Unknown job'}, status=404)
+            return
+        # The stream ends the connection; the worker must not wait for another request on it
+        self.close_connection = True
+        if len(self.server.event_streams) >= MAX_EVENT_STREAMS:
+            # The page falls back to polling /jobs/<id>
+            self.send_json_response({'success': False, 'message': 'Too many event streams'}, status=503)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        connection = self.connection
         
-        # Extract pass rate analysis files from lines like "📊 Pass rate analysis CSV created: submission_passrate_analysis_20250530.csv"
-        passrate_matches = re.findall(r'📊 Pass rate analysis CSV created: ([\w\.-_]+\.csv)', output_text)
-        files_created.extend(passrate_matches)
+        def stream():
+            version = None
+            try:
+                while True:
+                    current = job.wait_for_change(version, SSE_KEEPALIVE_INTERVAL)
+                    if current == version:
+                        connection.sendall(b': keepalive\n\n')
+                        continue
+                    version = current
+                    if job.finished:
+                        connection.sendall(f"event: done\ndata: {json.dumps(job.snapshot())}\n\n".encode())
+                        return
+                    connection.sendall(f"event: progress\ndata: {json.dumps(job.snapshot(with_output=False))}\n\n".encode())
+            except OSError:
+                # The page went away (or stopped reading); the job keeps running
+                pass
         
-        # Extract TXT files from various output patterns
-        # Single file: "📝 TXT file created: historical_data_from_md_import_20250530.txt"
-        single_txt_matches = re.findall(r'📝 TXT file created: ([\w\.-_]+\.txt)', output_text)
-        files_created.extend(single_txt_matches)
+        # Losing the race for the last slot closes the stream, and the page falls back to polling
+        self.server.start_event_stream(connection, stream)
+
+    def handle_job_cancel(self, job_id):
+        """Cancel a queued or running job"""
+        if self.server.jobs.cancel(job_id):
+            self.send_json_response({'success': True, 'message': 'Cancelling job'})
+        else:
+            self.send_json_response({'success': False, 'message': 'Job is not running'})
+
+    def handle_job_upload(self, job_id):
+        """Stream the .md files of a multipart/form-data body into an upload job as they arrive"""
+        job = self.server.jobs.get(job_id)
+        if job is None or job.upload is None:
+            self.close_connection = True
+            self.send_json_response({'success': False, 'message': 'Unknown upload job'}, 404)
+            return
+        if job.upload_started:
+            self.close_connection = True
+            self.send_json_response({'success': False, 'message': 'Files were already uploaded for this job'}, 409)
+            return
+        job.upload_started = True
         
-        # Multiple files: "📝 TXT files created: N OS-specific files + summary"
-        # In this case, we rely on directory scanning below
+        def put(item):
+            # Blocks while the job is queued or busy parsing earlier files; False once it has finished
+            while not job.finished:
+                try:
+                    job.upload.put(item, timeout=1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
         
-        # Also search for any file pattern that looks like our output files
-        all_file_matches = re.findall(r'((?:historical_data_from_md_import|submission_passrate_analysis)[^,\s]*\.(?:csv|txt))', output_text)
-        files_created.extend(all_file_matches)
+        boundary = re.search(r'boundary="?([^";]+)"?', self.headers.get('Content-Type', ''))
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            read = ChunkedReader(self.rfile).read
+        else:
+            remaining = [int(self.headers.get('Content-Length', 0))]
+            def read(size):
+                data = self.rfile.read(min(size, remaining[0])) if remaining[0] > 0 else b''
+                remaining[0] -= len(data)
+                return data
         
-        # Always include actual files from the directory to ensure we don't miss any
+        count = 0
         try:
-            results_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'md_extraction_results')
-            if os.path.exists(results_dir):
-                all_files = os.listdir(results_dir)
-                # Get all CSV and TXT files that match our naming pattern
-                import time
-                current_time = time.time()
-                
-                for filename in all_files:
-                    if (filename.endswith(('.csv', '.txt')) and 
-                        (filename.startswith('historical_data_from_md_import') or 
-                         filename.startswith('submission_passrate_analysis')) and 
-                        not filename.startswith('.')):
-                        file_path = os.path.join(results_dir, filename)
-                        if os.path.isfile(file_path):
-                            # Include recent files (last 10 minutes) or if no files found in output
-                            file_time = os.path.getmtime(file_path)
-                            if not files_created or (current_time - file_time < 600):  # 10 minutes
-                                files_created.append(filename)
-        except Exception as e:
-            print(f"DEBUG: Error listing directory files: {e}")
-        
-        # Remove duplicates and sort
-        unique_files = sorted(list(set(files_created)))
-        print(f"DEBUG: Found files: {unique_files}")
-        return unique_files
-
-    def send_json_response(self, data):
+            if not boundary:
+                raise UploadError("Expected a multipart/form-data upload")
+            for name, content in iter_multipart_files(read, boundary.group(1).encode('latin-1')):
+                if not name.lower().endswith('.md'):
+                    continue
+                if not put((name, content)):
+                    self.close_connection = True
+                    self.send_json_response({'success': False, 'message': f"Job {job.status} before the upload finished"})
+                    return
+                count += 1
+            put(None)
+        except (UploadError, OSError) as e:
+            put(e if isinstance(e, UploadError) else UploadError(f"Upload broke off: {e}"))
+            self.close_connection = True
+            try:
+                self.send_json_response({'success': False, 'message': str(e)}, 400)
+            except OSError:
+                pass
+            return
+        self.send_json_response({'success': True, 'files': count})
+    
+    def send_json_response(self, data, status=200):
         """Send a JSON response"""
-        self.send_response(200)
+        self.send_response(status)
         self.send_header('Content-Type', 'application/json')
         self.end_headers()
         self.wfile.write(json.dumps(data).encode())
 
 
-def start_server(port=8000):
+def start_server(port=8000, max_workers=DEFAULT_MAX_WORKERS, request_timeout=DEFAULT_REQUEST_TIMEOUT, open_browser=True,
+                 gzip_downloads=True):
     """Start the web server"""
     # Find an available port
     for p in range(port, port + 10):
         try:
             handler = StreamlitStyleHandler
-            httpd = socketserver.TCPServer(("", p), handler)
+            httpd = WebUIServer(("", p), handler, max_workers, request_timeout, gzip_downloads)
             server_url = f"http://localhost:{p}/"
             
             print(f"🚀 Starting MD File Processor at {server_url}")
+            print(f"👥 Serving up to {max_workers} requests at once ({request_timeout}s request timeout)")
             print("📁 Ready to process Markdown files!")
             print("⏹️  Press Ctrl+C to stop the server")
             
             # Open browser in a separate thread
-            Thread(target=lambda: webbrowser.open(server_url)).start()
+            if open_browser:
+                Thread(target=lambda: webbrowser.open(server_url)).start()
+            
+            # Stop gracefully on SIGTERM (e.g. a service manager) as on Ctrl+C
+            def stop_on_sigterm(signum, frame):
+                raise KeyboardInterrupt
+            if threading.current_thread() is threading.main_thread():
+                signal.signal(signal.SIGTERM, stop_on_sigterm)
             
             # Start server
             try:
                 httpd.serve_forever()
             except KeyboardInterrupt:
                 print("\n👋 Shutting down server...")
-                httpd.shutdown()
+            finally:
+                httpd.server_close()
             return
         
         except OSError:
@@ -1279,4 +2468,16 @@ def start_server(port=8000):
 
 
 if __name__ == "__main__":
-    start_server()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Web UI for extract_md_history.py')
+    parser.add_argument('--port', type=int, default=8000, help='First port to try (default: 8000)')
+    parser.add_argument('--max-workers', type=int, default=DEFAULT_MAX_WORKERS, metavar='N',
+                        help=f'Requests served at the same time (default: {DEFAULT_MAX_WORKERS})')
+    parser.add_argument('--request-timeout', type=int, default=DEFAULT_REQUEST_TIMEOUT, metavar='SECONDS',
+                        help=f'Drop connections idle for SECONDS on a read or write (default: {DEFAULT_REQUEST_TIMEOUT})')
+    parser.add_argument('--no-browser', action='store_true', help='Do not open a browser (e.g. on a shared server)')
+    parser.add_argument('--no-gzip', action='store_true',
+                        help=f'Never gzip downloads (by default CSV/TXT files from {DOWNLOAD_GZIP_MIN_BYTES // (1024 * 1024)} MB are gzipped for clients that accept it)')
+    args = parser.parse_args()
+    start_server(args.port, args.max_workers, args.request_timeout, not args.no_browser, not args.no_gzip)